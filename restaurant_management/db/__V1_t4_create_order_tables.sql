@@ -4,6 +4,8 @@ CREATE TABLE orders (
     status VARCHAR(20) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     end_at TIMESTAMP WITH TIME ZONE, -- NULLable
+    item_count INTEGER NOT NULL DEFAULT 0, -- Sum of item quantities, maintained on add/delete
+    running_subtotal NUMERIC(10, 2) NOT NULL DEFAULT 0.00, -- Value of the items before VAT
     FOREIGN KEY (table_id) REFERENCES tables(id) ON DELETE RESTRICT
 );
 
@@ -14,13 +16,43 @@ CREATE TABLE order_items (
     added_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     menu_extra_id INTEGER,
     quantity INTEGER NOT NULL DEFAULT 1,
+    unit_price NUMERIC(10, 2), -- Dish price when the item was added; NOT NULL once the sample data below is priced
+    extra_price NUMERIC(10, 2) NOT NULL DEFAULT 0.00, -- Extra price when the item was added
     notes TEXT,
     is_delivered BOOLEAN NOT NULL DEFAULT FALSE,
+    seat SMALLINT CHECK (seat >= 0),
+    feed_sequence BIGINT, -- Kitchen feed position, stamped when the adding transaction ends
     FOREIGN KEY (menu_item_id) REFERENCES dishes(id) ON DELETE RESTRICT,
     FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
     FOREIGN KEY (menu_extra_id) REFERENCES menu_extras(id) ON DELETE RESTRICT
 );
 
+-- Single-row counter ordering the kitchen feed by commit
+CREATE TABLE kitchen_feed_sequence (
+    id SERIAL PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO kitchen_feed_sequence (id, value) VALUES (1, 0);
+
+-- Append-only audit log of order state transitions
+CREATE TABLE order_events (
+    id SERIAL PRIMARY KEY,
+    order_id INTEGER NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    from_status VARCHAR(20),
+    to_status VARCHAR(20),
+    from_table_id INTEGER,
+    to_table_id INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_orders_status_created ON orders (status, created_at);
+CREATE INDEX idx_orders_table_status ON orders (table_id, status);
+CREATE INDEX idx_orders_created_id ON orders (created_at DESC, id DESC);
+CREATE INDEX idx_order_items_pending ON order_items (feed_sequence, id) WHERE NOT is_delivered;
+CREATE INDEX idx_order_events_order_created ON order_events (order_id, created_at);
+
 
 --1. Completed Dine-in Order (Matches Payment ID 1)
 -- Order header
@@ -107,4 +139,11 @@ INSERT INTO order_items (menu_item_id, order_id, menu_extra_id, quantity, notes,
 VALUES
 ((SELECT id FROM dishes WHERE name = 'Vegetable Curry'), 5, NULL, 1, 'Mild spice', true),
 ((SELECT id FROM dishes WHERE name = 'Grilled Salmon'), 5, NULL, 1, 'Wrong item delivered - refunded', false),
-((SELECT id FROM dishes WHERE name = 'Sparkling Water'), 5, NULL, 1, NULL, true);
\ No newline at end of file
+((SELECT id FROM dishes WHERE name = 'Sparkling Water'), 5, NULL, 1, NULL, true);
+
+
+-- Price the sample items with the current menu prices
+UPDATE order_items
+SET unit_price = (SELECT price FROM dishes WHERE dishes.id = order_items.menu_item_id),
+    extra_price = COALESCE((SELECT price FROM menu_extras WHERE menu_extras.id = order_items.menu_extra_id), 0);
+ALTER TABLE order_items ALTER COLUMN unit_price SET NOT NULL;
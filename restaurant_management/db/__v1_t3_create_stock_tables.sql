@@ -22,6 +22,8 @@ CREATE TABLE stocks (
     FOREIGN KEY (item_id) REFERENCES stock_items(id) ON DELETE RESTRICT
 );
 
+CREATE INDEX idx_stocks_fill_ratio ON stocks ((total_stock::double precision / optimal_stock_quantity));
+
 CREATE TABLE stock_transactions (
     id SERIAL PRIMARY KEY,
     stock_id INTEGER NOT NULL,
@@ -41,6 +43,19 @@ CREATE INDEX idx_stock_transactions_type ON stock_transactions (transaction_type
 CREATE INDEX idx_stock_transactions_date ON stock_transactions (date);
 CREATE INDEX idx_stock_transactions_stock_date ON stock_transactions (stock_id, date);
 
+CREATE TABLE recipes (
+    id SERIAL PRIMARY KEY,
+    dish_id INTEGER NOT NULL,
+    stock_item_id INTEGER NOT NULL,
+    quantity_per_portion INTEGER NOT NULL,
+    CONSTRAINT unique_recipe_ingredient UNIQUE (dish_id, stock_item_id),
+    CONSTRAINT positive_quantity_per_portion CHECK (quantity_per_portion >= 1),
+    FOREIGN KEY (dish_id) REFERENCES dishes(id) ON DELETE CASCADE,
+    FOREIGN KEY (stock_item_id) REFERENCES stock_items(id) ON DELETE RESTRICT
+);
+
+CREATE INDEX idx_recipes_stock_item ON recipes (stock_item_id);
+
 
 INSERT INTO stock_items (menu_item_id, name, unit, category) VALUES
 ((SELECT id FROM dishes WHERE name = 'Grilled Salmon'), 'Fresh Salmon Fillet', 'kg', 'INGREDIENT'),
@@ -1,6 +1,6 @@
 CREATE TABLE payments (
     id SERIAL PRIMARY KEY,
-    order_id INTEGER UNIQUE,
+    order_id INTEGER,
     payment_method VARCHAR(20),
     payment_status VARCHAR(20) NOT NULL,
     sub_total NUMERIC(10, 2) NOT NULL DEFAULT 0.00,
@@ -18,7 +18,7 @@ CREATE TABLE payments (
 CREATE TABLE payment_items (
     id SERIAL PRIMARY KEY,
     payment_id INTEGER NOT NULL,
-    order_item_id INTEGER UNIQUE,
+    order_item_id INTEGER,
     menu_item_id INTEGER,
     menu_item_extra_id INTEGER,
     price NUMERIC(10, 2) NOT NULL,
@@ -26,12 +26,60 @@ CREATE TABLE payment_items (
     extras_charges NUMERIC(10, 2) NOT NULL DEFAULT 0.00,
     total NUMERIC(10, 2) NOT NULL,
     charge_description VARCHAR(255) NOT NULL DEFAULT '',
+    is_split_share BOOLEAN NOT NULL DEFAULT FALSE,
     FOREIGN KEY (payment_id) REFERENCES payments(id) ON DELETE CASCADE,
     FOREIGN KEY (menu_item_id) REFERENCES dishes(id) ON DELETE RESTRICT,
     FOREIGN KEY (menu_item_extra_id) REFERENCES menu_extras(id) ON DELETE SET NULL,
     FOREIGN KEY (order_item_id) REFERENCES order_items(id) ON DELETE RESTRICT
 );
 
+CREATE INDEX idx_payments_created ON payments (created_at);
+CREATE INDEX idx_payments_status_created ON payments (payment_status, created_at);
+CREATE INDEX idx_payments_total ON payments (total);
+CREATE INDEX idx_payment_items_payment ON payment_items (payment_id);
+
+-- An order (and an order item) can be charged across several payments when the check is split
+CREATE INDEX idx_payments_order ON payments (order_id);
+CREATE INDEX idx_payment_items_order_item ON payment_items (order_item_id);
+CREATE INDEX idx_payment_items_menu_item ON payment_items (menu_item_id);
+
+-- Sales per (day paid, currency, payment method), maintained on payment transitions
+CREATE TABLE daily_sales_rollups (
+    id SERIAL PRIMARY KEY,
+    date DATE NOT NULL,
+    currency_type VARCHAR(3) NOT NULL,
+    payment_method VARCHAR(20) NOT NULL,
+    payments_count INTEGER NOT NULL DEFAULT 0,
+    sub_total NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    vat NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    discount NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    total NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    refunds_count INTEGER NOT NULL DEFAULT 0,
+    refunded_total NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_daily_sales_rollups_key UNIQUE (date, currency_type, payment_method)
+);
+
+-- Units sold and revenue per (dish, day paid), maintained on payment completion
+CREATE TABLE dish_daily_sales (
+    id SERIAL PRIMARY KEY,
+    dish_id INTEGER NOT NULL,
+    date DATE NOT NULL,
+    quantity_sold INTEGER NOT NULL DEFAULT 0,
+    gross_revenue NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    extras_revenue NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (dish_id) REFERENCES dishes(id) ON DELETE CASCADE,
+    CONSTRAINT uq_dish_daily_sales_key UNIQUE (dish_id, date)
+);
+
+CREATE INDEX idx_dish_daily_sales_date ON dish_daily_sales (date, dish_id);
+
+-- Trigram indexes serving the admin text search over item descriptions and dish names
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_payment_items_description_trgm ON payment_items USING GIN (UPPER(charge_description) gin_trgm_ops);
+CREATE INDEX idx_dishes_name_trgm ON dishes USING GIN (UPPER(name) gin_trgm_ops);
+
 
 -- 1. Completed Payment (Dine-in)
 
@@ -102,4 +150,29 @@ VALUES
 (5, (SELECT id FROM dishes WHERE name = 'Vegetable Curry'), 15.00, 1, 0.00, 15.00, 'Vegetable Curry (correct item)'),
 (5, (SELECT id FROM dishes WHERE name = 'Grilled Salmon'), 18.50, 1, 0.00, 0.00, 'Grilled Salmon (refunded - wrong item)'),
 (5, (SELECT id FROM dishes WHERE name = 'Sparkling Water'), 2.50, 1, 0.00, 2.50, 'Sparkling Water'),
-(5, NULL, 0.00, 1, 15.00, 15.00, 'Partial refund + compensation');
\ No newline at end of file
+(5, NULL, 0.00, 1, 15.00, 15.00, 'Partial refund + compensation');
+
+-- Build the daily sales rollup from the seeded payments
+INSERT INTO daily_sales_rollups (date, currency_type, payment_method, payments_count, sub_total, vat, discount, total, refunds_count, refunded_total)
+SELECT
+    (paid_at AT TIME ZONE 'UTC')::date,
+    currency_type,
+    COALESCE(payment_method, 'UNSPECIFIED'),
+    COUNT(*) FILTER (WHERE payment_status = 'COMPLETED'),
+    COALESCE(SUM(sub_total) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+    COALESCE(SUM(vat) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+    COALESCE(SUM(discount) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+    COALESCE(SUM(total) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+    COUNT(*) FILTER (WHERE payment_status = 'REFUNDED'),
+    COALESCE(SUM(total) FILTER (WHERE payment_status = 'REFUNDED'), 0)
+FROM payments
+WHERE deleted_at IS NULL AND paid_at IS NOT NULL AND payment_status IN ('COMPLETED', 'REFUNDED')
+GROUP BY 1, 2, 3;
+
+-- Build the per-dish sales from the seeded completed payments
+INSERT INTO dish_daily_sales (dish_id, date, quantity_sold, gross_revenue, extras_revenue)
+SELECT pi.menu_item_id, (p.paid_at AT TIME ZONE 'UTC')::date, SUM(pi.quantity), SUM(pi.total), SUM(pi.extras_charges)
+FROM payment_items pi
+JOIN payments p ON p.id = pi.payment_id
+WHERE p.payment_status = 'COMPLETED' AND p.deleted_at IS NULL AND p.paid_at IS NOT NULL AND pi.menu_item_id IS NOT NULL
+GROUP BY 1, 2;
@@ -0,0 +1,63 @@
+from drf_yasg import openapi
+from shared.open_api.error_response_schema import (
+    ErrorResponses,
+    ValidationErrorResponseSerializer,
+)
+
+class AnalyticsDocumentationData:
+    """
+    Documentation data for the order analytics endpoints
+    """
+    table_turns_response = openapi.Response(
+        description="Order duration, covers and turns over the requested range",
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Table Turn Analytics successfully Retrieved",
+                "data": {
+                    "date_from": "2024-01-01",
+                    "date_to": "2024-01-07",
+                    "granularity": "day",
+                    "summary": {"turns": 182, "covers": 611, "avg_duration_minutes": 54.3},
+                    "tables": [
+                        {"table_id": 2, "table_number": "T2", "turns": 21, "covers": 84, "avg_duration_minutes": 61.0}
+                    ],
+                    "buckets": [
+                        {"bucket": "2024-01-01T00:00:00+00:00", "turns": 25, "covers": 83, "avg_duration_minutes": 49.8}
+                    ]
+                }
+            }
+        }
+    )
+
+    invalid_range_response = openapi.Response(
+        description="Bad Request - Invalid dates, date range or granularity.",
+        schema=ValidationErrorResponseSerializer,
+        examples={
+            "application/json": {
+                "success": False,
+                "message": "'date_from' must not be after 'date_to'."
+            }
+        }
+    )
+
+    server_error_response = ErrorResponses.get_server_error_response()
+    unauthorized_response = ErrorResponses.get_unauthorized_response()
+
+    table_turns_operation_summary = 'Table turn and order duration analytics'
+    table_turns_operation_description = """
+        Reports completed orders created within the date range: average order duration,
+        covers and turns, overall, per table and per time bucket.
+        
+        **Permissions:**
+        - `IsAuthenticated`: Only authenticated users can access this endpoint.
+        
+        **Query Parameters:**
+        - `date_from` / `date_to`: Inclusive range of days (defaults to the last 7 days, max 366)
+        - `granularity`: `hour` (default) or `day` buckets, e.g. hourly buckets to compare shifts
+        
+        **Note:**
+        - Covers are counted as the seating capacity of the table
+        - Results are cached and refreshed whenever an order completes
+        """
+    table_turns_operation_id = 'Table Turn Analytics'
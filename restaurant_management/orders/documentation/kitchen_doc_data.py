@@ -0,0 +1,103 @@
+from drf_yasg import openapi
+from ..serializers import KitchenItemSerializer
+from shared.open_api.error_response_schema import (
+    ErrorResponses,
+    ValidationErrorResponseSerializer,
+)
+
+class KitchenDocumentationData:
+    """
+    Documentation data for the kitchen display endpoints
+    """
+    feed_response = openapi.Response(
+        description="Pending items added after the cursor, in commit order",
+        schema=KitchenItemSerializer(many=True),
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Kitchen Feed successfully Retrieved",
+                "data": [
+                    {
+                        "id": 412,
+                        "order_id": 87,
+                        "table_number": "T2",
+                        "menu_item": 5,
+                        "menu_item_name": "Grilled Salmon",
+                        "menu_extra": None,
+                        "menu_extra_name": None,
+                        "quantity": 2,
+                        "notes": "Medium rare",
+                        "added_at": "2023-01-15T14:30:00Z"
+                    }
+                ],
+                "metadata": {
+                    "cursor": "2087-412",
+                    "count": 1
+                }
+            }
+        }
+    )
+
+    invalid_cursor_response = openapi.Response(
+        description="Bad Request - The cursor could not be decoded.",
+        schema=ValidationErrorResponseSerializer,
+        examples={
+            "application/json": {
+                "success": False,
+                "message": "Invalid kitchen feed cursor 'abc'."
+            }
+        }
+    )
+
+    deliver_response = openapi.Response(
+        description="Number of items flagged as delivered",
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "3 Order Items marked as delivered",
+                "data": {"delivered": 3}
+            }
+        }
+    )
+
+    deliver_validation_error_response = openapi.Response(
+        description="Bad Request - Missing or invalid order item IDs.",
+        schema=ValidationErrorResponseSerializer,
+        examples={
+            "application/json": {
+                "success": False,
+                "message": "Order Item IDs are required"
+            }
+        }
+    )
+
+    server_error_response = ErrorResponses.get_server_error_response()
+    unauthorized_response = ErrorResponses.get_unauthorized_response()
+
+    feed_operation_summary = 'Kitchen feed of pending items'
+    feed_operation_description = """
+        Returns undelivered items of all IN_PROGRESS orders added after `cursor`, in the order
+        their additions committed, so an item is never skipped by a cursor taken before it committed.
+        
+        **Permissions:**
+        - `IsAuthenticated`: Only authenticated users can access this endpoint.
+        
+        **Query Parameters:**
+        - `cursor`: Value of `metadata.cursor` from the previous response (omit on first call)
+        - `limit`: Maximum items to return (default 100, max 500)
+        - `wait`: Seconds to hold the request open when nothing is pending (long-poll, max 25)
+        """
+    feed_operation_id = 'Kitchen Feed'
+
+    deliver_operation_summary = 'Mark items as delivered'
+    deliver_operation_description = """
+        Flags many order items as delivered in a single update.
+        
+        **Permissions:**
+        - `IsAuthenticated`: Only authenticated users can access this endpoint.
+        
+        **Request Body:**
+        Expects an object with an `order_item_ids` array (max 500 IDs).
+        Items that are already delivered are ignored.
+        """
+    deliver_operation_id = 'Mark Order Items Delivered'
@@ -1,7 +1,7 @@
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import status
-from ..serializers import OrderSerializer
+from ..serializers import OrderSerializer, OrderEventSerializer
 from shared.open_api.error_response_schema import NotFoundErrorResponseSerializer, ValidationErrorResponseSerializer, ErrorResponses
 from payments.serializers import PaymentSerializer
 
@@ -22,6 +22,8 @@ class OrderDocumentationData:
                     "status": "IN_PROGRESS",
                     "created_at": "2023-01-01T12:00:00Z",
                     "end_at": None,
+                    "item_count": 2,
+                    "running_subtotal": "25.98",
                     "order_items": [
                         {
                             "menu_item": 101,
@@ -106,6 +108,68 @@ class OrderDocumentationData:
         }
     )
     
+    split_check_response = openapi.Response(
+        description="Pending payments of the split check",
+        schema=PaymentSerializer(many=True),
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Order 1 Succesfully Completed. 2 Payments were inited pending to be paid",
+                "data": [
+                    {
+                        "id": 101,
+                        "order_id": 1,
+                        "payment_status": "PENDING",
+                        "sub_total": "25.01",
+                        "vat": "4.00",
+                        "total": "29.01"
+                    },
+                    {
+                        "id": 102,
+                        "order_id": 1,
+                        "payment_status": "PENDING",
+                        "sub_total": "25.00",
+                        "vat": "4.00",
+                        "total": "29.00"
+                    }
+                ]
+            }
+        }
+    )
+    
+    order_events_response = openapi.Response(
+        description="Order event history",
+        schema=OrderEventSerializer(many=True),
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Order 1 Events successfully Retrieved",
+                "data": [
+                    {
+                        "id": 10,
+                        "order": 1,
+                        "event_type": "STARTED",
+                        "from_status": None,
+                        "to_status": "IN_PROGRESS",
+                        "from_table_id": None,
+                        "to_table_id": 5,
+                        "created_at": "2023-01-01T12:00:00Z"
+                    },
+                    {
+                        "id": 14,
+                        "order": 1,
+                        "event_type": "TABLE_MOVED",
+                        "from_status": None,
+                        "to_status": None,
+                        "from_table_id": 5,
+                        "to_table_id": 3,
+                        "created_at": "2023-01-01T12:20:00Z"
+                    }
+                ]
+            }
+        }
+    )
+    
     success_no_data = ErrorResponses.get_success_operation()
     server_error_reponse = ErrorResponses.get_server_error_response()
     unauthorized_reponse = ErrorResponses.get_unauthorized_response()
@@ -113,7 +177,7 @@ class OrderDocumentationData:
 
     list_operation_summary = 'List all orders'
     list_operation_description = """
-    Returns a list of all orders in the system.
+    Returns a cursor-paginated list of orders, newest first.
     
     **Permissions:**
     - `IsAuthenticated`: User must be logged in
@@ -121,6 +185,11 @@ class OrderDocumentationData:
     **Filtering:**
     - Filter by status: `?status=COMPLETED`
     - Filter by table: `?table_id=5`
+    - Filter by creation range: `?created_from=2024-01-01&created_to=2024-01-31T23:59:59`
+    
+    **Pagination:**
+    - Follow `metadata.pagination.next` / `previous` links, or pass `?cursor=<value>`
+    - Page size: `?page_size=50` (max 100)
     """
     
     retrieve_operation_summary = 'Retrieve an order'
@@ -187,6 +256,28 @@ class OrderDocumentationData:
     - Records completion timestamp
     - Automatically creates a payment record
     - Returns payment details
+    - Send an `Idempotency-Key` header to make retries safe: a retry replays the first
+      successful response instead of completing the order again
+    - A retry sent while the first request is still running gets 409 Conflict at once,
+      with a `Retry-After` header
+    """
+    
+    split_check_operation_summary = 'Complete an order with a split check'
+    split_check_operation_description = """
+    Marks an order as completed and splits its check into several pending payments.
+    
+    **Permissions:**
+    - `IsAuthenticated`: User must be logged in
+    
+    **Request Body:**
+    - `mode`: `item`, `seat` or `even`
+    - `item_groups`: For `item`, the order item ids of each payment; every item in exactly one group
+    - `parts`: For `even`, the number of payments (2 to 20)
+    
+    **Note:**
+    - `seat` creates one payment per seat of the order items; items without a seat are shared evenly
+    - Shared amounts are split to the cent and the parts add up exactly to the whole check
+    - Send an `Idempotency-Key` header to make retries safe
     """
     
     cancel_operation_summary = 'Cancel an order'
@@ -199,5 +290,20 @@ class OrderDocumentationData:
     **Note:**
     - Sets status to CANCELLED
     - Records cancellation timestamp
+    - Returns the recipe ingredients of undelivered items to stock
     - Cannot be undone
-    """
\ No newline at end of file
+    """
+    
+    events_operation_summary = 'Order event history'
+    events_operation_description = """
+    Returns the audit trail of an order's state transitions in chronological order.
+    
+    **Permissions:**
+    - `IsAuthenticated`: User must be logged in
+    
+    **Filtering:**
+    - Filter by time range: `?created_from=2024-01-01T00:00:00&created_to=2024-01-01T23:59:59`
+    
+    **Note:**
+    - Events are append-only: start, status changes, table moves, completion and cancellation
+    """
@@ -39,7 +39,7 @@ class OrderItemDocumentationData:
     forbidden_reponse = ErrorResponses.get_forbidden_response()
     
     order_items_list_response = openapi.Response(
-        description="List of order items after addition",
+        description="List of the order items that were added",
         schema=OrderItemSerializer(many=True),
         examples={
             "application/json": [
@@ -49,6 +49,8 @@ class OrderItemDocumentationData:
                     "order": 10,
                     "menu_extra": 3,
                     "quantity": 2,
+                    "unit_price": "12.50",
+                    "extra_price": "2.00",
                     "notes": "No onions please",
                     "is_delivered": False,
                     "added_at": "2023-01-15T14:30:00Z"
@@ -59,6 +61,8 @@ class OrderItemDocumentationData:
                     "order": 10,
                     "menu_extra": None,
                     "quantity": 1,
+                    "unit_price": "8.00",
+                    "extra_price": "0.00",
                     "notes": "",
                     "is_delivered": True,
                     "added_at": "2023-01-15T14:35:00Z"
@@ -84,6 +88,23 @@ class OrderItemDocumentationData:
         }
     )
     
+    add_items_batch_validation_error_response = openapi.Response(
+        description="Bad Request - One or more lines of the batch are invalid. No items were added.",
+        schema=ValidationErrorResponseSerializer,
+        examples={
+            "application/json": {
+                "success": False,
+                "message": "2 lines failed validation. No items were added",
+                "data": {
+                    "errors": [
+                        {"line": 3, "errors": {"quantity": ["Quantity must be at least 1"]}},
+                        {"line": 41, "errors": {"menu_item": ["Dish 87 is not active and can't be ordered"]}}
+                    ]
+                }
+            }
+        }
+    )
+    
     order_not_found_response = openapi.Response(
         description="Not Found - The specified order does not exist.",
         schema=NotFoundErrorResponseSerializer,
@@ -127,12 +148,44 @@ class OrderItemDocumentationData:
         
         **Request Body:**
         Expects an array of order item objects to be added to the order.
+        `menu_item` and `menu_extra` are IDs; every referenced dish must be ACTIVE.
         
         **Parameters:**
         - `order_id`: The ID of the order to which items will be added (path parameter)
+        
+        **Response:**
+        Returns only the items created by this request.
+        
+        **Stock:**
+        The recipe ingredients of the ordered dishes are taken out of stock. If any
+        ingredient runs short, no items are added (422).
         """
     add_items_operation_id = 'Add Order Items'
     
+    add_items_batch_operation_summary = 'Add a large batch of items to an order'
+    add_items_batch_operation_description = """
+        Adds up to 500 items to an existing order in a single transaction (banquets, catering).
+        
+        **Permissions:**
+        - `IsAuthenticated`: Only authenticated users can access this endpoint.
+        
+        **Request Body:**
+        Either a JSON array of order item objects, or an NDJSON stream with one
+        item object per line (`Content-Type: application/x-ndjson`).
+        
+        **Parameters:**
+        - `order_id`: The ID of the order to which items will be added (path parameter)
+        
+        **Errors:**
+        Every invalid line is reported with its 1-based position in the batch.
+        If any line fails, no items are added.
+        
+        **Stock:**
+        The recipe ingredients of the ordered dishes are taken out of stock. If any
+        ingredient runs short, no items are added (422).
+        """
+    add_items_batch_operation_id = 'Add Order Items Batch'
+    
     delete_items_operation_summary = 'Delete items from an order'
     delete_items_operation_description = """
         Removes one or more items from an existing order.
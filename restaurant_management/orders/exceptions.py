@@ -36,3 +36,15 @@ class OrderDeletionForbidden(OrderException):
     status_code = status.HTTP_403_FORBIDDEN
     default_detail = "This order cannot be deleted in its current state."
     default_code = "order_deletion_forbidden"
+
+class InvalidKitchenCursor(OrderException):
+    """Raised when the kitchen feed cursor cannot be decoded."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "The kitchen feed cursor is invalid."
+    default_code = "invalid_kitchen_cursor"
+
+class InvalidAnalyticsRange(OrderException):
+    """Raised when the analytics date range or granularity is invalid."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "The analytics date range or granularity is invalid."
+    default_code = "invalid_analytics_range"
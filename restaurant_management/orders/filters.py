@@ -0,0 +1,26 @@
+import django_filters
+from .models import Order
+
+class OrderFilter(django_filters.FilterSet):
+    status = django_filters.ChoiceFilter(
+        choices=Order.STATUS_CHOICES,
+        help_text="Filter by order status (IN_PROGRESS/COMPLETED/CANCELLED)"
+    )
+    table_id = django_filters.NumberFilter(
+        field_name='table',
+        help_text="Filter by table ID"
+    )
+    created_from = django_filters.IsoDateTimeFilter(
+        field_name='created_at',
+        lookup_expr='gte',
+        help_text="Orders created at or after this date/time"
+    )
+    created_to = django_filters.IsoDateTimeFilter(
+        field_name='created_at',
+        lookup_expr='lte',
+        help_text="Orders created at or before this date/time"
+    )
+
+    class Meta:
+        model = Order
+        fields = ['status', 'table_id', 'created_from', 'created_to']
@@ -1,16 +1,18 @@
 # menu/migrations/000A_orders_and_items.py
 
 from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
 
 
 class Migration(migrations.Migration):
 
     dependencies = [
+        ('tables', '0001_create_tables_and_data'),
     ]
 
     operations = [
         # --- Create orders table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE orders (
                 id SERIAL PRIMARY KEY,
@@ -38,12 +40,15 @@ class Migration(migrations.Migration):
                         ('created_at', models.DateTimeField(auto_now_add=True)),
                         ('end_at', models.DateTimeField(null=True, blank=True)),
                     ],
+                    options={
+                        'db_table': 'orders',
+                    },
                 ),
             ]
         ),
 
         # --- Create order_items table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE order_items (
                 id SERIAL PRIMARY KEY,
@@ -85,6 +90,9 @@ class Migration(migrations.Migration):
                         ('notes', models.TextField(null=True, blank=True)),
                         ('is_delivered', models.BooleanField(default=False)),
                     ],
+                    options={
+                        'db_table': 'order_items',
+                    },
                 ),
             ]
         ),
@@ -93,7 +101,7 @@ class Migration(migrations.Migration):
         # Note: The subqueries to get IDs (tables.id, dishes.id, menu_extras.id)
         # require these tables and their data to be present.
         # Ensure your dependencies are correctly ordered!
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             --1. Completed Dine-in Order
             INSERT INTO orders (table_id, status, created_at, end_at)
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_orders_and_items'),
+    ]
+
+    operations = [
+        # --- Composite indexes backing the filtered, cursor-paginated order list ---
+        PostgresRunSQL(
+            sql="""
+            CREATE INDEX idx_orders_status_created ON orders (status, created_at);
+            CREATE INDEX idx_orders_table_status ON orders (table_id, status);
+            """,
+            reverse_sql="""
+            DROP INDEX idx_orders_status_created;
+            DROP INDEX idx_orders_table_status;
+            """,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='order',
+                    index=models.Index(fields=['status', 'created_at'], name='idx_orders_status_created'),
+                ),
+                migrations.AddIndex(
+                    model_name='order',
+                    index=models.Index(fields=['table', 'status'], name='idx_orders_table_status'),
+                ),
+            ]
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_orders_listing_indexes'),
+    ]
+
+    operations = [
+        # --- Partial index backing the kitchen feed (undelivered items only) ---
+        PostgresRunSQL(
+            sql="""
+            CREATE INDEX idx_order_items_pending ON order_items (added_at) WHERE NOT is_delivered;
+            """,
+            reverse_sql="""
+            DROP INDEX idx_order_items_pending;
+            """,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='orderitem',
+                    index=models.Index(
+                        fields=['added_at'],
+                        condition=models.Q(is_delivered=False),
+                        name='idx_order_items_pending'
+                    ),
+                ),
+            ]
+        ),
+    ]
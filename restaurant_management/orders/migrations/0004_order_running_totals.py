@@ -0,0 +1,59 @@
+from decimal import Decimal
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_items_pending_index'),
+    ]
+
+    operations = [
+        # --- Denormalized running totals on orders ---
+        PostgresRunSQL(
+            sql="""
+            ALTER TABLE orders
+                ADD COLUMN item_count INTEGER NOT NULL DEFAULT 0,
+                ADD COLUMN running_subtotal NUMERIC(10, 2) NOT NULL DEFAULT 0.00;
+            """,
+            reverse_sql="""
+            ALTER TABLE orders
+                DROP COLUMN item_count,
+                DROP COLUMN running_subtotal;
+            """,
+            state_operations=[
+                migrations.AddField(
+                    model_name='order',
+                    name='item_count',
+                    field=models.IntegerField(default=0),
+                ),
+                migrations.AddField(
+                    model_name='order',
+                    name='running_subtotal',
+                    field=models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00')),
+                ),
+            ]
+        ),
+
+        # --- Backfill totals for existing orders ---
+        PostgresRunSQL(
+            sql="""
+            UPDATE orders
+            SET item_count = totals.item_count,
+                running_subtotal = totals.running_subtotal
+            FROM (
+                SELECT
+                    oi.order_id,
+                    SUM(oi.quantity) AS item_count,
+                    SUM(d.price * oi.quantity + COALESCE(me.price, 0)) AS running_subtotal
+                FROM order_items oi
+                JOIN dishes d ON d.id = oi.menu_item_id
+                LEFT JOIN menu_extras me ON me.id = oi.menu_extra_id
+                GROUP BY oi.order_id
+            ) AS totals
+            WHERE orders.id = totals.order_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
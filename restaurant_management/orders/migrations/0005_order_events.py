@@ -0,0 +1,66 @@
+from django.db import migrations, models
+import django.utils.timezone
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_running_totals'),
+    ]
+
+    operations = [
+        # --- Create append-only order_events table ---
+        PostgresRunSQL(
+            sql="""
+            CREATE TABLE order_events (
+                id SERIAL PRIMARY KEY,
+                order_id INTEGER NOT NULL,
+                event_type VARCHAR(20) NOT NULL,
+                from_status VARCHAR(20),
+                to_status VARCHAR(20),
+                from_table_id INTEGER,
+                to_table_id INTEGER,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE
+            );
+            CREATE INDEX idx_order_events_order_created ON order_events (order_id, created_at);
+            """,
+            reverse_sql="""
+            DROP TABLE order_events;
+            """,
+            state_operations=[
+                migrations.CreateModel(
+                    name='OrderEvent',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('order', models.ForeignKey(
+                            on_delete=models.CASCADE,   # Matches ON DELETE CASCADE
+                            related_name='events',
+                            to='orders.order',
+                        )),
+                        ('event_type', models.CharField(max_length=20, choices=[
+                            ('STARTED', 'Started'),
+                            ('STATUS_CHANGED', 'Status Changed'),
+                            ('TABLE_MOVED', 'Table Moved'),
+                            ('COMPLETED', 'Completed'),
+                            ('CANCELLED', 'Cancelled'),
+                        ])),
+                        ('from_status', models.CharField(max_length=20, null=True, blank=True)),
+                        ('to_status', models.CharField(max_length=20, null=True, blank=True)),
+                        ('from_table_id', models.IntegerField(null=True, blank=True)),
+                        ('to_table_id', models.IntegerField(null=True, blank=True)),
+                        ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                    ],
+                    options={
+                        'db_table': 'order_events',
+                        'verbose_name': 'Order Event',
+                        'verbose_name_plural': 'Order Events',
+                        'indexes': [
+                            models.Index(fields=['order', 'created_at'], name='idx_order_events_order_created'),
+                        ],
+                    },
+                ),
+            ]
+        ),
+    ]
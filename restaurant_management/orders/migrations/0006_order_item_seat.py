@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_events'),
+    ]
+
+    operations = [
+        # --- Guest seat of each item, used to split the check by seat ---
+        PostgresRunSQL(
+            sql="""
+            ALTER TABLE order_items ADD COLUMN seat SMALLINT NULL CHECK (seat >= 0);
+            """,
+            reverse_sql="""
+            ALTER TABLE order_items DROP COLUMN seat;
+            """,
+            state_operations=[
+                migrations.AddField(
+                    model_name='orderitem',
+                    name='seat',
+                    field=models.PositiveSmallIntegerField(null=True, blank=True),
+                ),
+            ]
+        ),
+    ]
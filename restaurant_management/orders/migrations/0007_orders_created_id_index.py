@@ -0,0 +1,27 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_item_seat'),
+    ]
+
+    operations = [
+        # --- Index backing the (created_at, id) keyset seek of the order list ---
+        PostgresRunSQL(
+            sql="""
+            CREATE INDEX idx_orders_created_id ON orders (created_at DESC, id DESC);
+            """,
+            reverse_sql="""
+            DROP INDEX idx_orders_created_id;
+            """,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='order',
+                    index=models.Index(fields=['-created_at', '-id'], name='idx_orders_created_id'),
+                ),
+            ]
+        ),
+    ]
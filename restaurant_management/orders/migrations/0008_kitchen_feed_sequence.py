@@ -0,0 +1,88 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_orders_created_id_index'),
+    ]
+
+    operations = [
+        # --- Commit-ordered counter for the kitchen feed ---
+        PostgresRunSQL(
+            sql="""
+            CREATE TABLE kitchen_feed_sequence (
+                id SERIAL PRIMARY KEY,
+                value BIGINT NOT NULL DEFAULT 0
+            );
+            """,
+            reverse_sql="""
+            DROP TABLE kitchen_feed_sequence;
+            """,
+            state_operations=[
+                migrations.CreateModel(
+                    name='KitchenFeedSequence',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('value', models.BigIntegerField(default=0)),
+                    ],
+                    options={
+                        'db_table': 'kitchen_feed_sequence',
+                        'verbose_name': 'Kitchen Feed Sequence',
+                        'verbose_name_plural': 'Kitchen Feed Sequence',
+                    },
+                ),
+            ]
+        ),
+
+        # --- The counter's only row; plain SQL so every backend gets it ---
+        migrations.RunSQL(
+            sql="INSERT INTO kitchen_feed_sequence (id, value) VALUES (1, 0);",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+
+        # --- Feed position of each item; existing items share position 0 and are ordered by id ---
+        PostgresRunSQL(
+            sql="""
+            ALTER TABLE order_items ADD COLUMN feed_sequence BIGINT NULL;
+            UPDATE order_items SET feed_sequence = 0;
+            """,
+            reverse_sql="""
+            ALTER TABLE order_items DROP COLUMN feed_sequence;
+            """,
+            state_operations=[
+                migrations.AddField(
+                    model_name='orderitem',
+                    name='feed_sequence',
+                    field=models.BigIntegerField(null=True, blank=True),
+                ),
+            ]
+        ),
+
+        # --- The kitchen feed now seeks on (feed_sequence, id) instead of added_at ---
+        PostgresRunSQL(
+            sql="""
+            DROP INDEX idx_order_items_pending;
+            CREATE INDEX idx_order_items_pending ON order_items (feed_sequence, id) WHERE NOT is_delivered;
+            """,
+            reverse_sql="""
+            DROP INDEX idx_order_items_pending;
+            CREATE INDEX idx_order_items_pending ON order_items (added_at) WHERE NOT is_delivered;
+            """,
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='orderitem',
+                    name='idx_order_items_pending',
+                ),
+                migrations.AddIndex(
+                    model_name='orderitem',
+                    index=models.Index(
+                        fields=['feed_sequence', 'id'],
+                        condition=models.Q(is_delivered=False),
+                        name='idx_order_items_pending'
+                    ),
+                ),
+            ]
+        ),
+    ]
@@ -0,0 +1,50 @@
+from decimal import Decimal
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_kitchen_feed_sequence'),
+    ]
+
+    operations = [
+        # --- Prices of the dish and extra as they were when the item was added ---
+        PostgresRunSQL(
+            sql="""
+            ALTER TABLE order_items
+                ADD COLUMN unit_price NUMERIC(10, 2) NULL,
+                ADD COLUMN extra_price NUMERIC(10, 2) NOT NULL DEFAULT 0.00;
+            """,
+            reverse_sql="""
+            ALTER TABLE order_items
+                DROP COLUMN unit_price,
+                DROP COLUMN extra_price;
+            """,
+            state_operations=[
+                migrations.AddField(
+                    model_name='orderitem',
+                    name='unit_price',
+                    field=models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00')),
+                    preserve_default=False,
+                ),
+                migrations.AddField(
+                    model_name='orderitem',
+                    name='extra_price',
+                    field=models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00')),
+                ),
+            ]
+        ),
+
+        # --- Backfill existing items with the current menu prices ---
+        PostgresRunSQL(
+            sql="""
+            UPDATE order_items
+            SET unit_price = (SELECT price FROM dishes WHERE dishes.id = order_items.menu_item_id),
+                extra_price = COALESCE((SELECT price FROM menu_extras WHERE menu_extras.id = order_items.menu_extra_id), 0);
+            ALTER TABLE order_items ALTER COLUMN unit_price SET NOT NULL;
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
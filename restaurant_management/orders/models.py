@@ -1,7 +1,28 @@
+from decimal import Decimal
 from django.db import models
+from django.db.models import Prefetch, Q
 from django.utils import timezone
 
 
+class OrderQuerySet(models.QuerySet):
+    """Custom QuerySet for Order model with eager-loading query plans."""
+
+    def with_items(self):
+        """
+        Load orders with their table and items in a fixed number of queries.
+
+        Returns:
+            QuerySet joining the table and prefetching order items along with
+            their dish and extra, so serializing N orders costs 2 queries.
+        """
+        return self.select_related('table').prefetch_related(
+            Prefetch(
+                'order_items',
+                queryset=OrderItem.objects.select_related('menu_item', 'menu_extra')
+            )
+        )
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('IN_PROGRESS', 'In Progress'),
@@ -13,11 +34,21 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
     end_at = models.DateTimeField(null=True, blank=True)
+    # Denormalized running totals, maintained by OrderItemService on every add/delete
+    item_count = models.IntegerField(default=0)
+    running_subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
+
+    objects = OrderQuerySet.as_manager()
 
     class Meta:
         db_table = 'orders'
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='idx_orders_status_created'),
+            models.Index(fields=['table', 'status'], name='idx_orders_table_status'),
+            models.Index(fields=['-created_at', '-id'], name='idx_orders_created_id'),
+        ]
 
     def __str__(self):
         return f'Order {self.id} - Table {self.table.number}'
@@ -37,15 +68,75 @@ class OrderItem(models.Model):
     added_at = models.DateTimeField(auto_now_add=True)
     menu_extra = models.ForeignKey('menu.MenuExtra', on_delete=models.PROTECT, related_name='order_items', null=True)
     quantity = models.IntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)  # Dish price when the item was added
+    extra_price = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))  # Extra price when the item was added
     notes = models.TextField(null=True, blank=True) 
     is_delivered = models.BooleanField(default=False)
+    seat = models.PositiveSmallIntegerField(null=True, blank=True)  # Guest seat, for split checks; null for shared items
+    feed_sequence = models.BigIntegerField(null=True, blank=True)  # Kitchen feed position, stamped at commit time; see KitchenFeedSequence
 
     class Meta:
         db_table = 'order_items'
         verbose_name = 'Order Item'
         verbose_name_plural = 'Order Items'
+        indexes = [
+            models.Index(fields=['feed_sequence', 'id'], condition=Q(is_delivered=False), name='idx_order_items_pending'),
+        ]
 
     def __str__(self):
         return f'{self.menu_item.name} - Order {self.order.id if self.order else "Unknown"}'
 
 
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only audit record of an order state transition.
+    Rows are only ever inserted (see OrderEventService), never updated.
+    """
+    EVENT_TYPES = [
+        ('STARTED', 'Started'),
+        ('STATUS_CHANGED', 'Status Changed'),
+        ('TABLE_MOVED', 'Table Moved'),
+        ('COMPLETED', 'Completed'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='events')
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    from_status = models.CharField(max_length=20, null=True, blank=True)
+    to_status = models.CharField(max_length=20, null=True, blank=True)
+    from_table_id = models.IntegerField(null=True, blank=True)
+    to_table_id = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'order_events'
+        verbose_name = 'Order Event'
+        verbose_name_plural = 'Order Events'
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='idx_order_events_order_created'),
+        ]
+
+    def __str__(self):
+        return f'Order {self.order_id} - {self.event_type}'
+
+
+class KitchenFeedSequence(models.Model):
+    """
+    Single-row counter that orders the kitchen feed.
+    Each transaction adding order items bumps it as its last write and stamps the
+    items with the new value. The row stays locked until that transaction commits,
+    so sequence values become visible in commit order.
+    """
+    ROW_ID = 1
+
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'kitchen_feed_sequence'
+        verbose_name = 'Kitchen Feed Sequence'
+        verbose_name_plural = 'Kitchen Feed Sequence'
+
+    def __str__(self):
+        return f'Kitchen feed sequence {self.value}'
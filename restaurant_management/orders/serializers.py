@@ -1,6 +1,7 @@
+from decimal import Decimal
 from rest_framework import serializers
 from django.utils import timezone
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderEvent
 from menu.models import Dish
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -11,11 +12,14 @@ class OrderItemSerializer(serializers.ModelSerializer):
             'menu_item',
             'menu_extra',
             'quantity',
+            'unit_price',
+            'extra_price',
             'notes',
+            'seat',
             'is_delivered',
             'added_at'
         ]
-        read_only_fields = ['id', 'added_at']
+        read_only_fields = ['id', 'unit_price', 'extra_price', 'added_at']
     
     def validate_quantity(self, value):
         """Ensure quantity is between 1 and 100"""
@@ -32,6 +36,69 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return value
 
 
+class KitchenItemSerializer(serializers.ModelSerializer):
+    """
+    Read-only view of a pending item for the kitchen display
+    """
+    order_id = serializers.IntegerField(read_only=True)
+    table_number = serializers.CharField(source='order.table.number', read_only=True, default=None)
+    menu_item_name = serializers.CharField(source='menu_item.name', read_only=True)
+    menu_extra_name = serializers.CharField(source='menu_extra.name', read_only=True, default=None)
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id',
+            'order_id',
+            'table_number',
+            'menu_item',
+            'menu_item_name',
+            'menu_extra',
+            'menu_extra_name',
+            'quantity',
+            'notes',
+            'added_at'
+        ]
+        read_only_fields = fields
+
+
+class OrderEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderEvent
+        fields = [
+            'id',
+            'order',
+            'event_type',
+            'from_status',
+            'to_status',
+            'from_table_id',
+            'to_table_id',
+            'created_at'
+        ]
+        read_only_fields = fields
+
+
+class OrderItemCreateSerializer(serializers.Serializer):
+    """
+    Input serializer for adding items to an existing order.
+    Dish and extra are accepted as plain IDs so a batch can be resolved
+    with one query per table instead of one lookup per item.
+    """
+    menu_item = serializers.IntegerField(min_value=1)
+    menu_extra = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    quantity = serializers.IntegerField(default=1)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    seat = serializers.IntegerField(min_value=1, max_value=50, required=False, allow_null=True)
+
+    def validate_quantity(self, value):
+        """Ensure quantity is between 1 and 100"""
+        if value < 1:
+            raise serializers.ValidationError("Quantity must be at least 1")
+        if value > 100:
+            raise serializers.ValidationError("Quantity cannot exceed 100")
+        return value
+
+
 class OrderSerializer(serializers.ModelSerializer):
     order_items = OrderItemSerializer(many=True, required=False)
     
@@ -43,9 +110,11 @@ class OrderSerializer(serializers.ModelSerializer):
             'status',
             'created_at',
             'end_at',
+            'item_count',
+            'running_subtotal',
             'order_items'
         ]
-        read_only_fields = ['id', 'created_at', 'end_at']
+        read_only_fields = ['id', 'created_at', 'end_at', 'item_count', 'running_subtotal']
     
     def validate_status(self, value):
         """Validate status choices"""
@@ -74,7 +143,13 @@ class OrderSerializer(serializers.ModelSerializer):
         order = Order.objects.create(**validated_data)
         
         for item_data in order_items_data:
-            OrderItem.objects.create(order=order, **item_data)
+            menu_extra = item_data.get('menu_extra')
+            OrderItem.objects.create(
+                order=order,
+                unit_price=item_data['menu_item'].price,
+                extra_price=menu_extra.price if menu_extra else Decimal('0.00'),
+                **item_data
+            )
         
         return order
     
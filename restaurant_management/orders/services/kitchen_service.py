@@ -0,0 +1,119 @@
+from typing import List, Optional, Tuple
+from django.db.models import Q
+import logging
+import time
+
+from ..models import OrderItem, KitchenFeedSequence
+from ..exceptions import InvalidKitchenCursor
+
+logger = logging.getLogger(__name__)
+
+class KitchenService:
+    """
+    Service for the kitchen display feed: undelivered items of in-progress orders.
+
+    The feed is ordered by `OrderItem.feed_sequence`, which the adding transaction stamps
+    as its last write while holding the `KitchenFeedSequence` row lock. Sequence values
+    therefore commit in order, and the cursor never moves past an item still in flight.
+    """
+    DEFAULT_FEED_LIMIT = 100
+    MAX_FEED_LIMIT = 500
+    MAX_WAIT_SECONDS = 25
+    POLL_INTERVAL_SECONDS = 1
+    MAX_ITEMS_PER_DELIVERY = 500
+
+    @classmethod
+    def publish_items(cls, items: List[OrderItem]) -> None:
+        """
+        Stamps newly added items with the next feed sequence value.
+        Must be the last write of the transaction that added the items: the sequence
+        row stays locked from here until commit, serialising concurrent publishers.
+
+        Args:
+            items: The saved items of the current transaction
+        """
+        sequence, _ = KitchenFeedSequence.objects.select_for_update().get_or_create(id=KitchenFeedSequence.ROW_ID)
+        sequence.value += 1
+        sequence.save(update_fields=['value'])
+
+        OrderItem.objects.filter(id__in=[item.id for item in items]).update(feed_sequence=sequence.value)
+        for item in items:
+            item.feed_sequence = sequence.value
+
+    @classmethod
+    def get_pending_items(cls, cursor: Optional[str] = None, limit: int = DEFAULT_FEED_LIMIT) -> Tuple[List[OrderItem], Optional[str]]:
+        """
+        Returns undelivered items of IN_PROGRESS orders published after the cursor, in commit order.
+
+        Args:
+            cursor: Opaque cursor returned by a previous call, or None to start from the beginning
+            limit: Maximum number of items to return
+
+        Returns:
+            Tuple of (items, cursor to send on the next call)
+        """
+        limit = max(1, min(limit, cls.MAX_FEED_LIMIT))
+        queryset = OrderItem.objects.filter(
+            is_delivered=False,
+            order__status='IN_PROGRESS',
+            feed_sequence__isnull=False
+        ).select_related('order__table', 'menu_item', 'menu_extra').order_by('feed_sequence', 'id')
+
+        if cursor:
+            sequence, item_id = cls._decode_cursor(cursor)
+            queryset = queryset.filter(Q(feed_sequence__gt=sequence) | Q(feed_sequence=sequence, id__gt=item_id))
+
+        items = list(queryset[:limit])
+        next_cursor = cls._encode_cursor(items[-1]) if items else cursor
+        return items, next_cursor
+
+    @classmethod
+    def wait_for_pending_items(cls, cursor: Optional[str] = None, limit: int = DEFAULT_FEED_LIMIT, wait_seconds: int = 0) -> Tuple[List[OrderItem], Optional[str]]:
+        """
+        Long-poll variant of `get_pending_items`: if nothing new is pending, watches the
+        feed sequence every `POLL_INTERVAL_SECONDS` (a primary-key read) and only re-runs
+        the feed query once another transaction has published items, or `wait_seconds` elapse.
+        """
+        if wait_seconds <= 0:
+            return cls.get_pending_items(cursor, limit)
+
+        deadline = time.monotonic() + min(wait_seconds, cls.MAX_WAIT_SECONDS)
+        while True:
+            published = cls._get_published_sequence()
+            items, next_cursor = cls.get_pending_items(cursor, limit)
+            if items or time.monotonic() >= deadline:
+                return items, next_cursor
+
+            while cls._get_published_sequence() == published and time.monotonic() < deadline:
+                time.sleep(cls.POLL_INTERVAL_SECONDS)
+
+    @classmethod
+    def mark_items_delivered(cls, item_ids: List[int]) -> int:
+        """
+        Flags many items as delivered with a single UPDATE.
+
+        Args:
+            item_ids: IDs of the order items served by the kitchen
+
+        Returns:
+            Number of items that were pending and are now delivered
+        """
+        updated = OrderItem.objects.filter(id__in=item_ids, is_delivered=False).update(is_delivered=True)
+        logger.info(f"{updated} of {len(item_ids)} order items marked as delivered.")
+        return updated
+
+    @classmethod
+    def _get_published_sequence(cls) -> int:
+        return KitchenFeedSequence.objects.filter(id=KitchenFeedSequence.ROW_ID).values_list('value', flat=True).first() or 0
+
+    @classmethod
+    def _encode_cursor(cls, item: OrderItem) -> str:
+        return f"{item.feed_sequence}-{item.id}"
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str) -> Tuple[int, int]:
+        try:
+            sequence, item_id = cursor.split('-')
+            return int(sequence), int(item_id)
+        except ValueError:
+            raise InvalidKitchenCursor(f"Invalid kitchen feed cursor '{cursor}'.")
@@ -0,0 +1,137 @@
+import time
+from datetime import date, datetime, time as datetime_time, timedelta
+from typing import Optional
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+from ..models import Order
+from ..exceptions import InvalidAnalyticsRange
+from shared.cache.django_cache_manager import CacheManager
+import logging
+
+logger = logging.getLogger(__name__)
+
+class OrderAnalyticsService:
+    """
+    Table-turn and order-duration reporting over completed orders.
+    Every figure is computed by a single aggregate query; results are cached per
+    (date range, granularity) and invalidated whenever an order completes.
+    """
+    GRANULARITIES = {
+        'hour': TruncHour,
+        'day': TruncDay,
+    }
+    DEFAULT_RANGE_DAYS = 7
+    MAX_RANGE_DAYS = 366
+    VERSION_KEY = 'version'
+
+    cache_manager = CacheManager('order_analytics_')
+
+    @classmethod
+    def get_table_turn_report(
+        cls,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        granularity: str = 'hour'
+    ) -> dict:
+        """
+        Returns average order duration, covers and turns, overall, per table and per
+        time bucket, for orders created between `date_from` and `date_to` (inclusive).
+
+        Covers are counted as the seating capacity of the table, since orders don't
+        record a party size.
+
+        Raises:
+            InvalidAnalyticsRange: If the range is inverted or too long, or the granularity is unknown
+        """
+        date_to = date_to or timezone.localdate()
+        date_from = date_from or date_to - timedelta(days=cls.DEFAULT_RANGE_DAYS - 1)
+        cls._validate_range(date_from, date_to, granularity)
+
+        cache_key = cls._get_cache_key(date_from, date_to, granularity)
+        report = cls.cache_manager.get(cache_key)
+        if report is not None:
+            return report
+
+        orders = cls._completed_orders(date_from, date_to)
+        report = {
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'granularity': granularity,
+            'summary': cls._format_row(orders.aggregate(**cls._metrics())),
+            'tables': [
+                cls._format_row(row)
+                for row in orders.values('table_id', 'table__number')
+                                 .annotate(**cls._metrics())
+                                 .order_by('table__number')
+            ],
+            'buckets': [
+                cls._format_row(row)
+                for row in orders.annotate(bucket=cls.GRANULARITIES[granularity]('created_at'))
+                                 .values('bucket')
+                                 .annotate(**cls._metrics())
+                                 .order_by('bucket')
+            ],
+        }
+
+        cls.cache_manager.set(cache_key, report)
+        logger.debug(f"Order analytics cached under {cache_key}.")
+        return report
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """
+        Invalidates every cached report at once by rotating the version that is part
+        of each cache key.
+        """
+        cls.cache_manager.set_persistent(cls.cache_manager.get_cache_key(cls.VERSION_KEY), time.time_ns())
+
+    @classmethod
+    def _completed_orders(cls, date_from: date, date_to: date) -> QuerySet:
+        tz = timezone.get_current_timezone()
+        return Order.objects.filter(
+            status='COMPLETED',
+            end_at__isnull=False,
+            created_at__gte=datetime.combine(date_from, datetime_time.min, tzinfo=tz),
+            created_at__lt=datetime.combine(date_to + timedelta(days=1), datetime_time.min, tzinfo=tz),
+        )
+
+    @staticmethod
+    def _metrics() -> dict:
+        duration = ExpressionWrapper(F('end_at') - F('created_at'), output_field=DurationField())
+        return {
+            'turns': Count('id'),
+            'covers': Sum('table__capacity'),
+            'avg_duration': Avg(duration),
+        }
+
+    @staticmethod
+    def _format_row(row: dict) -> dict:
+        avg_duration = row.pop('avg_duration')
+        row['covers'] = row['covers'] or 0
+        row['avg_duration_minutes'] = round(avg_duration.total_seconds() / 60, 1) if avg_duration else None
+        if 'table__number' in row:
+            row['table_number'] = row.pop('table__number')
+        if isinstance(row.get('bucket'), datetime):
+            row['bucket'] = row['bucket'].isoformat()
+        return row
+
+    @classmethod
+    def _get_cache_key(cls, date_from: date, date_to: date, granularity: str) -> str:
+        version_key = cls.cache_manager.get_cache_key(cls.VERSION_KEY)
+        version = cls.cache_manager.get(version_key)
+        if version is None:
+            version = time.time_ns()
+            cls.cache_manager.set_persistent(version_key, version)
+        return cls.cache_manager.get_cache_key(f"{version}_{date_from}_{date_to}_{granularity}")
+
+    @classmethod
+    def _validate_range(cls, date_from: date, date_to: date, granularity: str) -> None:
+        if granularity not in cls.GRANULARITIES:
+            raise InvalidAnalyticsRange(
+                f"Granularity must be one of {', '.join(cls.GRANULARITIES)}."
+            )
+        if date_from > date_to:
+            raise InvalidAnalyticsRange("'date_from' must not be after 'date_to'.")
+        if (date_to - date_from).days >= cls.MAX_RANGE_DAYS:
+            raise InvalidAnalyticsRange(f"The date range can't exceed {cls.MAX_RANGE_DAYS} days.")
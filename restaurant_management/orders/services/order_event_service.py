@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Optional
+from django.db.models import QuerySet
+from ..models import Order, OrderEvent
+import logging
+
+logger = logging.getLogger(__name__)
+
+class OrderEventService:
+    """
+    Append-only audit trail of order state transitions.
+
+    Each event is inserted inside the transaction of the transition it records,
+    so it commits or rolls back (savepoints included) together with it.
+    """
+
+    @classmethod
+    def record(
+        cls,
+        order: Order,
+        event_type: str,
+        from_status: Optional[str] = None,
+        to_status: Optional[str] = None,
+        from_table_id: Optional[int] = None,
+        to_table_id: Optional[int] = None
+    ) -> None:
+        """
+        Writes a transition event for the order with a single INSERT.
+        """
+        OrderEvent.objects.create(
+            order_id=order.id,
+            event_type=event_type,
+            from_status=from_status,
+            to_status=to_status,
+            from_table_id=from_table_id,
+            to_table_id=to_table_id
+        )
+
+    @classmethod
+    def get_order_events(
+        cls,
+        order_id: int,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> QuerySet:
+        """
+        Returns the transitions of an order in chronological order.
+        Served by the `(order_id, created_at)` index.
+        """
+        queryset = OrderEvent.objects.filter(order_id=order_id)
+        if created_from:
+            queryset = queryset.filter(created_at__gte=created_from)
+        if created_to:
+            queryset = queryset.filter(created_at__lte=created_to)
+        return queryset.order_by('created_at', 'id')
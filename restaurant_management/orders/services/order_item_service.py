@@ -1,46 +1,114 @@
-from typing import List
+from decimal import Decimal
+from collections import Counter
+from typing import Dict, List, Tuple
 from django.db import transaction
+from django.db.models import F
 from ..models import OrderItem, Order
+from menu.models import Dish, MenuExtra
+from shared.utils.price_calculator import PriceCalculator
+from stock.services.stock_transaction_service import StockTransactionService
+from .kitchen_service import KitchenService
 from shared.exceptions.custom_exceptions import BusinessRuleViolationException, EntityNotFoundException
+from shared.utils.iterables import iter_chunks
 import logging
 
 logger = logging.getLogger(__name__)
 
 class OrderItemService:
     MAX_ALLOWED_ITEMS_PER_REQUEST = 10
+    MAX_ALLOWED_ITEMS_PER_BATCH = 500
+    BATCH_CHUNK_SIZE = 100
 
     @classmethod
-    def add_items(cls, order: Order, items_validated_data: List) -> Order:
+    def add_items(cls, order: Order, items_validated_data: List[dict]) -> List[OrderItem]:
         """
-        Adds multiple items to an order with validation and atomic transaction
+        Adds multiple items to an order with validation and atomic transaction.
+        All referenced dishes and extras are resolved with a single `in_bulk` query each,
+        and the ingredients of the dishes are taken out of stock in the same transaction.
+        The items are published to the kitchen feed as the transaction's last write.
         
         Args:
             order: The Order instance to add items to
-            items_validated_data: List of validated item data dictionaries
+            items_validated_data: List of validated item dictionaries holding
+                `menu_item` and optional `menu_extra` IDs
             
         Returns:
-            The updated Order instance
+            The created OrderItem instances
             
         Raises:
-            BusinessRuleViolationException: If item limits are exceeded
+            BusinessRuleViolationException: If item limits are exceeded or a dish is not active
+            EntityNotFoundException: If any referenced dish or extra does not exist
+            InsufficientStockError: If an ingredient of the dishes is out of stock
         """
         cls._validate_item_length_limit(items_validated_data)
         cls._validate_active_order(order)
+        dishes, extras = cls._resolve_menu_references(items_validated_data)
 
         try:
             with transaction.atomic():
-                items = cls._generate_items(order, items_validated_data)
-                OrderItem.objects.bulk_create(items)
-                order.refresh_from_db()
-                return order
+                items = cls._generate_items(order, items_validated_data, dishes, extras)
+                created_items = OrderItem.objects.bulk_create(items)
+                cls._apply_running_totals(order, items)
+                cls._consume_ingredients(order, items)
+                KitchenService.publish_items(created_items)
+                return created_items
         except Exception as e:
             logger.error(f"Error adding items to order {order.id}: {str(e)}", exc_info=True)
             raise
 
+    @classmethod
+    def add_items_batch(cls, order: Order, numbered_items: List[Tuple[int, dict]]) -> Tuple[List[OrderItem], List[dict]]:
+        """
+        Adds a large batch of items (banquets, catering) to an order in one transaction.
+        Dishes and extras are resolved in chunks of `BATCH_CHUNK_SIZE` and the rows are
+        inserted with a chunked `bulk_create`. Nothing is inserted if any line fails.
+        The ingredients of the dishes are taken out of stock in the same transaction,
+        and the items are published to the kitchen feed as its last write.
+        
+        Args:
+            order: The Order instance to add items to
+            numbered_items: (line number, validated item data) pairs
+            
+        Returns:
+            Tuple of (created OrderItem instances, per-line errors). When errors are
+            returned the created list is empty.
+            
+        Raises:
+            BusinessRuleViolationException: If the batch is too large or the order is finished
+            InsufficientStockError: If an ingredient of the dishes is out of stock
+        """
+        if len(numbered_items) > cls.MAX_ALLOWED_ITEMS_PER_BATCH:
+            raise BusinessRuleViolationException(
+                f"Cannot process more than {cls.MAX_ALLOWED_ITEMS_PER_BATCH} items in a batch"
+            )
+        cls._validate_active_order(order)
+
+        dishes, extras = {}, {}
+        line_errors = []
+        for chunk in iter_chunks(numbered_items, cls.BATCH_CHUNK_SIZE):
+            line_errors.extend(cls._resolve_batch_chunk(chunk, dishes, extras))
+
+        if line_errors:
+            return [], line_errors
+
+        try:
+            with transaction.atomic():
+                items = cls._generate_items(order, [item for _, item in numbered_items], dishes, extras)
+                created_items = OrderItem.objects.bulk_create(items, batch_size=cls.BATCH_CHUNK_SIZE)
+                cls._apply_running_totals(order, items)
+                cls._consume_ingredients(order, items)
+                KitchenService.publish_items(created_items)
+                logger.info(f"Batch of {len(created_items)} items added to order {order.id}")
+                return created_items, []
+        except Exception as e:
+            logger.error(f"Error adding item batch to order {order.id}: {str(e)}", exc_info=True)
+            raise
+
     @classmethod    
     def delete_items(cls, order: Order, items_ids: List[int]) -> None:
         """
-        Deletes multiple items from an order with validation
+        Deletes multiple items from an order with validation. The ingredients of
+        the items not yet delivered are returned to stock
         
         Args:
             order: The Order instance
@@ -51,31 +119,42 @@ class OrderItemService:
         """
         try:
             with transaction.atomic():
-                existing_items = OrderItem.objects.filter(
+                existing_items = OrderItem.objects.select_for_update().filter(
                     id__in=items_ids, 
                     order=order
                 )
+                items_to_delete = list(existing_items)
                 
-                if existing_items.count() != len(items_ids):
-                    found_ids = set(existing_items.values_list('id', flat=True))
+                if len(items_to_delete) != len(set(items_ids)):
+                    found_ids = {item.id for item in items_to_delete}
                     missing_ids = set(items_ids) - found_ids
                     raise EntityNotFoundException(
                         f"Order Items {list(missing_ids)} not found in order {order.id}", 
                     )
                 
-                existing_items.delete()
+                OrderItem.objects.filter(id__in=[item.id for item in items_to_delete]).delete()
+                cls._apply_running_totals(order, items_to_delete, removed=True)
+                cls.return_ingredients(order, [item for item in items_to_delete if not item.is_delivered])
         except Exception as e:
             logger.error(f"Error deleting items from order {order.id}: {str(e)}", exc_info=True)
             raise
     
     @classmethod
-    def _generate_items(cls, order: Order, items_data: List[dict]) -> List[OrderItem]:
+    def _generate_items(
+        cls, 
+        order: Order, 
+        items_data: List[dict], 
+        dishes: Dict[int, Dish], 
+        extras: Dict[int, MenuExtra]
+    ) -> List[OrderItem]:
         """
-        Generates OrderItem instances from validated data
+        Generates OrderItem instances from validated data, priced at the current menu prices
         
         Args:
             order: The Order instance
             items_data: List of validated item data dictionaries
+            dishes: Dishes referenced by the items, keyed by ID
+            extras: Extras referenced by the items, keyed by ID
             
         Returns:
             List of unsaved OrderItem instances
@@ -83,14 +162,158 @@ class OrderItemService:
         return [
             OrderItem(
                 order=order,
-                menu_item=item['menu_item'],
+                menu_item=dishes[item['menu_item']],
+                menu_extra=extras.get(item.get('menu_extra')),
                 quantity=item.get('quantity', 1),
+                unit_price=dishes[item['menu_item']].price,
+                extra_price=PriceCalculator.calculate_menu_extra_charges(extras.get(item.get('menu_extra'))),
                 notes=item.get('notes', ''),
+                seat=item.get('seat'),
                 is_delivered=False
             )
             for item in items_data
         ]
+
+    @classmethod
+    def _apply_running_totals(cls, order: Order, items: List[OrderItem], removed: bool = False) -> None:
+        """
+        Increments (or decrements) the order's denormalized item count and subtotal
+        with a single F() expression UPDATE, so concurrent adds don't lose each other.
+        
+        Args:
+            order: The Order the items belong to
+            items: Items with the prices they were added at
+            removed: True when the items were deleted from the order
+        """
+        quantity_delta = sum(item.quantity for item in items)
+        subtotal_delta = sum((cls._calculate_item_subtotal(item) for item in items), Decimal('0.00'))
+        if removed:
+            quantity_delta, subtotal_delta = -quantity_delta, -subtotal_delta
+
+        Order.objects.filter(id=order.id).update(
+            item_count=F('item_count') + quantity_delta,
+            running_subtotal=F('running_subtotal') + subtotal_delta
+        )
+
+    @classmethod
+    def _consume_ingredients(cls, order: Order, items: List[OrderItem]) -> None:
+        """
+        Takes the recipe ingredients of the items' dishes out of stock, with one
+        grouped UPDATE for all affected stocks and one bulk INSERT of OUT transactions
+        
+        Args:
+            order: The Order the items belong to
+            items: The added items
+        """
+        portions_by_dish = Counter()
+        for item in items:
+            portions_by_dish[item.menu_item_id] += item.quantity
+
+        StockTransactionService.consume_dish_portions(portions_by_dish, notes=f"Order {order.id}")
+
+    @classmethod
+    def return_ingredients(cls, order: Order, items: List[OrderItem]) -> None:
+        """
+        Puts the recipe ingredients of items that won't be served back in stock, with
+        one grouped UPDATE and one bulk INSERT of IN transactions
+        
+        Args:
+            order: The Order the items belong to
+            items: The removed or cancelled items
+        """
+        portions_by_dish = Counter()
+        for item in items:
+            portions_by_dish[item.menu_item_id] += item.quantity
+
+        if portions_by_dish:
+            StockTransactionService.return_dish_portions(portions_by_dish, notes=f"Order {order.id} returned")
+
+    @classmethod
+    def _calculate_item_subtotal(cls, item: OrderItem) -> Decimal:
+        base_price = PriceCalculator.calculate_item_base_price(item.unit_price, item.quantity)
+        return PriceCalculator.calculate_item_total_price(base_price, item.extra_price)
+
+    @classmethod
+    def _resolve_menu_references(cls, items_data: List[dict]) -> Tuple[Dict[int, Dish], Dict[int, MenuExtra]]:
+        """
+        Loads every dish and extra referenced by the items in one query per table
+        
+        Args:
+            items_data: List of validated item data dictionaries
+            
+        Returns:
+            Tuple of (dishes by ID, extras by ID)
+            
+        Raises:
+            EntityNotFoundException: If any dish or extra does not exist
+            BusinessRuleViolationException: If any dish is not ACTIVE
+        """
+        dish_ids = {item['menu_item'] for item in items_data}
+        extra_ids = {item['menu_extra'] for item in items_data if item.get('menu_extra')}
+
+        dishes = Dish.objects.in_bulk(dish_ids)
+        extras = MenuExtra.objects.in_bulk(extra_ids) if extra_ids else {}
+
+        missing_dishes = dish_ids - dishes.keys()
+        if missing_dishes:
+            raise EntityNotFoundException(f"Dishes {sorted(missing_dishes)} not found")
+
+        missing_extras = extra_ids - extras.keys()
+        if missing_extras:
+            raise EntityNotFoundException(f"Menu Extras {sorted(missing_extras)} not found")
+
+        inactive_dishes = [dish_id for dish_id, dish in dishes.items() if dish.status != 'ACTIVE']
+        if inactive_dishes:
+            raise BusinessRuleViolationException(
+                f"Dishes {sorted(inactive_dishes)} are not active and can't be ordered"
+            )
+
+        return dishes, extras
     
+    @classmethod
+    def _resolve_batch_chunk(
+        cls, 
+        chunk: List[Tuple[int, dict]], 
+        dishes: Dict[int, Dish], 
+        extras: Dict[int, MenuExtra]
+    ) -> List[dict]:
+        """
+        Loads the dishes and extras referenced by a chunk that are not cached yet
+        and checks every line against them
+        
+        Args:
+            chunk: (line number, validated item data) pairs
+            dishes: Dishes resolved so far, keyed by ID (updated in place)
+            extras: Extras resolved so far, keyed by ID (updated in place)
+            
+        Returns:
+            Per-line errors for missing dishes/extras and non-ACTIVE dishes
+        """
+        dish_ids = {item['menu_item'] for _, item in chunk} - dishes.keys()
+        extra_ids = {item['menu_extra'] for _, item in chunk if item.get('menu_extra')} - extras.keys()
+
+        if dish_ids:
+            dishes.update(Dish.objects.in_bulk(dish_ids))
+        if extra_ids:
+            extras.update(MenuExtra.objects.in_bulk(extra_ids))
+
+        line_errors = []
+        for line, item in chunk:
+            errors = {}
+            dish = dishes.get(item['menu_item'])
+            if dish is None:
+                errors['menu_item'] = [f"Dish {item['menu_item']} not found"]
+            elif dish.status != 'ACTIVE':
+                errors['menu_item'] = [f"Dish {dish.id} is not active and can't be ordered"]
+
+            if item.get('menu_extra') and item['menu_extra'] not in extras:
+                errors['menu_extra'] = [f"Menu Extra {item['menu_extra']} not found"]
+
+            if errors:
+                line_errors.append({'line': line, 'errors': errors})
+
+        return line_errors
+
     @classmethod
     def _validate_item_length_limit(cls, items: List) -> None:
         """
@@ -3,9 +3,14 @@ from ..exceptions import (
     OrderNotFound, TableNotAvailableForOrder, OrderStatusInvalid,
     OrderAlreadyCompletedOrCancelled, OrderDeletionForbidden
 )
+from .order_event_service import OrderEventService
+from .order_item_service import OrderItemService
+from .order_analytics_service import OrderAnalyticsService
 from django.db import transaction
+from django.utils import timezone
 import logging
 from tables.models import Table
+from tables.exceptions import TableNotFound
 
 logger = logging.getLogger(__name__)
 
@@ -27,10 +32,6 @@ class OrderService:
         Ensures the table is available and sets the initial status.
         """
         table = validated_data.get('table')
-    
-        if not table.is_available:
-            logger.warning(f"Attempted to start order on unavailable table: {table.id}")
-            raise TableNotAvailableForOrder(f"Table {table.number} is currently not available.")
 
         status_value = validated_data.get('status')
         if status_value != 'IN_PROGRESS':
@@ -39,19 +40,30 @@ class OrderService:
         
         try:
             with transaction.atomic():
+                if not cls._claim_table(table.id):
+                    logger.warning(f"Attempted to start order on unavailable table: {table.id}")
+                    raise TableNotAvailableForOrder(f"Table {table.number} is currently not available.")
+
+                table.is_available = False
                 order = Order.objects.create(**validated_data)
-                cls._take_table(order)
+                OrderEventService.record(order, 'STARTED', to_status=order.status, to_table_id=table.id)
                 logger.info(f"Order {order.id} started successfully for table {table.id}.")
                 return order
+        except TableNotAvailableForOrder:
+            raise
         except Exception as e:
             logger.exception(f"Unexpected error creating order with data {validated_data}.")
             raise
 
     @classmethod
-    def update_order(cls, order: Order, new_status: str = None, new_table=None) -> Order:
+    def update_order(cls, order: Order, new_status: str = None, new_table_id: int = None) -> Order:
         """
         Updates an existing order instance after performing necessary validations.
         Allows updating status or reassigning table.
+
+        Raises:
+            TableNotFound: If the new table doesn't exist
+            TableNotAvailableForOrder: If the new table is taken
         """
         cls._validate_order_modifiability(order)
 
@@ -60,18 +72,19 @@ class OrderService:
                 return cls.complete_order(order)
             elif new_status == 'CANCELLED':
                 return cls.cancel_order(order)
-            else:
-                order.status = new_status
-                logger.info(f"Order {order.id} status updated to {new_status}.")
 
-        if new_table and new_table.id != order.table.id:
-            cls._update_order_table(order, new_table)
-            logger.info(f"Order {order.id} moved to table {new_table.id}.")
-        
         try:
             with transaction.atomic():
-                order.save()
+                if new_table_id and new_table_id != order.table_id:
+                    cls._update_order_table(order, new_table_id)
+                    logger.info(f"Order {order.id} moved to table {new_table_id}.")
+
+                if new_status and new_status != order.status:
+                    cls._change_status(order, new_status)
+                    logger.info(f"Order {order.id} status updated to {new_status}.")
                 return order
+        except (TableNotFound, TableNotAvailableForOrder):
+            raise
         except Exception as e:
             logger.exception(f"Unexpected error updating order ID {order.id}.")
             raise
@@ -102,8 +115,7 @@ class OrderService:
         elif new_status == 'CANCELLED':
             return cls.cancel_order(order)
         elif new_status != order.status:
-            order.status = new_status
-            order.save()
+            cls._change_status(order, new_status)
             logger.info(f"Order {order.id} status manually updated to {new_status}.")
             return order
         return order
@@ -118,10 +130,13 @@ class OrderService:
         
         try:
             with transaction.atomic():
+                previous_status = order.status
                 order.set_as_complete()
-                order.save()
+                order.save(update_fields=['status', 'end_at'])
                 cls._clear_table(order)
-                logger.info(f"Order {order.id} completed and table {order.table.id} cleared.")
+                OrderEventService.record(order, 'COMPLETED', from_status=previous_status, to_status=order.status)
+                transaction.on_commit(OrderAnalyticsService.invalidate_cache)
+                logger.info(f"Order {order.id} completed and table {order.table_id} cleared.")
                 return order
         except Exception as e:
             logger.exception(f"Error completing order {order.id}.")
@@ -129,7 +144,11 @@ class OrderService:
 
     @classmethod
     def cancel_order(cls, order: Order):
-        """Marks an order as cancelled and frees up its table."""
+        """
+        Marks an order as cancelled, frees up its table and returns the ingredients of
+        its undelivered items to stock. The order row is locked first, so concurrent
+        cancellations return them only once.
+        """
         cls._validate_order_modifiability(order)
         if order.status == 'CANCELLED':
             logger.info(f"Order {order.id} already cancelled.")
@@ -137,29 +156,51 @@ class OrderService:
 
         try:
             with transaction.atomic():
+                order.status = Order.objects.select_for_update().values_list('status', flat=True).get(id=order.id)
+                cls._validate_order_modifiability(order)
+                previous_status = order.status
                 order.set_as_cancelled()
-                order.save()
+                order.save(update_fields=['status', 'end_at'])
                 cls._clear_table(order)
-                logger.info(f"Order {order.id} cancelled and table {order.table.id} cleared.")
+                OrderItemService.return_ingredients(order, list(order.order_items.filter(is_delivered=False)))
+                OrderEventService.record(order, 'CANCELLED', from_status=previous_status, to_status=order.status)
+                logger.info(f"Order {order.id} cancelled and table {order.table_id} cleared.")
                 return order
         except Exception as e:
             logger.exception(f"Error cancelling order {order.id}.")
             raise
 
     @classmethod
-    def _update_order_table(cls, order: Order, new_table: Table):
-        """Internal: Handles changing an order's table."""
-        if not new_table.is_available:
-            logger.warning(f"Attempted to move order {order.id} to unavailable table {new_table.id}.")
-            raise TableNotAvailableForOrder(f"Table {new_table.number} is not available for transfer.")
-        
+    def _update_order_table(cls, order: Order, new_table_id: int):
+        """
+        Internal: Handles changing an order's table.
+        The new table is claimed with a conditional UPDATE before the old one is released,
+        so two concurrent moves to the same table cannot both succeed.
+        """
+        old_table_id = order.table_id
+
+        if not Table.objects.filter(id=new_table_id).exists():
+            raise TableNotFound(f"Table {new_table_id} not found.")
+
         with transaction.atomic():
+            if not cls._claim_table(new_table_id):
+                logger.warning(f"Attempted to move order {order.id} to unavailable table {new_table_id}.")
+                raise TableNotAvailableForOrder(f"Table {new_table_id} is not available for transfer.")
+
             cls._clear_table(order)
-            order.table = new_table
-            order.save()
-            cls._take_table(order)
+            order.table_id = new_table_id
+            order.save(update_fields=['table'])
+            OrderEventService.record(order, 'TABLE_MOVED', from_table_id=old_table_id, to_table_id=new_table_id)
+
+        logger.info(f"Order {order.id} successfully moved from table {old_table_id} to {new_table_id}.")
 
-        logger.info(f"Order {order.id} successfully moved from table {order.table.id} to {new_table.id}.")
+    @classmethod
+    def _change_status(cls, order: Order, new_status: str):
+        """Internal: Saves a status change that neither completes nor cancels the order."""
+        previous_status = order.status
+        order.status = new_status
+        order.save(update_fields=['status'])
+        OrderEventService.record(order, 'STATUS_CHANGED', from_status=previous_status, to_status=new_status)
 
     @classmethod
     def _validate_order_modifiability(cls, order: Order, for_deletion: bool = False):
@@ -175,18 +216,29 @@ class OrderService:
 
     @classmethod
     def _clear_table(cls, order: Order):
-        """Internal: Marks the table associated with an order as available."""
-        table = order.table
-        if table:
-            table.is_available = True
-            table.save()
-            logger.debug(f"Table {table.id} cleared for order {order.id}.")
+        """Internal: Marks the table associated with an order as available with a single UPDATE."""
+        if not order.table_id:
+            return
+
+        Table.objects.filter(id=order.table_id).update(is_available=True, updated_at=timezone.now())
+        if Order.table.is_cached(order):
+            order.table.is_available = True
+        logger.debug(f"Table {order.table_id} cleared for order {order.id}.")
 
     @classmethod
-    def _take_table(cls, order: Order):
-        """Internal: Marks the table associated with an order as unavailable."""
-        table = order.table
-        if table:
-            table.is_available = False
-            table.save()
-            logger.debug(f"Table {table.id} taken for order {order.id}.")
\ No newline at end of file
+    def _claim_table(cls, table_id: int) -> bool:
+        """
+        Internal: Atomically marks a table as unavailable.
+        Runs `UPDATE tables SET is_available = false WHERE id = ? AND is_available`,
+        so only one concurrent caller can take a free table.
+
+        Returns:
+            True if the table was free and is now taken, False otherwise.
+        """
+        claimed = Table.objects.filter(id=table_id, is_available=True).update(
+            is_available=False,
+            updated_at=timezone.now()
+        )
+        if claimed:
+            logger.debug(f"Table {table_id} taken.")
+        return claimed == 1
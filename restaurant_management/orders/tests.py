@@ -0,0 +1,376 @@
+import json
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from menu.models import Dish, MenuExtra
+from payments.services.payment_service import PaymentService
+from shared.cache import idempotency
+from tables.models import Table
+from .models import Order, OrderItem
+from .services.kitchen_service import KitchenService
+from .services.order_analytics_service import OrderAnalyticsService
+from .services.order_event_service import OrderEventService
+from .services.order_item_service import OrderItemService
+from .services.order_service import OrderService
+
+
+class OrderListQueryCountTest(TestCase):
+    """
+    The order list eager-loads tables and items, so its query count must not grow
+    with the number of orders on the page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dishes = [
+            Dish.objects.create(name=f'Dish {i}', price=Decimal('10.00') + i, category='MEALS')
+            for i in range(3)
+        ]
+        cls.extra = MenuExtra.objects.create(name='Extra Cheese', price=Decimal('2.50'))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _create_orders(self, count):
+        for _ in range(count):
+            table = Table.objects.create(number=f'T{Table.objects.count() + 1}', capacity=4, is_available=False)
+            order = Order.objects.create(table=table, status='IN_PROGRESS')
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, menu_item=dish, menu_extra=self.extra, quantity=2,
+                          unit_price=dish.price, extra_price=self.extra.price)
+                for dish in self.dishes
+            ])
+
+    def _assert_list_queries(self, order_count):
+        with self.assertNumQueries(2):
+            response = self.client.get('/v1/api/orders/', {'page_size': 100})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), order_count)
+        self.assertEqual(len(response.data['data'][0]['order_items']), len(self.dishes))
+
+    def test_list_query_count_is_constant(self):
+        self._create_orders(2)
+        self._assert_list_queries(2)
+
+        self._create_orders(28)
+        self._assert_list_queries(30)
+
+
+class OrderListPaginationTest(TestCase):
+    """
+    The order list seeks on (created_at, id), so orders sharing a timestamp are
+    neither skipped nor repeated, in either direction, and no OFFSET is used.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        orders = [
+            Order.objects.create(table=Table.objects.create(number=f'T{i}', capacity=4), status='IN_PROGRESS')
+            for i in range(7)
+        ]
+        Order.objects.update(created_at=timezone.now())
+        self.expected_ids = sorted((order.id for order in orders), reverse=True)
+
+    def _walk(self, url, link):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any('OFFSET' in query['sql'].upper() for query in queries.captured_queries))
+            pages.append([order['id'] for order in response.data['data']])
+            url = response.data['metadata']['pagination'][link]
+        return pages
+
+    def test_pages_forward_and_back_over_equal_timestamps(self):
+        forward = self._walk('/v1/api/orders/?page_size=3', 'next')
+        self.assertEqual(forward, [self.expected_ids[:3], self.expected_ids[3:6], self.expected_ids[6:]])
+
+        last_page = self.client.get('/v1/api/orders/?page_size=3').data['metadata']['pagination']['next']
+        last_page = self.client.get(last_page).data['metadata']['pagination']['next']
+        backward = self._walk(self.client.get(last_page).data['metadata']['pagination']['previous'], 'previous')
+        self.assertEqual(backward, [self.expected_ids[3:6], self.expected_ids[:3]])
+
+    def test_malformed_cursor_is_not_found(self):
+        response = self.client.get('/v1/api/orders/', {'cursor': 'cD1ub3QtYS1kYXRl'})
+        self.assertEqual(response.status_code, 404)
+
+
+class OrderTableUpdateTest(TestCase):
+    """
+    Moving an order to another table validates the `table_id` query parameter before
+    trying to claim the table.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=self.table, status='IN_PROGRESS')
+
+    def _move_to(self, table_id):
+        return self.client.put(f'/v1/api/orders/{self.order.id}/?table_id={table_id}')
+
+    def test_non_numeric_table_id_is_rejected(self):
+        self.assertEqual(self._move_to('abc').status_code, 400)
+
+    def test_unknown_table_is_not_found(self):
+        self.assertEqual(self._move_to(9999).status_code, 404)
+
+    def test_taken_table_is_a_conflict(self):
+        taken_table = Table.objects.create(number='T2', capacity=4, is_available=False)
+        self.assertEqual(self._move_to(taken_table.id).status_code, 409)
+
+    def test_order_moves_to_free_table(self):
+        free_table = Table.objects.create(number='T3', capacity=4, is_available=True)
+
+        self.assertEqual(self._move_to(free_table.id).status_code, 200)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.table_id, free_table.id)
+
+
+class OrderItemBulkAddQueryCountTest(TestCase):
+    """
+    Adding items resolves every dish and extra with one query per table, so the
+    query count of a request does not grow with the number of items in it.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='waiter'))
+        self.dishes = [
+            Dish.objects.create(name=f'Dish {i}', price=Decimal('10.00') + i, category='MEALS')
+            for i in range(OrderItemService.MAX_ALLOWED_ITEMS_PER_REQUEST)
+        ]
+        self.extra = MenuExtra.objects.create(name='Extra Cheese', price=Decimal('2.50'))
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        self.url = f'/v1/api/orders/{self.order.id}/items/add/'
+
+    def _add(self, dishes):
+        items = [{'menu_item': dish.id, 'menu_extra': self.extra.id, 'quantity': 2} for dish in dishes]
+        return self.client.post(self.url, items, format='json')
+
+    def test_query_count_does_not_grow_with_the_items(self):
+        with CaptureQueriesContext(connection) as single_item_queries:
+            self.assertEqual(self._add(self.dishes[:1]).status_code, 201)
+
+        with self.assertNumQueries(len(single_item_queries)):
+            self.assertEqual(self._add(self.dishes).status_code, 201)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.item_count, 2 * (len(self.dishes) + 1))
+
+    def test_unknown_dish_adds_nothing(self):
+        response = self.client.post(self.url, [{'menu_item': self.dishes[0].id}, {'menu_item': 9999}], format='json')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(OrderItem.objects.filter(order=self.order).exists())
+
+
+class OrderItemBatchLineNumberTest(TestCase):
+    """
+    NDJSON batches report errors by physical line, blank lines included, for both
+    invalid JSON and invalid items; JSON arrays report the 1-based position.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='waiter'))
+        self.dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        self.url = f'/v1/api/orders/{self.order.id}/items/batch/'
+
+    def _post_ndjson(self, lines):
+        return self.client.post(self.url, '\n'.join(lines) + '\n', content_type='application/x-ndjson')
+
+    def test_invalid_item_reports_physical_line(self):
+        valid_line = json.dumps({'menu_item': self.dish.id})
+        response = self._post_ndjson([valid_line, '', valid_line, json.dumps({'quantity': 1})])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['line'] for error in response.data['data']['errors']], [4])
+        self.assertFalse(OrderItem.objects.filter(order=self.order).exists())
+
+    def test_invalid_json_reports_physical_line(self):
+        valid_line = json.dumps({'menu_item': self.dish.id})
+        response = self._post_ndjson([valid_line, '', valid_line, '{not json'])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 4', str(response.data))
+
+    def test_json_array_reports_position(self):
+        response = self.client.post(self.url, [{'menu_item': self.dish.id}, {'quantity': 1}], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['line'] for error in response.data['data']['errors']], [2])
+
+
+class KitchenFeedTest(TestCase):
+    """
+    The kitchen feed is ordered by the sequence its items are published with at commit,
+    so an item inserted early but committed late is still served after the cursor
+    has moved on, and a long-poll wakes up once items are published.
+    """
+
+    def setUp(self):
+        self.dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+
+    def _add_item(self):
+        return OrderItemService.add_items(self.order, [{'menu_item': self.dish.id}])[0]
+
+    def _feed(self, cursor=None):
+        items, next_cursor = KitchenService.get_pending_items(cursor)
+        return [item.id for item in items], next_cursor
+
+    def test_late_committed_item_is_not_skipped(self):
+        # Inserted first, but its transaction has not published it yet
+        late_item = OrderItem.objects.create(order=self.order, menu_item=self.dish, unit_price=self.dish.price)
+        first_item = self._add_item()
+
+        item_ids, cursor = self._feed()
+        self.assertEqual(item_ids, [first_item.id])
+
+        KitchenService.publish_items([late_item])
+
+        self.assertEqual(self._feed(cursor)[0], [late_item.id])
+
+    def test_unpublished_items_keep_the_cursor(self):
+        OrderItem.objects.create(order=self.order, menu_item=self.dish, unit_price=self.dish.price)
+
+        self.assertEqual(self._feed(), ([], None))
+
+    def test_long_poll_returns_items_published_while_waiting(self):
+        _, cursor = self._feed()
+        published = []
+
+        def publish_during_sleep(seconds):
+            published.append(self._add_item())
+
+        with mock.patch('orders.services.kitchen_service.time.sleep', side_effect=publish_during_sleep) as sleep:
+            items, _ = KitchenService.wait_for_pending_items(cursor, wait_seconds=5)
+
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual([item.id for item in items], [published[0].id])
+
+    def test_long_poll_gives_up_after_wait(self):
+        clock = iter(range(100))
+
+        with mock.patch('orders.services.kitchen_service.time.monotonic', side_effect=lambda: next(clock)), \
+                mock.patch('orders.services.kitchen_service.time.sleep') as sleep:
+            self.assertEqual(KitchenService.wait_for_pending_items(wait_seconds=3), ([], None))
+
+        self.assertLessEqual(sleep.call_count, 3)
+
+
+class OrderEventTest(TestCase):
+    """
+    Transition events are written with the transition, and disappear with it when
+    its savepoint rolls back.
+    """
+
+    def setUp(self):
+        self.table = Table.objects.create(number='T1', capacity=4, is_available=True)
+        self.order = OrderService.start_order({'table': self.table, 'status': 'IN_PROGRESS'})
+
+    def _event_types(self):
+        return list(OrderEventService.get_order_events(self.order.id).values_list('event_type', flat=True))
+
+    def test_rolled_back_transition_leaves_no_event(self):
+        try:
+            with transaction.atomic():
+                OrderService.cancel_order(self.order)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+
+        self.assertEqual(self._event_types(), ['STARTED'])
+
+        OrderService.cancel_order(Order.objects.get(id=self.order.id))
+        self.assertEqual(self._event_types(), ['STARTED', 'CANCELLED'])
+
+
+class OrderAnalyticsCacheTest(TestCase):
+    """
+    Cached reports are keyed by a namespaced version that never expires and is
+    rotated when an order completes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.version_key = OrderAnalyticsService.cache_manager.get_cache_key(OrderAnalyticsService.VERSION_KEY)
+
+    def test_completing_an_order_rotates_the_version(self):
+        OrderAnalyticsService.get_table_turn_report()
+        version = cache.get(self.version_key)
+        self.assertIsNotNone(version)
+        self.assertIsNone(cache.get(OrderAnalyticsService.VERSION_KEY))
+
+        with mock.patch('django.core.cache.cache.set', wraps=cache.set) as cache_set:
+            table = Table.objects.create(number='T1', capacity=4, is_available=True)
+            order = OrderService.start_order({'table': table, 'status': 'IN_PROGRESS'})
+            with self.captureOnCommitCallbacks(execute=True):
+                OrderService.complete_order(order)
+
+        cache_set.assert_called_once_with(self.version_key, mock.ANY, None)
+        self.assertNotEqual(cache.get(self.version_key), version)
+
+
+class IdempotentCompleteTest(TestCase):
+    """
+    A request only releases the idempotency lock it still holds, never one taken
+    by a retry after its own lock expired, and a duplicate of a request in progress
+    is turned away at once.
+    """
+
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create(username='waiter')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        OrderItemService.add_items(self.order, [{'menu_item': dish.id}])
+        self.url = f'/v1/api/orders/{self.order.id}/complete/'
+        self.lock_key = idempotency._get_cache_key('complete_order', user.id, self.url, 'key-1') + '_lock'
+
+    def test_expired_lock_taken_by_another_request_is_kept(self):
+        close_check = PaymentService.close_check
+
+        def lock_expires_meanwhile(order):
+            cache.set(self.lock_key, 'other-request')
+            return close_check(order)
+
+        with mock.patch.object(PaymentService, 'close_check', side_effect=lock_expires_meanwhile):
+            response = self.client.patch(self.url, HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cache.get(self.lock_key), 'other-request')
+
+    def test_duplicate_in_progress_gets_conflict_without_waiting(self):
+        cache.set(self.lock_key, 'other-request')
+
+        with mock.patch('time.sleep') as sleep:
+            response = self.client.patch(self.url, HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Retry-After'], str(idempotency.RETRY_AFTER_SECONDS))
+        sleep.assert_not_called()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'IN_PROGRESS')
+
+    def test_own_lock_is_released(self):
+        response = self.client.patch(self.url, HTTP_IDEMPOTENCY_KEY='key-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(cache.get(self.lock_key))
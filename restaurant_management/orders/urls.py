@@ -1,13 +1,19 @@
 from django.urls import path, include
-from .views.order_item_views import add_order_item, delete_order_item
+from .views.order_item_views import add_order_item, add_order_items_batch, delete_order_item
 from .views.order_views import OrderViewsSet
+from .views.kitchen_views import kitchen_feed, mark_items_delivered
+from .views.analytics_views import table_turn_analytics
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 router.register(r'', OrderViewsSet, basename='stock')
 
 urlpatterns = [
+    path('kitchen/feed/', kitchen_feed, name='kitchen-feed'),
+    path('kitchen/items/deliver/', mark_items_delivered, name='kitchen-deliver-items'),
+    path('analytics/table-turns/', table_turn_analytics, name='order-analytics-table-turns'),
     path('', include(router.urls)),
     path('<int:order_id>/items/add/', add_order_item, name='order-add-items'),
+    path('<int:order_id>/items/batch/', add_order_items_batch, name='order-add-items-batch'),
     path('<int:order_id>/items/delete/', delete_order_item, name='order-delete-items'),
 ]
\ No newline at end of file
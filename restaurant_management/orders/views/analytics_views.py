@@ -0,0 +1,59 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+from django.utils.dateparse import parse_date
+
+import logging
+
+from ..services.order_analytics_service import OrderAnalyticsService
+from ..documentation.analytics_doc_data import AnalyticsDocumentationData
+
+from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
+
+logger = logging.getLogger(__name__)
+
+@swagger_auto_schema(
+    method='get',
+    operation_id=AnalyticsDocumentationData.table_turns_operation_id,
+    operation_summary=AnalyticsDocumentationData.table_turns_operation_summary,
+    operation_description=AnalyticsDocumentationData.table_turns_operation_description,
+    manual_parameters=[
+        openapi.Parameter('date_from', openapi.IN_QUERY, description="First day of the range (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+        openapi.Parameter('date_to', openapi.IN_QUERY, description="Last day of the range (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+        openapi.Parameter('granularity', openapi.IN_QUERY, description="Bucket size: hour or day", type=openapi.TYPE_STRING)
+    ],
+    responses={
+        status.HTTP_200_OK: AnalyticsDocumentationData.table_turns_response,
+        status.HTTP_400_BAD_REQUEST: AnalyticsDocumentationData.invalid_range_response,
+        status.HTTP_401_UNAUTHORIZED: AnalyticsDocumentationData.unauthorized_response,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: AnalyticsDocumentationData.server_error_response
+    },
+    tags=['Order Analytics']
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def table_turn_analytics(request):
+    """
+    API endpoint reporting order duration, covers and table turns
+    """
+    dates = {}
+    for param in ('date_from', 'date_to'):
+        raw_value = request.query_params.get(param)
+        if raw_value:
+            try:
+                dates[param] = parse_date(raw_value)
+            except ValueError:
+                dates[param] = None
+            if dates[param] is None:
+                return ResponseWrapper.bad_request(message=f"'{param}' must be a date (YYYY-MM-DD)")
+
+    granularity = request.query_params.get('granularity', 'hour')
+
+    user_id = request.user.id if request.user.is_authenticated else 'Anonymous'
+    logger.info(f"User {user_id} requesting table turn analytics", extra={'params': dict(request.query_params)})
+
+    report = OrderAnalyticsService.get_table_turn_report(granularity=granularity, **dates)
+    return ResponseWrapper.found(data=report, entity="Table Turn Analytics")
@@ -0,0 +1,105 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+import logging
+
+from ..serializers import KitchenItemSerializer
+from ..services.kitchen_service import KitchenService
+from ..documentation.kitchen_doc_data import KitchenDocumentationData
+
+from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
+
+logger = logging.getLogger(__name__)
+
+@swagger_auto_schema(
+    method='get',
+    operation_id=KitchenDocumentationData.feed_operation_id,
+    operation_summary=KitchenDocumentationData.feed_operation_summary,
+    operation_description=KitchenDocumentationData.feed_operation_description,
+    manual_parameters=[
+        openapi.Parameter('cursor', openapi.IN_QUERY, description="Cursor returned by the previous call", type=openapi.TYPE_STRING),
+        openapi.Parameter('limit', openapi.IN_QUERY, description="Maximum items to return", type=openapi.TYPE_INTEGER),
+        openapi.Parameter('wait', openapi.IN_QUERY, description="Seconds to wait for new items (long-poll)", type=openapi.TYPE_INTEGER)
+    ],
+    responses={
+        status.HTTP_200_OK: KitchenDocumentationData.feed_response,
+        status.HTTP_400_BAD_REQUEST: KitchenDocumentationData.invalid_cursor_response,
+        status.HTTP_401_UNAUTHORIZED: KitchenDocumentationData.unauthorized_response,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: KitchenDocumentationData.server_error_response
+    },
+    tags=['Kitchen']
+)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def kitchen_feed(request):
+    """
+    API endpoint returning the undelivered items added since a cursor
+    """
+    cursor = request.query_params.get('cursor')
+    try:
+        limit = int(request.query_params.get('limit', KitchenService.DEFAULT_FEED_LIMIT))
+        wait_seconds = int(request.query_params.get('wait', 0))
+    except ValueError:
+        return ResponseWrapper.bad_request(message="limit and wait must be integers")
+
+    items, next_cursor = KitchenService.wait_for_pending_items(cursor, limit, wait_seconds)
+
+    return ResponseWrapper.found(
+        data=KitchenItemSerializer(items, many=True).data,
+        entity="Kitchen Feed",
+        metadata={'cursor': next_cursor, 'count': len(items)}
+    )
+
+@swagger_auto_schema(
+    method='post',
+    operation_id=KitchenDocumentationData.deliver_operation_id,
+    operation_summary=KitchenDocumentationData.deliver_operation_summary,
+    operation_description=KitchenDocumentationData.deliver_operation_description,
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'order_item_ids': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(type=openapi.TYPE_INTEGER),
+                description='List of order item IDs that were served'
+            )
+        },
+        required=['order_item_ids']
+    ),
+    responses={
+        status.HTTP_200_OK: KitchenDocumentationData.deliver_response,
+        status.HTTP_400_BAD_REQUEST: KitchenDocumentationData.deliver_validation_error_response,
+        status.HTTP_401_UNAUTHORIZED: KitchenDocumentationData.unauthorized_response,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: KitchenDocumentationData.server_error_response
+    },
+    tags=['Kitchen']
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_items_delivered(request):
+    """
+    API endpoint to flag many order items as delivered at once
+    """
+    order_item_ids = request.data.get('order_item_ids', [])
+
+    if not order_item_ids or not isinstance(order_item_ids, list):
+        return ResponseWrapper.bad_request(message="Order Item IDs are required")
+    if len(order_item_ids) > KitchenService.MAX_ITEMS_PER_DELIVERY:
+        return ResponseWrapper.bad_request(
+            message=f"Cannot mark more than {KitchenService.MAX_ITEMS_PER_DELIVERY} items at once"
+        )
+    if not all(isinstance(item_id, int) for item_id in order_item_ids):
+        return ResponseWrapper.bad_request(message="Order Item IDs must be integers")
+
+    user_id = request.user.id if request.user.is_authenticated else 'Anonymous'
+    logger.info(f"User {user_id} marking items as delivered", extra={'item_ids': order_item_ids})
+
+    delivered = KitchenService.mark_items_delivered(order_item_ids)
+
+    return ResponseWrapper.success(
+        data={'delivered': delivered},
+        message=f"{delivered} Order Items marked as delivered"
+    )
@@ -1,17 +1,20 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.parsers import JSONParser
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 import logging
 
-from ..serializers import OrderItemSerializer
+from ..serializers import OrderItemSerializer, OrderItemCreateSerializer
 from ..services.order_service import OrderService
 from ..services.order_item_service import OrderItemService
 from ..documentation.order_item_doc_data import OrderItemDocumentationData
 
 from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
+from shared.parsers import NDJSONParser
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +23,7 @@ logger = logging.getLogger(__name__)
     operation_id=OrderItemDocumentationData.add_items_operation_id,
     operation_summary=OrderItemDocumentationData.add_items_operation_summary,
     operation_description=OrderItemDocumentationData.add_items_operation_description,
-    request_body=OrderItemSerializer(many=True),
+    request_body=OrderItemCreateSerializer(many=True),
     responses={
         status.HTTP_201_CREATED: OrderItemDocumentationData.order_items_list_response,
         status.HTTP_400_BAD_REQUEST: OrderItemDocumentationData.add_items_validation_error_response,
@@ -30,8 +33,8 @@ logger = logging.getLogger(__name__)
     },
     tags=['Order Items']
 )
-@permission_classes([permissions.IsAuthenticated])
 @api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
 def add_order_item(request, order_id):
     """
     API endpoint to add items to an order
@@ -46,10 +49,10 @@ def add_order_item(request, order_id):
     )
 
     order = OrderService.get_order(order_id)
-    serializer = OrderItemSerializer(data=request.data, many=True)
+    serializer = OrderItemCreateSerializer(data=request.data, many=True)
     serializer.is_valid(raise_exception=True)
     
-    updated_order = OrderItemService.add_items(order, serializer.validated_data)
+    created_items = OrderItemService.add_items(order, serializer.validated_data)
     
     logger.info(
         f"Items added to order {order_id} by user {user_id}",
@@ -57,10 +60,87 @@ def add_order_item(request, order_id):
     )
     
     return ResponseWrapper.created(
-        data=OrderItemSerializer(updated_order.order_items.all(), many=True).data,
+        data=OrderItemSerializer(created_items, many=True).data,
         entity=f"Order {order_id} Items"
     )
 
+@swagger_auto_schema(
+    method='post',
+    operation_id=OrderItemDocumentationData.add_items_batch_operation_id,
+    operation_summary=OrderItemDocumentationData.add_items_batch_operation_summary,
+    operation_description=OrderItemDocumentationData.add_items_batch_operation_description,
+    request_body=OrderItemCreateSerializer(many=True),
+    responses={
+        status.HTTP_201_CREATED: OrderItemDocumentationData.order_items_list_response,
+        status.HTTP_400_BAD_REQUEST: OrderItemDocumentationData.add_items_batch_validation_error_response,
+        status.HTTP_401_UNAUTHORIZED: OrderItemDocumentationData.unauthorized_response,
+        status.HTTP_404_NOT_FOUND: OrderItemDocumentationData.order_not_found_response,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: OrderItemDocumentationData.server_error_response
+    },
+    tags=['Order Items']
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@parser_classes([JSONParser, NDJSONParser])
+def add_order_items_batch(request, order_id):
+    """
+    API endpoint to add a large batch of items to an order in a single transaction.
+    Accepts a JSON array or an NDJSON stream (`Content-Type: application/x-ndjson`).
+    """
+    user_id = request.user.id if request.user.is_authenticated else 'Anonymous'
+    logger.info(f"User {user_id} adding an item batch to order {order_id}")
+
+    order = OrderService.get_order(order_id)
+    if isinstance(request.data, dict):
+        return ResponseWrapper.bad_request(message="Expected a list of order items")
+
+    if request.content_type.startswith(NDJSONParser.media_type):
+        numbered_raw_items = request.data
+    else:
+        numbered_raw_items = enumerate(request.data, start=1)
+
+    numbered_items, line_errors = _validate_batch_lines(numbered_raw_items)
+    if not line_errors:
+        created_items, line_errors = OrderItemService.add_items_batch(order, numbered_items)
+
+    if line_errors:
+        return ResponseWrapper.bad_request(
+            data={'errors': line_errors},
+            message=f"{len(line_errors)} lines failed validation. No items were added"
+        )
+
+    logger.info(
+        f"Item batch added to order {order_id} by user {user_id}",
+        extra={'item_count': len(created_items)}
+    )
+
+    return ResponseWrapper.created(
+        data=OrderItemSerializer(created_items, many=True).data,
+        entity=f"Order {order_id} Items"
+    )
+
+
+def _validate_batch_lines(numbered_raw_items):
+    """
+    Validates each line of a batch on its own so every failing line can be reported.
+    Lines are numbered by the caller: the physical NDJSON line, or the 1-based array
+    position. Stops reading the body as soon as the batch limit is exceeded.
+    """
+    numbered_items, line_errors = [], []
+    for item_count, (line, raw_item) in enumerate(numbered_raw_items, start=1):
+        if item_count > OrderItemService.MAX_ALLOWED_ITEMS_PER_BATCH:
+            raise BusinessRuleViolationException(
+                f"Cannot process more than {OrderItemService.MAX_ALLOWED_ITEMS_PER_BATCH} items in a batch"
+            )
+
+        serializer = OrderItemCreateSerializer(data=raw_item)
+        if serializer.is_valid():
+            numbered_items.append((line, serializer.validated_data))
+        else:
+            line_errors.append({'line': line, 'errors': dict(serializer.errors)})
+
+    return numbered_items, line_errors
+
 @swagger_auto_schema(
     method='post',
     operation_id=OrderItemDocumentationData.delete_items_operation_id,
@@ -86,8 +166,8 @@ def add_order_item(request, order_id):
     },
     tags=['Order Items']
 )
-@permission_classes([permissions.IsAuthenticated])
 @api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
 def delete_order_item(request, order_id): 
     """
     API endpoint to delete items from an order
@@ -6,23 +6,39 @@ from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from django.utils.dateparse import parse_datetime
+
 import logging
 
 from ..documentation.order_doc_data import OrderDocumentationData
-from ..serializers import OrderSerializer
+from ..serializers import OrderSerializer, OrderEventSerializer
 from ..models import Order
+from ..filters import OrderFilter
 from ..services.order_service import OrderService
+from ..services.order_event_service import OrderEventService
+from payments.models import Payment
 from payments.services.payment_service import PaymentService
-from payments.serializers import PaymentSerializer
+from payments.services.payment_split_service import PaymentSplitService
+from payments.serializers import PaymentSerializer, SplitCheckSerializer
 
 from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
+from shared.pagination import CustomCursorPagination
+from shared.cache.idempotency import idempotent, idempotency_key_parameter
 
 logger = logging.getLogger(__name__)
 
 class OrderViewsSet(ModelViewSet):
-    queryset = Order.objects.all()
+    queryset = Order.objects.with_items()
     serializer_class = OrderSerializer
     permission_classes = []
+    pagination_class = CustomCursorPagination
+    filterset_class = OrderFilter
+
+    def filter_queryset(self, queryset):
+        """The query filters belong to the list; `status` and `table_id` mean new values on update"""
+        if self.action != 'list':
+            return queryset
+        return super().filter_queryset(queryset)
 
     @swagger_auto_schema(
         operation_id='list_orders',
@@ -30,7 +46,11 @@ class OrderViewsSet(ModelViewSet):
         operation_description=OrderDocumentationData.list_operation_description,
         manual_parameters=[
             openapi.Parameter('status', openapi.IN_QUERY, description="Filter by order status", type=openapi.TYPE_STRING),
-            openapi.Parameter('table_id', openapi.IN_QUERY, description="Filter by table ID", type=openapi.TYPE_INTEGER)
+            openapi.Parameter('table_id', openapi.IN_QUERY, description="Filter by table ID", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('created_from', openapi.IN_QUERY, description="Orders created at or after this ISO date/time", type=openapi.TYPE_STRING),
+            openapi.Parameter('created_to', openapi.IN_QUERY, description="Orders created at or before this ISO date/time", type=openapi.TYPE_STRING),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Opaque cursor returned in the previous page metadata", type=openapi.TYPE_STRING),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of results per page", type=openapi.TYPE_INTEGER)
         ],
         responses={
             status.HTTP_200_OK: OrderDocumentationData.order_list_response,
@@ -43,13 +63,18 @@ class OrderViewsSet(ModelViewSet):
         user_id = getattr(request.user, 'id', 'Anonymous') 
         logger.info(f"User {user_id} is requesting order list.")
         
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
 
-        logger.info(f"Returning {len(queryset)} tables.")
+        logger.info(f"Returning {len(page)} orders.")
         return ResponseWrapper.found(
             data=serializer.data,
             entity="Order List",
+            metadata={
+                "pagination": self.paginator.get_paginated_metadata(),
+                "applied_filters": [key for key in OrderFilter.base_filters if key in request.query_params]
+            }
         )
 
     @swagger_auto_schema(
@@ -129,9 +154,12 @@ class OrderViewsSet(ModelViewSet):
         logger.info(f"User {user_id} is requesting updating order {order.id}.")
 
         new_status = request.query_params.get('status')
-        new_table = request.query_params.get('table_id')
+        try:
+            new_table_id = int(request.query_params['table_id']) if request.query_params.get('table_id') else None
+        except ValueError:
+            return ResponseWrapper.bad_request(message="table_id must be an integer")
         
-        order_updated = OrderService.update_order(order, new_status, new_table)
+        order_updated = OrderService.update_order(order, new_status, new_table_id)
         logger.info(f"Order ID: {order.id} updated successfully.")
         
         serializer = self.get_serializer(order_updated)
@@ -174,6 +202,7 @@ class OrderViewsSet(ModelViewSet):
         operation_id='complete_order',
         operation_summary=OrderDocumentationData.complete_operation_summary,
         operation_description=OrderDocumentationData.complete_operation_description,
+        manual_parameters=[idempotency_key_parameter],
         responses={
             status.HTTP_200_OK: OrderDocumentationData.order_response,
             status.HTTP_400_BAD_REQUEST: OrderDocumentationData.validation_error_response,
@@ -184,19 +213,52 @@ class OrderViewsSet(ModelViewSet):
         tags=['Orders']
     )
     @action(detail=True, methods=['patch'])
+    @idempotent('complete_order')
     def complete(self, request, *args, **kwargs):
         order = self.get_object()
         user_id = getattr(request.user, 'id', 'Anonymous') 
         logger.info(f"User {user_id} is requesting to complete status order {order.id}.")
         
-        order_completed = OrderService.complete_order(order)
-        payment = PaymentService.create_payment_from_order(order_completed)
+        payment = PaymentService.close_check(order)
 
         payment_serializer = PaymentSerializer(payment)
         return ResponseWrapper.success(
             data=payment_serializer.data,
             message=f"Order {order.id} Succesfully Completed. A Payment with Id {payment.id} was inited pending to be paid"
         )
+
+    @swagger_auto_schema(
+        operation_id='split_check',
+        operation_summary=OrderDocumentationData.split_check_operation_summary,
+        operation_description=OrderDocumentationData.split_check_operation_description,
+        request_body=SplitCheckSerializer,
+        manual_parameters=[idempotency_key_parameter],
+        responses={
+            status.HTTP_200_OK: OrderDocumentationData.split_check_response,
+            status.HTTP_400_BAD_REQUEST: OrderDocumentationData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: OrderDocumentationData.unauthorized_reponse,
+            status.HTTP_404_NOT_FOUND: OrderDocumentationData.not_found_response,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: OrderDocumentationData.server_error_reponse
+        },
+        tags=['Orders']
+    )
+    @action(detail=True, methods=['patch'], url_path='complete/split')
+    @idempotent('split_check')
+    def split_check(self, request, *args, **kwargs):
+        order = self.get_object()
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        logger.info(f"User {user_id} is requesting to complete order {order.id} with a split check.")
+
+        serializer = SplitCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        payments = PaymentSplitService.split_check(order, **serializer.validated_data)
+        payments = Payment.objects.filter(id__in=[payment.id for payment in payments]).with_items().order_by('id')
+
+        return ResponseWrapper.success(
+            data=PaymentSerializer(payments, many=True).data,
+            message=f"Order {order.id} Succesfully Completed. {len(payments)} Payments were inited pending to be paid"
+        )
     
     @swagger_auto_schema(
         operation_id='cancel_order',
@@ -221,3 +283,41 @@ class OrderViewsSet(ModelViewSet):
         logger.info(f"Order ID: {order.id} Succesfully Cancelled.")
 
         return ResponseWrapper.success(message=f"Order {order.id} Succesfully Cancelled")
+
+    @swagger_auto_schema(
+        operation_id='order_events',
+        operation_summary=OrderDocumentationData.events_operation_summary,
+        operation_description=OrderDocumentationData.events_operation_description,
+        manual_parameters=[
+            openapi.Parameter('created_from', openapi.IN_QUERY, description="Events at or after this ISO date/time", type=openapi.TYPE_STRING),
+            openapi.Parameter('created_to', openapi.IN_QUERY, description="Events at or before this ISO date/time", type=openapi.TYPE_STRING)
+        ],
+        responses={
+            status.HTTP_200_OK: OrderDocumentationData.order_events_response,
+            status.HTTP_400_BAD_REQUEST: OrderDocumentationData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: OrderDocumentationData.unauthorized_reponse,
+            status.HTTP_404_NOT_FOUND: OrderDocumentationData.not_found_response,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: OrderDocumentationData.server_error_reponse
+        },
+        tags=['Orders']
+    )
+    @action(detail=True, methods=['get'])
+    def events(self, request, *args, **kwargs):
+        order = OrderService.get_order(kwargs['pk'])
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        logger.info(f"User {user_id} is requesting the event history of order {order.id}.")
+
+        date_range = {}
+        for param in ('created_from', 'created_to'):
+            raw_value = request.query_params.get(param)
+            if raw_value:
+                date_range[param] = parse_datetime(raw_value)
+                if date_range[param] is None:
+                    return ResponseWrapper.bad_request(message=f"'{param}' must be an ISO date/time")
+
+        events = OrderEventService.get_order_events(order.id, **date_range)
+        serializer = OrderEventSerializer(events, many=True)
+        return ResponseWrapper.found(
+            data=serializer.data,
+            entity=f"Order {order.id} Events"
+        )
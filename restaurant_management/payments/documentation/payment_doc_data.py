@@ -1,5 +1,5 @@
 from drf_yasg import openapi
-from ..serializers import PaymentSerializer
+from ..serializers import PaymentSerializer, DailySalesRollupSerializer
 from shared.open_api.error_response_schema import NotFoundErrorResponseSerializer, ValidationErrorResponseSerializer, ErrorResponses
 
 class PaymentDocumentationData:
@@ -54,8 +54,11 @@ class PaymentDocumentationData:
                 "metadata": {
                     "pagination": {
                         "count": 5,
+                        "total_pages": 3,
+                        "current_page": 1,
                         "next": "http://api.example.com/payments/?page=2",
-                        "previous": None
+                        "previous": None,
+                        "page_size": 2
                     },
                     "applied_filters": ["status=COMPLETED"]
                 }
@@ -92,6 +95,99 @@ class PaymentDocumentationData:
         }
     )
     
+    settle_response = openapi.Response(
+        description="Result of each settlement",
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "1 of 2 Payments Successfully Completed",
+                "data": [
+                    {
+                        "payment_id": 12,
+                        "settled": True,
+                        "payment_method": "CASH"
+                    },
+                    {
+                        "payment_id": 13,
+                        "settled": False,
+                        "error": "Payment 13 is COMPLETED and can't be COMPLETED"
+                    }
+                ]
+            }
+        }
+    )
+    
+    export_response = openapi.Response(
+        description="CSV or NDJSON file, streamed row by row",
+        schema=openapi.Schema(type=openapi.TYPE_FILE),
+        examples={
+            "text/csv": "id,order_id,payment_method,payment_status,currency_type,sub_total,discount,vat_rate,vat,total,created_at,paid_at\r\n"
+                        "12,48,CARD,COMPLETED,MXN,250.00,0.00,0.16,40.00,290.00,2024-01-01 13:05:12+00:00,2024-01-01 13:40:02+00:00\r\n"
+        }
+    )
+    
+    daily_sales_response = openapi.Response(
+        description="Daily sales per currency and payment method",
+        schema=DailySalesRollupSerializer(many=True),
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Daily Sales successfully Retrieved",
+                "data": [
+                    {
+                        "date": "2024-01-01",
+                        "currency_type": "MXN",
+                        "payment_method": "CARD",
+                        "payments_count": 84,
+                        "sub_total": "21450.00",
+                        "vat": "3432.00",
+                        "discount": "150.00",
+                        "total": "24732.00",
+                        "refunds_count": 1,
+                        "refunded_total": "310.00"
+                    }
+                ]
+            }
+        }
+    )
+    
+    top_dishes_response = openapi.Response(
+        description="Best selling dishes over the range",
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Top Dishes successfully Retrieved",
+                "data": [
+                    {
+                        "dish_id": 5,
+                        "dish_name": "Grilled Salmon",
+                        "total_quantity": 214,
+                        "total_revenue": "3959.00",
+                        "total_extras_revenue": "120.00"
+                    }
+                ]
+            }
+        }
+    )
+    
+    dish_trend_response = openapi.Response(
+        description="Sales of a dish per period",
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Dish 5 Sales Trend successfully Retrieved",
+                "data": [
+                    {
+                        "period": "2024-01-01",
+                        "total_quantity": 31,
+                        "total_revenue": "573.50",
+                        "total_extras_revenue": "12.00"
+                    }
+                ]
+            }
+        }
+    )
+    
     success_no_data = ErrorResponses.get_success_operation()
     server_error_reponse = ErrorResponses.get_server_error_response()
     unauthorized_reponse = ErrorResponses.get_unauthorized_response()
@@ -113,6 +209,11 @@ class PaymentDocumentationData:
     - Filter by payment method: `?payment_method=CREDIT_CARD`
     - Filter by date range: `?start_date=2023-01-01&end_date=2023-01-31`
     - Filter by amount range: `?min_amount=10&max_amount=100`
+    
+    **Search (`?q=`):**
+    - A number matches the order ID exactly: `?q=1024`
+    - A method, status or currency code matches that column: `?q=card`, `?q=refunded`
+    - Any other text matches item descriptions or the names of the charged dishes: `?q=salmon`
     """
     
     retrieve_operation_summary = 'Retrieve a payment'
@@ -130,15 +231,22 @@ class PaymentDocumentationData:
     **Permissions:**
     - `IsAdminUser`: Only admin users can create payments
     
-    **Required Fields:**
-    - `order`: Associated order ID
-    - `amount`: Payment amount
-    - `payment_method`: Payment method (CREDIT_CARD/PAYPAL/etc.)
-    - `status`: Payment status
+    **Fields:**
+    - `order_id`: Associated order ID (optional)
+    - `payment_method`: CASH/CARD/TRANSACTION (optional until the payment is settled)
+    - `currency_type`: MXN/USD/EUR
+    - `vat_rate` / `discount`: Optional, default to 0.16 and 0.00
+    - `payment_items`: At least one item, each with an `order_item` id (charged at the
+      order item's price) or a `menu_item` id with `price` and `quantity`
     
     **Note:**
     - Typically payments are created automatically during checkout
     - Manual creation should only be done for special cases
+    - Payments are created PENDING; totals are calculated from the items
+    - Send an `Idempotency-Key` header to make retries safe: a retry replays the first
+      successful response instead of creating another payment
+    - A retry sent while the first request is still running gets 409 Conflict at once,
+      with a `Retry-After` header
     """
     
     update_operation_summary = 'Update a payment record'
@@ -167,4 +275,97 @@ class PaymentDocumentationData:
     - Default behavior is soft delete (sets inactive flag)
     - Hard delete permanently removes the record
     - Financial regulations may require keeping payment records
-    """
\ No newline at end of file
+    """
+    
+    complete_operation_summary = 'Settle a payment'
+    complete_operation_description = """
+    Marks a PENDING payment as COMPLETED and records when it was paid.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can settle payments
+    
+    **Request Body:**
+    - `payment_method`: CASH/CARD/TRANSACTION (optional if the payment already has one)
+    """
+    
+    settle_operation_summary = 'Settle many payments'
+    settle_operation_description = """
+    Marks many PENDING payments as COMPLETED in one transaction, e.g. at close of day.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can settle payments
+    
+    **Request Body:**
+    - `settlements`: Up to 500 `{payment_id, payment_method}` entries;
+      `payment_method` is optional if the payment already has one
+    
+    **Note:**
+    - Payments that are not PENDING, don't exist or are listed twice are reported and skipped
+    - The other payments are settled with one UPDATE per payment method
+    """
+    
+    export_operation_summary = 'Export payments'
+    export_operation_description = """
+    Streams every payment (or payment item) matching the filters as a CSV or NDJSON
+    download, without pagination. Rows are sent as they are read from the database.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can export payments
+    
+    **Query Parameters:**
+    - `rows`: `payments` (default) or `items` (the items of the matching payments)
+    - `output`: `csv` (default) or `ndjson`
+    - Same filters as the payment list (`q`, `status`, `method`, `currency`, `from`, `to`, `min_amount`, `max_amount`)
+    """
+    
+    refund_operation_summary = 'Refund a payment'
+    refund_operation_description = """
+    Marks a COMPLETED payment as REFUNDED.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can refund payments
+    """
+    
+    daily_sales_operation_summary = 'Daily sales'
+    daily_sales_operation_description = """
+    Returns sales per day, currency and payment method from the daily sales rollup,
+    so a month of data is about 30 rows per currency and method.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can access this endpoint
+    
+    **Query Parameters:**
+    - `from` / `to`: Inclusive range of days (YYYY-MM-DD), defaults to the last 30 days
+    
+    **Note:**
+    - Sales sums cover COMPLETED payments; refunds are reported in `refunds_count` / `refunded_total`
+    - Days are the day the payment was settled
+    """
+    
+    top_dishes_operation_summary = 'Top selling dishes'
+    top_dishes_operation_description = """
+    Ranks dishes by units sold or revenue over a range of days, from the per-dish daily sales.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can access this endpoint
+    
+    **Query Parameters:**
+    - `from` / `to`: Inclusive range of days (YYYY-MM-DD), defaults to the last 30 days
+    - `limit`: Number of dishes (default 10, max 100)
+    - `rank_by`: `quantity` (default) or `revenue`
+    
+    **Note:**
+    - Counts the items of COMPLETED payments on the day they were paid
+    """
+    
+    dish_trend_operation_summary = 'Dish sales trend'
+    dish_trend_operation_description = """
+    Returns the units sold and revenue of a dish per day, week or month.
+    
+    **Permissions:**
+    - `IsAdminUser`: Only admin users can access this endpoint
+    
+    **Query Parameters:**
+    - `from` / `to`: Inclusive range of days (YYYY-MM-DD), defaults to the last 365 days
+    - `granularity`: `day` (default), `week` or `month`
+    """
@@ -0,0 +1,56 @@
+import time
+from decimal import Decimal
+from itertools import cycle, islice
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from menu.models import Dish
+from payments.services.payment_service import PaymentService
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures manual payment creation: SQL statements and time per create, for a "
+        "payment with the given number of items. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=20, help="Items per payment.")
+        parser.add_argument('--runs', type=int, default=10, help="Payments to create.")
+
+    def handle(self, *args, **options):
+        if options['items'] < 1 or options['runs'] < 1:
+            raise CommandError("--items and --runs must be at least 1")
+
+        dish_ids = list(Dish.objects.filter(status='ACTIVE').values_list('id', flat=True)[:options['items']])
+        if not dish_ids:
+            raise CommandError("At least one ACTIVE dish is needed to build payment items")
+
+        payment_data = {
+            'currency_type': 'MXN',
+            'payment_items': [
+                {'menu_item_id': dish_id, 'price': Decimal('10.00'), 'quantity': 2}
+                for dish_id in islice(cycle(dish_ids), options['items'])
+            ],
+        }
+
+        statement_counts = []
+        elapsed = []
+        with transaction.atomic():
+            for _ in range(options['runs']):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    PaymentService.create_payment(payment_data)
+                    elapsed.append(time.perf_counter() - started)
+                statement_counts.append(sum(
+                    1 for query in queries.captured_queries
+                    if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+                ))
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['runs']} payments with {options['items']} items: "
+            f"{max(statement_counts)} statements per create, "
+            f"{sum(elapsed) / len(elapsed) * 1000:.1f} ms on average."
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from payments.services.sales_rollup_service import SalesRollupService
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily and per-dish sales rollups from payments, one chunk of days per transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help="First day to rebuild (YYYY-MM-DD). Defaults to the first paid payment.")
+        parser.add_argument('--to', dest='date_to', help="Last day to rebuild (YYYY-MM-DD). Defaults to the last paid payment.")
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=SalesRollupService.DEFAULT_CHUNK_DAYS,
+            help="Days rebuilt per transaction."
+        )
+
+    def handle(self, *args, **options):
+        date_from = self._parse_day(options['date_from'], '--from')
+        date_to = self._parse_day(options['date_to'], '--to')
+        if options['chunk_days'] < 1:
+            raise CommandError("--chunk-days must be at least 1")
+
+        rows_written = SalesRollupService.rebuild(date_from, date_to, options['chunk_days'])
+        self.stdout.write(self.style.SUCCESS(f"Daily sales rollup rebuilt: {rows_written} rows written."))
+
+    @staticmethod
+    def _parse_day(value, option):
+        if value is None:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f"{option} must be a date (YYYY-MM-DD)")
+        return day
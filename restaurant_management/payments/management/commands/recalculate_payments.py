@@ -0,0 +1,78 @@
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from payments.models import Payment
+from payments.services.payment_recalculation_service import PaymentRecalculationService
+
+
+class Command(BaseCommand):
+    help = "Recomputes item and payment totals for many payments at once (VAT-rate changes, back-office corrections)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', nargs='+', type=int, help="Payment IDs to recalculate.")
+        parser.add_argument(
+            '--status',
+            nargs='+',
+            default=['PENDING'],
+            choices=[value for value, _ in Payment.PAYMENT_STATUS],
+            help="Payment statuses to recalculate (default: PENDING)."
+        )
+        parser.add_argument('--from', dest='date_from', help="Payments created on or after this day (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='date_to', help="Payments created on or before this day (YYYY-MM-DD).")
+        parser.add_argument('--vat-rate', help="New VAT rate to apply, e.g. 0.16. Keeps each payment's rate when omitted.")
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PaymentRecalculationService.DEFAULT_CHUNK_SIZE,
+            help="Payments written per transaction."
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report the changes without writing them.")
+
+    def handle(self, *args, **options):
+        payments = Payment.objects.filter(deleted_at__isnull=True, payment_status__in=options['status'])
+        if options['ids']:
+            payments = payments.filter(id__in=options['ids'])
+        if options['date_from']:
+            payments = payments.filter(created_at__date__gte=self._parse_day(options['date_from'], '--from'))
+        if options['date_to']:
+            payments = payments.filter(created_at__date__lte=self._parse_day(options['date_to'], '--to'))
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        vat_rate = self._parse_vat_rate(options['vat_rate'])
+        result = PaymentRecalculationService.recalculate(
+            payments,
+            vat_rate=vat_rate,
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run']
+        )
+
+        prefix = "[dry run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result.payments_checked} payments checked, "
+            f"{result.payments_updated} payments and {result.items_updated} items updated."
+        ))
+
+    @staticmethod
+    def _parse_day(value, option):
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f"{option} must be a date (YYYY-MM-DD)")
+        return day
+
+    @staticmethod
+    def _parse_vat_rate(value):
+        if value is None:
+            return None
+        try:
+            vat_rate = Decimal(value)
+        except InvalidOperation:
+            raise CommandError("--vat-rate must be a decimal number")
+        if not Decimal('0') <= vat_rate < Decimal('1') or vat_rate != vat_rate.quantize(Decimal('0.01')):
+            raise CommandError("--vat-rate must be between 0 and 1 with at most 2 decimals")
+        return vat_rate
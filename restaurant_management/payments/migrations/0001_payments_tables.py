@@ -1,16 +1,18 @@
 # menu/migrations/000B_payments_tables.py
 
 from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
 
 
 class Migration(migrations.Migration):
 
     dependencies = [
+        ('orders', '0001_orders_and_items'),
     ]
 
     operations = [
         # --- Create payments table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE payments (
                 id SERIAL PRIMARY KEY,
@@ -54,12 +56,15 @@ class Migration(migrations.Migration):
                         ('paid_at', models.DateTimeField(null=True, blank=True)),
                         ('deleted_at', models.DateTimeField(null=True, blank=True)),
                     ],
+                    options={
+                        'db_table': 'payments',
+                    },
                 ),
             ]
         ),
 
         # --- Create payment_items table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE payment_items (
                 id SERIAL PRIMARY KEY,
@@ -111,6 +116,9 @@ class Migration(migrations.Migration):
                         ('total', models.DecimalField(max_digits=10, decimal_places=2)),
                         ('charge_description', models.CharField(max_length=255, default='')),
                     ],
+                    options={
+                        'db_table': 'payment_items',
+                    },
                 ),
             ]
         ),
@@ -118,7 +126,7 @@ class Migration(migrations.Migration):
         # --- Insert initial data for payments and payment_items ---
         # Note: These inserts heavily rely on the 'orders', 'dishes', and 'menu_extras'
         # tables and their data being present and correctly populated.
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             -- 1. Completed Payment (Dine-in)
             INSERT INTO payments (order_id, payment_method, payment_status, sub_total, discount, vat_rate, vat, currency_type, total, paid_at)
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+TRIGRAM_INDEX_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_payment_items_description_trgm
+    ON payment_items USING GIN (UPPER(charge_description) gin_trgm_ops);
+"""
+
+DROP_TRIGRAM_INDEX_SQL = """
+DROP INDEX IF EXISTS idx_payment_items_description_trgm;
+"""
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm only exists on Postgres; other backends (SQLite in tests) keep the plain scan
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(TRIGRAM_INDEX_SQL)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGRAM_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_payments_tables'),
+    ]
+
+    operations = [
+        # --- B-tree indexes backing the date, status and amount filters ---
+        PostgresRunSQL(
+            sql="""
+            CREATE INDEX idx_payments_created ON payments (created_at);
+            CREATE INDEX idx_payments_status_created ON payments (payment_status, created_at);
+            CREATE INDEX idx_payments_total ON payments (total);
+            CREATE INDEX idx_payment_items_payment ON payment_items (payment_id);
+            """,
+            reverse_sql="""
+            DROP INDEX idx_payments_created;
+            DROP INDEX idx_payments_status_created;
+            DROP INDEX idx_payments_total;
+            DROP INDEX idx_payment_items_payment;
+            """,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='payment',
+                    index=models.Index(fields=['created_at'], name='idx_payments_created'),
+                ),
+                migrations.AddIndex(
+                    model_name='payment',
+                    index=models.Index(fields=['payment_status', 'created_at'], name='idx_payments_status_created'),
+                ),
+                migrations.AddIndex(
+                    model_name='payment',
+                    index=models.Index(fields=['total'], name='idx_payments_total'),
+                ),
+                migrations.AddIndex(
+                    model_name='paymentitem',
+                    index=models.Index(fields=['payment'], name='idx_payment_items_payment'),
+                ),
+            ]
+        ),
+
+        # --- Trigram index serving the dish-name search (ILIKE '%term%') ---
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_payment_search_indexes'),
+    ]
+
+    operations = [
+        # --- Create daily_sales_rollups table ---
+        PostgresRunSQL(
+            sql="""
+            CREATE TABLE daily_sales_rollups (
+                id SERIAL PRIMARY KEY,
+                date DATE NOT NULL,
+                currency_type VARCHAR(3) NOT NULL,
+                payment_method VARCHAR(20) NOT NULL,
+                payments_count INTEGER NOT NULL DEFAULT 0,
+                sub_total NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                vat NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                discount NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                total NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                refunds_count INTEGER NOT NULL DEFAULT 0,
+                refunded_total NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT uq_daily_sales_rollups_key UNIQUE (date, currency_type, payment_method)
+            );
+            """,
+            reverse_sql="""
+            DROP TABLE daily_sales_rollups;
+            """,
+            state_operations=[
+                migrations.CreateModel(
+                    name='DailySalesRollup',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('date', models.DateField()),
+                        ('currency_type', models.CharField(max_length=3, choices=[('MXN', 'Mexican Peso'), ('USD', 'US Dollar'), ('EUR', 'Euro')])),
+                        ('payment_method', models.CharField(max_length=20)),
+                        ('payments_count', models.IntegerField(default=0)),
+                        ('sub_total', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('vat', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('discount', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('total', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('refunds_count', models.IntegerField(default=0)),
+                        ('refunded_total', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                    ],
+                    options={
+                        'db_table': 'daily_sales_rollups',
+                        'verbose_name': 'Daily Sales Rollup',
+                        'verbose_name_plural': 'Daily Sales Rollups',
+                        'constraints': [
+                            models.UniqueConstraint(fields=['date', 'currency_type', 'payment_method'], name='uq_daily_sales_rollups_key'),
+                        ],
+                    },
+                ),
+            ]
+        ),
+
+        # --- Backfill from existing payments ---
+        PostgresRunSQL(
+            sql="""
+            INSERT INTO daily_sales_rollups (
+                date, currency_type, payment_method,
+                payments_count, sub_total, vat, discount, total,
+                refunds_count, refunded_total
+            )
+            SELECT
+                (paid_at AT TIME ZONE 'UTC')::date,
+                currency_type,
+                COALESCE(payment_method, 'UNSPECIFIED'),
+                COUNT(*) FILTER (WHERE payment_status = 'COMPLETED'),
+                COALESCE(SUM(sub_total) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+                COALESCE(SUM(vat) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+                COALESCE(SUM(discount) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+                COALESCE(SUM(total) FILTER (WHERE payment_status = 'COMPLETED'), 0),
+                COUNT(*) FILTER (WHERE payment_status = 'REFUNDED'),
+                COALESCE(SUM(total) FILTER (WHERE payment_status = 'REFUNDED'), 0)
+            FROM payments
+            WHERE deleted_at IS NULL
+              AND paid_at IS NOT NULL
+              AND payment_status IN ('COMPLETED', 'REFUNDED')
+            GROUP BY 1, 2, 3;
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
@@ -0,0 +1,83 @@
+from decimal import Decimal
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_daily_sales_rollup'),
+    ]
+
+    operations = [
+        # --- Create dish_daily_sales table ---
+        PostgresRunSQL(
+            sql="""
+            CREATE TABLE dish_daily_sales (
+                id SERIAL PRIMARY KEY,
+                dish_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                quantity_sold INTEGER NOT NULL DEFAULT 0,
+                gross_revenue NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                extras_revenue NUMERIC(14, 2) NOT NULL DEFAULT 0.00,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (dish_id) REFERENCES dishes(id) ON DELETE CASCADE,
+                CONSTRAINT uq_dish_daily_sales_key UNIQUE (dish_id, date)
+            );
+            CREATE INDEX idx_dish_daily_sales_date ON dish_daily_sales (date, dish_id);
+            """,
+            reverse_sql="""
+            DROP TABLE dish_daily_sales;
+            """,
+            state_operations=[
+                migrations.CreateModel(
+                    name='DishDailySales',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('dish', models.ForeignKey(
+                            on_delete=models.CASCADE,   # Matches ON DELETE CASCADE
+                            related_name='daily_sales',
+                            to='menu.dish',
+                        )),
+                        ('date', models.DateField()),
+                        ('quantity_sold', models.IntegerField(default=0)),
+                        ('gross_revenue', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('extras_revenue', models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))),
+                        ('updated_at', models.DateTimeField(auto_now=True)),
+                    ],
+                    options={
+                        'db_table': 'dish_daily_sales',
+                        'verbose_name': 'Dish Daily Sales',
+                        'verbose_name_plural': 'Dish Daily Sales',
+                        'constraints': [
+                            models.UniqueConstraint(fields=['dish', 'date'], name='uq_dish_daily_sales_key'),
+                        ],
+                        'indexes': [
+                            models.Index(fields=['date', 'dish'], name='idx_dish_daily_sales_date'),
+                        ],
+                    },
+                ),
+            ]
+        ),
+
+        # --- Backfill from the items of completed payments ---
+        PostgresRunSQL(
+            sql="""
+            INSERT INTO dish_daily_sales (dish_id, date, quantity_sold, gross_revenue, extras_revenue)
+            SELECT
+                pi.menu_item_id,
+                (p.paid_at AT TIME ZONE 'UTC')::date,
+                SUM(pi.quantity),
+                SUM(pi.total),
+                SUM(pi.extras_charges)
+            FROM payment_items pi
+            JOIN payments p ON p.id = pi.payment_id
+            WHERE p.payment_status = 'COMPLETED'
+              AND p.deleted_at IS NULL
+              AND p.paid_at IS NOT NULL
+              AND pi.menu_item_id IS NOT NULL
+            GROUP BY 1, 2;
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
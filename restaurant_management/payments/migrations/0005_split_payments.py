@@ -0,0 +1,52 @@
+from django.db import migrations, models
+import django.db.models.deletion
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_dish_daily_sales'),
+        ('orders', '0006_order_item_seat'),
+    ]
+
+    operations = [
+        # --- Allow several payments per order and several payment items per order item (split checks) ---
+        PostgresRunSQL(
+            sql="""
+            ALTER TABLE payments DROP CONSTRAINT payments_order_id_key;
+            CREATE INDEX idx_payments_order ON payments (order_id);
+            ALTER TABLE payment_items DROP CONSTRAINT payment_items_order_item_id_key;
+            CREATE INDEX idx_payment_items_order_item ON payment_items (order_item_id);
+            """,
+            reverse_sql="""
+            DROP INDEX idx_payment_items_order_item;
+            ALTER TABLE payment_items ADD CONSTRAINT payment_items_order_item_id_key UNIQUE (order_item_id);
+            DROP INDEX idx_payments_order;
+            ALTER TABLE payments ADD CONSTRAINT payments_order_id_key UNIQUE (order_id);
+            """,
+            state_operations=[
+                migrations.AlterField(
+                    model_name='payment',
+                    name='order',
+                    field=models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to='orders.order',
+                        null=True,
+                        related_name='payments'
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name='paymentitem',
+                    name='order_item',
+                    field=models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to='orders.orderitem',
+                        null=True,
+                        blank=True,
+                        related_name='payment_items'
+                    ),
+                ),
+            ]
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_split_payments'),
+    ]
+
+    operations = [
+        # --- Flag the shares of an item split between several payments ---
+        PostgresRunSQL(
+            sql="""
+            ALTER TABLE payment_items ADD COLUMN is_split_share BOOLEAN NOT NULL DEFAULT FALSE;
+            """,
+            reverse_sql="""
+            ALTER TABLE payment_items DROP COLUMN is_split_share;
+            """,
+            state_operations=[
+                migrations.AddField(
+                    model_name='paymentitem',
+                    name='is_split_share',
+                    field=models.BooleanField(default=False),
+                ),
+            ]
+        ),
+
+        # --- Backfill: an order item charged by several payment items was split ---
+        PostgresRunSQL(
+            sql="""
+            UPDATE payment_items
+            SET is_split_share = TRUE
+            WHERE order_item_id IN (
+                SELECT order_item_id
+                FROM payment_items
+                WHERE order_item_id IS NOT NULL
+                GROUP BY order_item_id
+                HAVING COUNT(*) > 1
+            );
+            """,
+            reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
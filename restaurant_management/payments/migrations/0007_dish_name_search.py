@@ -0,0 +1,51 @@
+from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
+
+
+DISH_NAME_TRIGRAM_INDEX_SQL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_dishes_name_trgm ON dishes USING GIN (UPPER(name) gin_trgm_ops);
+"""
+
+DROP_DISH_NAME_TRIGRAM_INDEX_SQL = """
+DROP INDEX IF EXISTS idx_dishes_name_trgm;
+"""
+
+
+def create_dish_name_trigram_index(apps, schema_editor):
+    # pg_trgm only exists on Postgres; other backends (SQLite in tests) keep the plain scan
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DISH_NAME_TRIGRAM_INDEX_SQL)
+
+
+def drop_dish_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_DISH_NAME_TRIGRAM_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_payment_item_split_share'),
+    ]
+
+    operations = [
+        # --- Payment items by dish, for the dish-name search ---
+        PostgresRunSQL(
+            sql="""
+            CREATE INDEX idx_payment_items_menu_item ON payment_items (menu_item_id);
+            """,
+            reverse_sql="""
+            DROP INDEX idx_payment_items_menu_item;
+            """,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='paymentitem',
+                    index=models.Index(fields=['menu_item'], name='idx_payment_items_menu_item'),
+                ),
+            ]
+        ),
+
+        # --- Trigram index serving the dish-name search (ILIKE '%term%') ---
+        migrations.RunPython(create_dish_name_trigram_index, drop_dish_name_trigram_index),
+    ]
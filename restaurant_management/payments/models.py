@@ -1,11 +1,24 @@
-from django.db import models
-from django.db.models import Q
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Exists, F, OuterRef, Prefetch, Q, Sum
 from decimal import Decimal
 from django.utils import timezone
 from datetime import datetime
+from menu.models import Dish
 
 class PaymentQuerySet(models.QuerySet):
     """Custom QuerySet for Payment model with dynamic search capabilities."""
+
+    def with_items(self):
+        """
+        Load payments with their order and items in a fixed number of queries.
+
+        Returns:
+            QuerySet joining the order and prefetching the payment items, so
+            serializing a page of payments costs 2 queries.
+        """
+        return self.select_related('order').prefetch_related(
+            Prefetch('payment_items', queryset=PaymentItem.objects.order_by('id'))
+        )
     
     def dynamic_search(self, search_params: dict):
         """
@@ -29,14 +42,7 @@ class PaymentQuerySet(models.QuerySet):
         
         # Text search 
         if search_params.get('search'):
-            search_term = search_params['search']
-            queryset = queryset.filter(
-                Q(order__id__icontains=search_term) |
-                Q(payment_method__icontains=search_term) |
-                Q(payment_status__icontains=search_term) |
-                Q(currency_type__icontains=search_term) |
-                Q(payment_items__menu_item__name__icontains=search_term)
-            ).distinct()
+            queryset = queryset.filter(self._search_condition(search_params['search']))
         
         if search_params.get('payment_method'):
             queryset = queryset.filter(payment_method=search_params['payment_method'])
@@ -75,6 +81,43 @@ class PaymentQuerySet(models.QuerySet):
         
         return queryset
 
+    def _search_condition(self, search_term: str):
+        """
+        Route the free-text search to an indexed lookup based on the shape of the term:
+            - numeric: equality on the order ID
+            - a payment method, status or currency code: equality on that column
+            - anything else: the item descriptions or the name of the charged dish, served
+              on Postgres by the pg_trgm indexes on UPPER(charge_description) and UPPER(dishes.name)
+        """
+        search_term = search_term.strip()
+        if search_term.isdigit():
+            return Q(order_id=int(search_term))
+
+        enum_value = search_term.upper()
+        enum_condition = Q()
+        for field, choices in (
+            ('payment_method', Payment.PAYMENT_METHODS),
+            ('payment_status', Payment.PAYMENT_STATUS),
+            ('currency_type', Payment.CURRENCY_TYPES),
+        ):
+            if enum_value in dict(choices):
+                enum_condition |= Q(**{field: enum_value})
+        if enum_condition:
+            return enum_condition
+
+        # Matched with correlated EXISTS instead of a join, so each payment appears once
+        # and no DISTINCT over the joined rows is needed. The description and the dish name
+        # are separate EXISTS so each can use its own index. Manual items can describe a
+        # charge differently from the dish's current name, so both are searched.
+        matching_dishes = Dish.objects.filter(name__icontains=search_term).values('id')
+        return Q(Exists(PaymentItem.objects.filter(
+            payment=OuterRef('pk'),
+            charge_description__icontains=search_term
+        ))) | Q(Exists(PaymentItem.objects.filter(
+            payment=OuterRef('pk'),
+            menu_item__in=matching_dishes
+        )))
+
 class Payment(models.Model):
     PAYMENT_METHODS = [
         ('CASH', 'Cash'),
@@ -93,7 +136,7 @@ class Payment(models.Model):
         ('EUR', 'Euro'),
     ]
 
-    order = models.OneToOneField('orders.Order', on_delete=models.PROTECT, null=True, related_name='payment')
+    order = models.ForeignKey('orders.Order', on_delete=models.PROTECT, null=True, related_name='payments')
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHODS, null=True)
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS)
     sub_total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
@@ -135,13 +178,23 @@ class Payment(models.Model):
 
 
     def soft_delete(self):
-        self.deleted_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            previous_contribution = DailySalesRollup.contribution_of(self)
+            self.deleted_at = timezone.now()
+            self.save()
+            DailySalesRollup.objects.record_change(previous_contribution, DailySalesRollup.contribution_of(self))
+            if previous_contribution and self.payment_status == 'COMPLETED':
+                DishDailySales.objects.record_payment(self, removed=True)
 
     class Meta:
         db_table = 'payments'
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
+        indexes = [
+            models.Index(fields=['created_at'], name='idx_payments_created'),
+            models.Index(fields=['payment_status', 'created_at'], name='idx_payments_status_created'),
+            models.Index(fields=['total'], name='idx_payments_total'),
+        ]
 
     def __str__(self):
         return f'Payment for Order {self.order_id} - {self.total} {self.currency_type}'
@@ -152,10 +205,10 @@ class PaymentItem(models.Model):
         on_delete=models.CASCADE, 
         related_name='payment_items'
     )
-    order_item = models.OneToOneField(
+    order_item = models.ForeignKey(
         'orders.OrderItem', 
         on_delete=models.PROTECT, 
-        related_name='payment_item',
+        related_name='payment_items',
         null=True, 
         blank=True, 
     )
@@ -178,11 +231,218 @@ class PaymentItem(models.Model):
     extras_charges = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))  # Valor por defecto
     total = models.DecimalField(max_digits=10, decimal_places=2)
     charge_description = models.CharField(max_length=255, default='')
+    is_split_share = models.BooleanField(default=False)  # Share of an item split between payments; total is not price * quantity
 
     class Meta:
         db_table = 'payment_items'
         verbose_name = 'Payment Item'
         verbose_name_plural = 'Payment Items'
+        indexes = [
+            models.Index(fields=['payment'], name='idx_payment_items_payment'),
+            models.Index(fields=['menu_item'], name='idx_payment_items_menu_item'),
+        ]
 
     def __str__(self):
         return f'{self.quantity}x {self.menu_item.name} - {self.total}'
+
+
+def lock_sales_days(days, exclusive: bool = False) -> None:
+    """
+    Takes a transaction-level advisory lock on the sales rollups of each day, in
+    date order. Incremental updates take it shared, so they don't block each other;
+    a rebuild takes it exclusive, so it neither reads payments while an update of
+    those days is uncommitted nor overwrites one applied after its read.
+    Other backends (SQLite in tests) serialise writers already and skip it.
+    """
+    if connection.vendor != 'postgresql':
+        return
+
+    lock_function = 'pg_advisory_xact_lock' if exclusive else 'pg_advisory_xact_lock_shared'
+    day_numbers = sorted({day.toordinal() for day in days})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {lock_function}(%s, day) FROM (SELECT unnest(%s::integer[]) AS day ORDER BY 1) AS days",
+            [DailySalesRollup.LOCK_NAMESPACE, day_numbers]
+        )
+
+
+class DailySalesRollupQuerySet(models.QuerySet):
+    """Custom QuerySet for DailySalesRollup with incremental maintenance."""
+
+    def record_change(self, previous: dict, current: dict) -> None:
+        """
+        Apply the difference between a payment's previous and current contribution
+        (see `DailySalesRollup.contribution_of`) to the affected rollup rows with
+        F() expression UPDATEs, so concurrent transitions don't lose each other.
+        The days are locked shared against a concurrent rebuild until commit.
+        """
+        deltas = {}
+        for sign, contribution in ((-1, previous), (1, current)):
+            for key, values in contribution.items():
+                row_delta = deltas.setdefault(key, {})
+                for field, value in values.items():
+                    row_delta[field] = row_delta.get(field, 0) + sign * value
+
+        lock_sales_days(date for date, _, _ in deltas)
+        for (date, currency_type, payment_method), row_delta in deltas.items():
+            row_delta = {field: value for field, value in row_delta.items() if value}
+            if not row_delta:
+                continue
+
+            row = self.filter(date=date, currency_type=currency_type, payment_method=payment_method)
+            increments = {field: F(field) + value for field, value in row_delta.items()}
+            if row.update(**increments, updated_at=timezone.now()):
+                continue
+
+            try:
+                with transaction.atomic():
+                    self.create(date=date, currency_type=currency_type, payment_method=payment_method, **row_delta)
+            except IntegrityError:
+                # Created concurrently between our UPDATE and INSERT
+                row.update(**increments, updated_at=timezone.now())
+
+
+class DailySalesRollup(models.Model):
+    """
+    Sales per (day paid, currency, payment method), kept in step with `payments`.
+
+    Only non-deleted COMPLETED and REFUNDED payments count: completed payments add to
+    the sales sums, refunded ones to the refund counters. The table can always be
+    rebuilt from `payments` with `manage.py rebuild_daily_sales`.
+    """
+    UNSPECIFIED_METHOD = 'UNSPECIFIED'
+    SALES_FIELDS = ('sub_total', 'vat', 'discount', 'total')
+    LOCK_NAMESPACE = 7301  # First key of the per-day advisory locks, see `lock_sales_days`
+
+    date = models.DateField()
+    currency_type = models.CharField(max_length=3, choices=Payment.CURRENCY_TYPES)
+    payment_method = models.CharField(max_length=20)
+    payments_count = models.IntegerField(default=0)
+    sub_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    vat = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    refunds_count = models.IntegerField(default=0)
+    refunded_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DailySalesRollupQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'daily_sales_rollups'
+        verbose_name = 'Daily Sales Rollup'
+        verbose_name_plural = 'Daily Sales Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'currency_type', 'payment_method'],
+                name='uq_daily_sales_rollups_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.date} {self.currency_type} {self.payment_method} - {self.total}'
+
+    @classmethod
+    def contribution_of(cls, payment: Payment) -> dict:
+        """
+        Returns what a payment adds to the rollup in its current state, as
+        `{(date, currency_type, payment_method): {field: value}}`.
+        """
+        if payment.deleted_at or not payment.paid_at:
+            return {}
+
+        key = (
+            timezone.localdate(payment.paid_at),
+            payment.currency_type,
+            payment.payment_method or cls.UNSPECIFIED_METHOD,
+        )
+        if payment.payment_status == 'COMPLETED':
+            values = {field: getattr(payment, field) for field in cls.SALES_FIELDS}
+            return {key: {'payments_count': 1, **values}}
+        if payment.payment_status == 'REFUNDED':
+            return {key: {'refunds_count': 1, 'refunded_total': payment.total}}
+        return {}
+
+
+class DishDailySalesQuerySet(models.QuerySet):
+    """Custom QuerySet for DishDailySales with bulk incremental maintenance."""
+
+    def record_payment(self, payment: Payment, removed: bool = False) -> None:
+        """
+        Add (or remove) a payment's items to the sales of their dishes on the day it
+        was paid, with one `INSERT ... ON CONFLICT DO UPDATE` for all of its dishes.
+        The day is locked shared against a concurrent rebuild until commit.
+        """
+        if payment.paid_at:
+            self._record_items(payment.payment_items.all(), payment.paid_at, removed)
+
+    def record_payments(self, payment_ids: list, paid_at) -> None:
+        """
+        Add the items of many payments settled at the same moment to the sales of
+        their dishes, with a single upsert for all of them.
+        """
+        self._record_items(PaymentItem.objects.filter(payment_id__in=payment_ids), paid_at)
+
+    def _record_items(self, payment_items: models.QuerySet, paid_at, removed: bool = False) -> None:
+        sales = list(
+            payment_items
+            .filter(menu_item__isnull=False)
+            .values('menu_item_id')
+            .annotate(quantity=Sum('quantity'), gross=Sum('total'), extras=Sum('extras_charges'))
+            .order_by('menu_item_id')
+        )
+        if not sales:
+            return
+
+        sign = -1 if removed else 1
+        day = timezone.localdate(paid_at)
+        lock_sales_days([day])
+        now = timezone.now()
+        params = []
+        for row in sales:
+            params.extend([row['menu_item_id'], day, sign * row['quantity'], sign * row['gross'], sign * row['extras'], now])
+
+        table = DishDailySales._meta.db_table
+        values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(sales))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (dish_id, date, quantity_sold, gross_revenue, extras_revenue, updated_at)
+                VALUES {values}
+                ON CONFLICT (dish_id, date) DO UPDATE SET
+                    quantity_sold = {table}.quantity_sold + EXCLUDED.quantity_sold,
+                    gross_revenue = {table}.gross_revenue + EXCLUDED.gross_revenue,
+                    extras_revenue = {table}.extras_revenue + EXCLUDED.extras_revenue,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                params
+            )
+
+
+class DishDailySales(models.Model):
+    """
+    Units sold and revenue per (dish, day paid), aggregated from the items of
+    completed payments for menu engineering reports.
+    """
+    dish = models.ForeignKey('menu.Dish', on_delete=models.CASCADE, related_name='daily_sales')
+    date = models.DateField()
+    quantity_sold = models.IntegerField(default=0)
+    gross_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    extras_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DishDailySalesQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'dish_daily_sales'
+        verbose_name = 'Dish Daily Sales'
+        verbose_name_plural = 'Dish Daily Sales'
+        constraints = [
+            models.UniqueConstraint(fields=['dish', 'date'], name='uq_dish_daily_sales_key'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'dish'], name='idx_dish_daily_sales_date'),
+        ]
+
+    def __str__(self):
+        return f'{self.dish_id} on {self.date} - {self.quantity_sold} sold'
@@ -1,13 +1,18 @@
 from rest_framework import serializers
 from decimal import Decimal
-from .models import Payment, PaymentItem
+from .models import Payment, PaymentItem, DailySalesRollup
 from orders.models import Order
 from django.core.validators import MinValueValidator
 
 class PaymentItemSerializer(serializers.ModelSerializer):
     """
-    Serializer for PaymentItem with read-only calculated fields
+    Serializer for PaymentItem with read-only calculated fields.
+    References are plain ids, resolved by the service in one query per table.
     """
+    order_item = serializers.IntegerField(source='order_item_id', min_value=1, required=False, allow_null=True)
+    menu_item = serializers.IntegerField(source='menu_item_id', min_value=1, required=False, allow_null=True)
+    menu_item_extra = serializers.IntegerField(source='menu_item_extra_id', min_value=1, required=False, allow_null=True)
+
     class Meta:
         model = PaymentItem
         fields = [
@@ -19,23 +24,29 @@ class PaymentItemSerializer(serializers.ModelSerializer):
             'quantity',
             'extras_charges',
             'total',
-            'charge_description'
+            'charge_description',
+            'is_split_share'
         ]
-        read_only_fields = ['total', 'extras_charges']
+        read_only_fields = ['total', 'extras_charges', 'is_split_share']
         extra_kwargs = {
-            'price': {'validators': [MinValueValidator(Decimal('0.00'))]},
-            'quantity': {'validators': [MinValueValidator(1)]}
+            'price': {'validators': [MinValueValidator(Decimal('0.00'))], 'required': False},
+            'quantity': {'validators': [MinValueValidator(1)], 'required': False}
         }
 
 
     def validate(self, data):
         """
-        Validate that the item has either an order_item or menu_item
+        Validate that the item has either an order_item or menu_item, and that items
+        not charged from an order item carry their price and quantity
         """
-        if not data.get('order_item') and not data.get('menu_item'):
+        if not data.get('order_item_id') and not data.get('menu_item_id'):
             raise serializers.ValidationError(
                 "Payment item must have either an order_item or menu_item"
             )
+        if not data.get('order_item_id') and (data.get('price') is None or data.get('quantity') is None):
+            raise serializers.ValidationError(
+                "Payment item without an order_item must have a price and quantity"
+            )
         return data
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -68,6 +79,7 @@ class PaymentSerializer(serializers.ModelSerializer):
             'payment_items'
         ]
         read_only_fields = [
+            'payment_status',
             'sub_total',
             'vat',
             'total',
@@ -80,3 +92,63 @@ class PaymentSerializer(serializers.ModelSerializer):
         }
 
 
+class PaymentCompleteSerializer(serializers.Serializer):
+    """
+    Input for settling a pending payment
+    """
+    payment_method = serializers.ChoiceField(choices=Payment.PAYMENT_METHODS, required=False)
+
+
+class PaymentSettlementSerializer(serializers.Serializer):
+    payment_id = serializers.IntegerField(min_value=1)
+    payment_method = serializers.ChoiceField(choices=Payment.PAYMENT_METHODS, required=False)
+
+
+class PaymentBulkSettleSerializer(serializers.Serializer):
+    """
+    Input for settling many pending payments at once
+    """
+    MAX_SETTLEMENTS = 500
+
+    settlements = PaymentSettlementSerializer(many=True, allow_empty=False, max_length=MAX_SETTLEMENTS)
+
+
+class SplitCheckSerializer(serializers.Serializer):
+    """
+    Input for closing an order with its check split into several payments
+    """
+    mode = serializers.ChoiceField(choices=['item', 'seat', 'even'])
+    parts = serializers.IntegerField(min_value=2, max_value=20, required=False)
+    item_groups = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False),
+        required=False,
+        max_length=20
+    )
+
+    def validate(self, data):
+        """
+        Validate that an even split has a number of parts and a split by item has its groups
+        """
+        if data['mode'] == 'even' and not data.get('parts'):
+            raise serializers.ValidationError("An even split needs 'parts'")
+        if data['mode'] == 'item' and not data.get('item_groups'):
+            raise serializers.ValidationError("A split by item needs 'item_groups'")
+        return data
+
+
+class DailySalesRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DailySalesRollup
+        fields = [
+            'date',
+            'currency_type',
+            'payment_method',
+            'payments_count',
+            'sub_total',
+            'vat',
+            'discount',
+            'total',
+            'refunds_count',
+            'refunded_total'
+        ]
+        read_only_fields = fields
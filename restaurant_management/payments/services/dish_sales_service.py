@@ -0,0 +1,75 @@
+from datetime import date
+from typing import List
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from ..models import DishDailySales
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException
+
+class DishSalesService:
+    """
+    Menu engineering reports. Every query reads the per-(dish, day) aggregate,
+    never the payment items themselves.
+    """
+    RANKINGS = {
+        'quantity': 'total_quantity',
+        'revenue': 'total_revenue',
+    }
+    TREND_GRANULARITIES = {
+        'day': TruncDay,
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
+    DEFAULT_TOP_LIMIT = 10
+    MAX_TOP_LIMIT = 100
+
+    @classmethod
+    def get_top_dishes(cls, date_from: date, date_to: date, limit: int = DEFAULT_TOP_LIMIT, rank_by: str = 'quantity') -> List[dict]:
+        """
+        Returns the best selling dishes over the range, ranked by units sold or revenue.
+
+        Raises:
+            BusinessRuleViolationException: If the ranking or limit is invalid
+        """
+        if rank_by not in cls.RANKINGS:
+            raise BusinessRuleViolationException(f"rank_by must be one of {', '.join(cls.RANKINGS)}")
+        if not 1 <= limit <= cls.MAX_TOP_LIMIT:
+            raise BusinessRuleViolationException(f"limit must be between 1 and {cls.MAX_TOP_LIMIT}")
+
+        rows = (
+            DishDailySales.objects
+            .filter(date__gte=date_from, date__lte=date_to)
+            .values('dish_id', 'dish__name')
+            .annotate(**cls._sales_totals())
+            .order_by(f'-{cls.RANKINGS[rank_by]}', 'dish_id')[:limit]
+        )
+        return [{**row, 'dish_name': row.pop('dish__name')} for row in rows]
+
+    @classmethod
+    def get_dish_trend(cls, dish_id: int, date_from: date, date_to: date, granularity: str = 'day') -> List[dict]:
+        """
+        Returns a dish's sales per day, week or month over the range, oldest first.
+
+        Raises:
+            BusinessRuleViolationException: If the granularity is invalid
+        """
+        if granularity not in cls.TREND_GRANULARITIES:
+            raise BusinessRuleViolationException(
+                f"granularity must be one of {', '.join(cls.TREND_GRANULARITIES)}"
+            )
+
+        return list(
+            DishDailySales.objects
+            .filter(dish_id=dish_id, date__gte=date_from, date__lte=date_to)
+            .annotate(period=cls.TREND_GRANULARITIES[granularity]('date'))
+            .values('period')
+            .annotate(**cls._sales_totals())
+            .order_by('period')
+        )
+
+    @staticmethod
+    def _sales_totals() -> dict:
+        return {
+            'total_quantity': Sum('quantity_sold'),
+            'total_revenue': Sum('gross_revenue'),
+            'total_extras_revenue': Sum('extras_revenue'),
+        }
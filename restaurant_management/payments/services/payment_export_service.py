@@ -0,0 +1,95 @@
+import csv
+import json
+from typing import Iterator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from ..models import PaymentItem
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _EchoBuffer:
+    """File-like object whose write returns the value, so csv.writer formats a single row."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class PaymentExportService:
+    """
+    Streams payments or their items as CSV or NDJSON.
+
+    Rows are read as plain dicts with `values()` and a chunked `iterator()` (a
+    server-side cursor on Postgres), and every row is encoded as soon as it is
+    read, so memory use stays flat however many payments are exported.
+    """
+    PAYMENT_FIELDS = (
+        'id',
+        'order_id',
+        'payment_method',
+        'payment_status',
+        'currency_type',
+        'sub_total',
+        'discount',
+        'vat_rate',
+        'vat',
+        'total',
+        'created_at',
+        'paid_at',
+    )
+    ITEM_FIELDS = (
+        'id',
+        'payment_id',
+        'order_item_id',
+        'menu_item_id',
+        'menu_item_extra_id',
+        'charge_description',
+        'price',
+        'quantity',
+        'extras_charges',
+        'total',
+    )
+    CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+    ROW_TYPES = ('payments', 'items')
+    DEFAULT_CHUNK_SIZE = 2000
+
+    @classmethod
+    def export(cls, payments: QuerySet, rows: str = 'payments', output: str = 'csv', chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Returns a generator of encoded lines for the payments, or for the items of
+        the payments, ordered by id. Nothing is queried until it is consumed.
+
+        Raises:
+            BusinessRuleViolationException: If the row type or output format is unknown
+        """
+        if rows not in cls.ROW_TYPES:
+            raise BusinessRuleViolationException(f"rows must be one of {', '.join(cls.ROW_TYPES)}")
+        if output not in cls.CONTENT_TYPES:
+            raise BusinessRuleViolationException(f"output must be one of {', '.join(cls.CONTENT_TYPES)}")
+
+        if rows == 'items':
+            fields = cls.ITEM_FIELDS
+            queryset = PaymentItem.objects.filter(payment__in=payments.order_by().values('id'))
+        else:
+            fields = cls.PAYMENT_FIELDS
+            queryset = payments
+        records = queryset.order_by('id').values(*fields).iterator(chunk_size=chunk_size)
+
+        encode = cls._encode_csv if output == 'csv' else cls._encode_ndjson
+        return encode(records, fields)
+
+    @staticmethod
+    def _encode_csv(records: Iterator[dict], fields: tuple) -> Iterator[str]:
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(fields)
+        for record in records:
+            yield writer.writerow([record[field] for field in fields])
+
+    @staticmethod
+    def _encode_ndjson(records: Iterator[dict], fields: tuple) -> Iterator[str]:
+        for record in records:
+            yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
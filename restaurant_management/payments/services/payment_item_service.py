@@ -1,7 +1,9 @@
+from django.db.models import Exists, OuterRef
 from ..models import Payment, PaymentItem
-from orders.models import OrderItem
-from decimal import Decimal
-from typing import List, Dict, Optional
+from orders.models import Order, OrderItem
+from menu.models import Dish, MenuExtra
+from typing import List, Dict, Optional, Tuple
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException, EntityNotFoundException
 from .payment_calculator_service import PaymentCalculatorService as CalculatorService
 
 class PaymentItemService:
@@ -10,7 +12,7 @@ class PaymentItemService:
     @classmethod
     def generate_items_from_order(cls, order_items: List[OrderItem], payment: Payment) -> List[PaymentItem]:
         """
-        Generate PaymentItems from OrderItems, grouping by menu_item.id.
+        Generate PaymentItems from OrderItems, grouping by dish and the price it was ordered at.
         
         Args:
             order_items: List of OrderItems to process
@@ -22,37 +24,98 @@ class PaymentItemService:
         grouped_items = {}
         
         for order_item in order_items:
-            menu_item = order_item.menu_item
+            group_key = (order_item.menu_item_id, order_item.unit_price)
             
-            if menu_item.id not in grouped_items:
-                grouped_items[menu_item.id] = cls._generate_item_from_order(payment, order_item)
+            if group_key not in grouped_items:
+                grouped_items[group_key] = cls._generate_item_from_order(payment, order_item)
             else:
-                cls._increase_item_values(grouped_items[menu_item.id], order_item)
+                cls._increase_item_values(grouped_items[group_key], order_item)
 
         return list(grouped_items.values())
 
     @classmethod
-    def generate_items(cls, payment: Payment, items_data: List[Dict]) -> List[PaymentItem]:
+    def resolve_references(cls, items_data: List[Dict], order: Optional[Order] = None) -> Tuple[Dict[int, OrderItem], Dict[int, Dish], Dict[int, MenuExtra]]:
         """
-        Generate PaymentItems from raw item data.
+        Loads every order item, dish and extra referenced by the items in one query per table.
+        
+        Args:
+            items_data: List of validated item data dictionaries
+            order: Order the payment is for, if any; its order items are the only ones allowed
+            
+        Returns:
+            Tuple of (order items by ID, dishes by ID, extras by ID)
+            
+        Raises:
+            EntityNotFoundException: If any referenced row does not exist
+            BusinessRuleViolationException: If an order item is already charged, listed
+                twice or belongs to another order
+        """
+        order_item_ids = [item['order_item_id'] for item in items_data if item.get('order_item_id')]
+        dish_ids = {item['menu_item_id'] for item in items_data if item.get('menu_item_id') and not item.get('order_item_id')}
+        extra_ids = {item['menu_item_extra_id'] for item in items_data if item.get('menu_item_extra_id') and not item.get('order_item_id')}
+
+        if len(order_item_ids) != len(set(order_item_ids)):
+            raise BusinessRuleViolationException("An order item can only be charged once per payment")
+
+        order_items = OrderItem.objects.select_related('menu_item', 'menu_extra').annotate(
+            is_charged=Exists(PaymentItem.objects.filter(order_item=OuterRef('pk')))
+        ).in_bulk(order_item_ids) if order_item_ids else {}
+        dishes = Dish.objects.in_bulk(dish_ids) if dish_ids else {}
+        extras = MenuExtra.objects.in_bulk(extra_ids) if extra_ids else {}
+
+        for name, ids, found in (('Order Items', set(order_item_ids), order_items), ('Dishes', dish_ids, dishes), ('Menu Extras', extra_ids, extras)):
+            missing = ids - found.keys()
+            if missing:
+                raise EntityNotFoundException(f"{name} {sorted(missing)} not found")
+
+        charged_items = [item_id for item_id, order_item in order_items.items() if order_item.is_charged]
+        if charged_items:
+            raise BusinessRuleViolationException(f"Order Items {sorted(charged_items)} are already charged")
+
+        if order:
+            foreign_items = [item_id for item_id, order_item in order_items.items() if order_item.order_id != order.id]
+            if foreign_items:
+                raise BusinessRuleViolationException(f"Order Items {sorted(foreign_items)} don't belong to order {order.id}")
+
+        return order_items, dishes, extras
+
+    @classmethod
+    def generate_items(
+        cls,
+        payment: Payment,
+        items_data: List[Dict],
+        order_items: Dict[int, OrderItem],
+        dishes: Dict[int, Dish],
+        extras: Dict[int, MenuExtra]
+    ) -> List[PaymentItem]:
+        """
+        Generate PaymentItems from raw item data, with references already resolved
+        by `resolve_references`.
         
         Args:
             payment: Payment object to associate with items
             items_data: List of dictionaries containing item data
+            order_items: Referenced order items by ID
+            dishes: Referenced dishes by ID
+            extras: Referenced menu extras by ID
             
         Returns:
-            List of generated PaymentItems
+            List of generated PaymentItems (not yet saved to database)
         """
         payment_items = []
         
         for item in items_data:
-            order_item = item.get('order_item')
-            menu_item = item.get('menu_item')
+            order_item_id = item.get('order_item_id')
             
-            if order_item and menu_item:
-                payment_item = cls._generate_item_from_order(payment, order_item)
+            if order_item_id:
+                payment_item = cls._generate_item_from_order(payment, order_items[order_item_id])
             else:
-                payment_item = cls._generate_item_from_data(payment, item)
+                payment_item = cls._generate_item_from_data(
+                    payment,
+                    item,
+                    dishes.get(item.get('menu_item_id')),
+                    extras.get(item.get('menu_item_extra_id'))
+                )
                 
             payment_items.append(payment_item)
 
@@ -84,7 +147,7 @@ class PaymentItemService:
     @classmethod
     def _generate_item_from_order(cls, payment: Payment, order_item: OrderItem) -> PaymentItem:
         """
-        Create a PaymentItem from an OrderItem.
+        Create a PaymentItem from an OrderItem, at the prices it was added with.
         
         Args:
             payment: Associated Payment object
@@ -94,52 +157,62 @@ class PaymentItemService:
             Generated PaymentItem
         """
         menu_item = order_item.menu_item
-        menu_extra = order_item.menu_extra
         
         base_price = CalculatorService.calculate_item_base_price(
-            menu_item.price, 
+            order_item.unit_price, 
             order_item.quantity
         )
-        extras_price = CalculatorService.calculate_menu_extra_charges(menu_extra)
+        extras_price = order_item.extra_price
         item_total = CalculatorService.calculate_item_total_price(base_price, extras_price)
         
         return PaymentItem(
             payment=payment,
             order_item=order_item,
             menu_item=menu_item,
-            menu_extra=menu_extra,
+            menu_item_extra=order_item.menu_extra,
             quantity=order_item.quantity,
-            price=menu_item.price,
+            price=order_item.unit_price,
             extras_charges=extras_price,
             total=item_total,
             charge_description=menu_item.name,
         )
 
     @classmethod
-    def _generate_item_from_data(cls, payment: Payment, item_data: Dict) -> PaymentItem:
+    def _generate_item_from_data(
+        cls,
+        payment: Payment,
+        item_data: Dict,
+        menu_item: Optional[Dish] = None,
+        menu_extra: Optional[MenuExtra] = None
+    ) -> PaymentItem:
         """
         Create a PaymentItem from raw data dictionary.
         
         Args:
             payment: Associated Payment object
             item_data: Dictionary containing item data
+            menu_item: Dish the item charges, if any
+            menu_extra: Menu extra the item charges, if any
             
         Returns:
             Generated PaymentItem
         """
-        extras_charges = item_data.get('extra_charges', Decimal('0.00'))
-        total_price = CalculatorService.calculate_item_total_price(
-            item_data['price'], 
-            extras_charges
+        base_price = CalculatorService.calculate_item_base_price(
+            item_data['price'],
+            item_data['quantity']
         )
+        extras_charges = CalculatorService.calculate_menu_extra_charges(menu_extra)
+        total_price = CalculatorService.calculate_item_total_price(base_price, extras_charges)
 
         return PaymentItem(
             payment=payment,
+            menu_item=menu_item,
+            menu_item_extra=menu_extra,
             quantity=item_data['quantity'],
             price=item_data['price'],
             extras_charges=extras_charges,
             total=total_price,
-            charge_description=item_data.get('charge_description', '')
+            charge_description=item_data.get('charge_description') or (menu_item.name if menu_item else '')
         )
 
     @classmethod
@@ -151,14 +224,11 @@ class PaymentItemService:
             existing_item: PaymentItem to update
             order_item: OrderItem containing update values
         """
-        menu_item = order_item.menu_item
-        menu_extra = order_item.menu_extra
-        
         base_price = CalculatorService.calculate_item_base_price(
-            menu_item.price, 
+            order_item.unit_price, 
             order_item.quantity
         )
-        extras_price = CalculatorService.calculate_menu_extra_charges(menu_extra)
+        extras_price = order_item.extra_price
         item_total = CalculatorService.calculate_item_total_price(base_price, extras_price)
 
         existing_item.quantity += order_item.quantity
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Set
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from ..models import Payment, PaymentItem
+from .sales_rollup_service import SalesRollupService
+from shared.utils.iterables import iter_chunks
+from shared.utils.price_calculator import PriceCalculator
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RecalculationResult:
+    payments_checked: int = 0
+    payments_updated: int = 0
+    items_updated: int = 0
+    settled_days: set = field(default_factory=set)
+
+
+class PaymentRecalculationService:
+    """
+    Recomputes item and payment totals for many payments at once.
+
+    Rows are read as plain tuples with `values_list`, every amount is summed as
+    integer cents (no per-item Decimal arithmetic or model instances), and only the
+    rows whose totals changed are written back with `bulk_update`. Split shares
+    keep their allocated totals; only their payments' VAT and totals are recomputed.
+    """
+    DEFAULT_CHUNK_SIZE = 1000
+    SETTLED_STATUSES = ('COMPLETED', 'REFUNDED')
+
+    @classmethod
+    def recalculate(
+        cls,
+        payments: QuerySet,
+        vat_rate: Optional[Decimal] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        dry_run: bool = False
+    ) -> RecalculationResult:
+        """
+        Recalculates the payments in `payments`, one chunk per transaction.
+
+        Args:
+            payments: Payments to recalculate
+            vat_rate: New VAT rate to apply (keeps each payment's own rate when None)
+            chunk_size: Payments loaded and written per transaction
+            dry_run: Compute and count the changes without writing them
+
+        Returns:
+            RecalculationResult with the number of checked and updated rows. When
+            settled payments change, the sales rollups of their days are rebuilt in
+            the same transaction as the chunk.
+        """
+        result = RecalculationResult()
+        payment_ids = payments.order_by('id').values_list('id', flat=True).iterator(chunk_size=chunk_size)
+
+        for chunk in iter_chunks(payment_ids, chunk_size):
+            with transaction.atomic():
+                settled_days = cls._recalculate_chunk(chunk, vat_rate, result, dry_run)
+                if settled_days and not dry_run:
+                    SalesRollupService.rebuild(min(settled_days), max(settled_days))
+            result.settled_days |= settled_days
+            logger.info(f"Recalculated payments {chunk[0]} to {chunk[-1]}.")
+
+        return result
+
+    @classmethod
+    def _recalculate_chunk(cls, payment_ids: List[int], vat_rate: Optional[Decimal], result: RecalculationResult, dry_run: bool) -> Set[date]:
+        """
+        Recalculates one chunk of payments and returns the days of the settled
+        payments whose totals changed.
+        """
+        settled_days = set()
+        sub_totals: Dict[int, int] = defaultdict(int)
+        changed_items = []
+
+        item_rows = PaymentItem.objects.filter(payment_id__in=payment_ids).values_list(
+            'id', 'payment_id', 'price', 'quantity', 'extras_charges', 'total', 'is_split_share'
+        )
+        for item_id, payment_id, price, quantity, extras_charges, total, is_split_share in item_rows:
+            if is_split_share:
+                # The share of an item split between payments keeps the total it was allocated
+                sub_totals[payment_id] += PriceCalculator.to_cents(total)
+                continue
+
+            item_total = PriceCalculator.to_cents(price) * quantity + PriceCalculator.to_cents(extras_charges)
+            sub_totals[payment_id] += item_total
+            if item_total != PriceCalculator.to_cents(total):
+                changed_items.append(PaymentItem(id=item_id, total=PriceCalculator.from_cents(item_total)))
+
+        changed_payments = []
+        payment_rows = Payment.objects.select_for_update().filter(id__in=payment_ids).values_list(
+            'id', 'vat_rate', 'discount', 'sub_total', 'vat', 'total', 'payment_status', 'paid_at'
+        )
+        for payment_id, current_rate, discount, sub_total, vat, total, payment_status, paid_at in payment_rows:
+            rate = current_rate if vat_rate is None else vat_rate
+            new_sub_total = sub_totals[payment_id]
+            new_vat = cls._apply_rate(new_sub_total, rate)
+            new_total = new_sub_total + new_vat - PriceCalculator.to_cents(discount)
+
+            current = (PriceCalculator.to_cents(sub_total), PriceCalculator.to_cents(vat), PriceCalculator.to_cents(total), current_rate)
+            if current == (new_sub_total, new_vat, new_total, rate):
+                continue
+
+            changed_payments.append(Payment(
+                id=payment_id,
+                vat_rate=rate,
+                sub_total=PriceCalculator.from_cents(new_sub_total),
+                vat=PriceCalculator.from_cents(new_vat),
+                total=PriceCalculator.from_cents(new_total)
+            ))
+            if payment_status in cls.SETTLED_STATUSES and paid_at:
+                settled_days.add(timezone.localdate(paid_at))
+
+        result.payments_checked += len(payment_ids)
+        result.payments_updated += len(changed_payments)
+        result.items_updated += len(changed_items)
+        if dry_run:
+            return settled_days
+
+        PaymentItem.objects.bulk_update(changed_items, ['total'], batch_size=cls.DEFAULT_CHUNK_SIZE)
+        Payment.objects.bulk_update(
+            changed_payments,
+            ['vat_rate', 'sub_total', 'vat', 'total'],
+            batch_size=cls.DEFAULT_CHUNK_SIZE
+        )
+        return settled_days
+
+    @staticmethod
+    def _apply_rate(cents: int, rate: Decimal) -> int:
+        """VAT in cents, rounded half up. `rate` has at most 2 decimals, as stored."""
+        rate_hundredths = int(rate * 100)
+        return (cents * rate_hundredths + 50) // 100
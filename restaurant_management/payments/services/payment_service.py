@@ -1,7 +1,17 @@
-from ..models import Payment, PaymentItem
+from collections import defaultdict
+from typing import List
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from ..models import Payment, PaymentItem, DailySalesRollup, DishDailySales
 from orders.models import Order, OrderItem
+from orders.services.order_service import OrderService
 from .payment_item_service import PaymentItemService as ItemService
 from .payment_calculator_service import PaymentCalculatorService as CalculatorService 
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException
+import logging
+
+logger = logging.getLogger(__name__)
 
 class PaymentService: 
     FILTER_MAPPING = {
@@ -36,47 +46,307 @@ class PaymentService:
         return search_params
 
 
+    @classmethod
+    def close_check(cls, order: Order) -> Payment:
+        """
+        Completes an order and creates its pending payment in a single transaction.
+        The order row is locked first (`lock_chargeable_order`), so a concurrent close
+        or payment waits and then fails instead of creating a second payment.
+
+        Args:
+            order: The order to close
+
+        Returns:
+            The created Payment, with its items
+        """
+        with transaction.atomic():
+            locked_order = cls.lock_chargeable_order(order)
+            completed_order = OrderService.complete_order(locked_order)
+            payment = cls.create_payment_from_order(completed_order)
+            logger.info(f"Check closed for order {order.id} with payment {payment.id}.")
+            return payment
+
     @classmethod
     def create_payment_from_order(cls, order: Order) -> Payment:
+        """
+        Builds the payment for an order from the prices its items were added at, then
+        writes the payment with one INSERT and its items with one bulk INSERT.
+        The subtotal is the sum of those items, so it matches the order's running subtotal.
+        The order must be freshly loaded, as its `item_count` is read.
+        """
+        if not order.item_count:
+            raise BusinessRuleViolationException(f"Order {order.id} has no items to charge")
+
+        order_items = list(order.order_items.select_related('menu_item', 'menu_extra'))
         payment = Payment.from_order(order)
-        payment.save()
-        try:
-            payment_items = ItemService.generate_items_from_order(order.order_items.all(), payment)
-            ItemService.save_items(payment_items)
+        payment_items = ItemService.generate_items_from_order(order_items, payment)
+        CalculatorService.calculate_payment_totals(payment, payment_items)
 
-            CalculatorService.calculate_payment_totals(payment, payment_items)
+        with transaction.atomic():
             payment.save()
-            
-            return payment 
-        except Exception as e:
-            payment.delete()
-            raise e
+            ItemService.save_items(payment_items)
+            return payment
     
     @classmethod
     def create_payment(cls, payment_data: dict) -> Payment:
-        items = payment_data.get('payment_items')
-        payment = Payment.get_default()
-        payment.save()
-        try:
-            payment_items = ItemService.generate_items(payment, items)
+        """
+        Creates a pending payment from manually entered items.
+
+        Every referenced order item, dish and extra is loaded with one query per
+        table, totals are computed in memory, and the payment and its items are
+        written with one INSERT each in a single transaction, so a failure leaves
+        nothing behind. The orders being charged are locked before checking that
+        they (and their items) are not charged yet, so concurrent payments can't
+        both pass the check.
+
+        Raises:
+            BusinessRuleViolationException: If there are no items, the order or an order
+                item is already charged, or the discount exceeds the total
+            EntityNotFoundException: If a referenced row does not exist
+        """
+        items_data = payment_data.get('payment_items') or []
+        if not items_data:
+            raise BusinessRuleViolationException("A payment must have at least one item")
+
+        order = payment_data.get('order')
+        with transaction.atomic():
+            if order:
+                order = cls.lock_chargeable_order(order)
+            else:
+                cls._lock_orders_of_items(items_data)
+            order_items, dishes, extras = ItemService.resolve_references(items_data, order)
+
+            payment = Payment.get_default()
+            payment.order = order
+            payment.payment_method = payment_data.get('payment_method')
+            payment.currency_type = payment_data.get('currency_type') or payment.currency_type
+
+            payment_items = ItemService.generate_items(payment, items_data, order_items, dishes, extras)
+            CalculatorService.calculate_payment_totals(
+                payment,
+                payment_items,
+                vat_rate=payment_data.get('vat_rate', CalculatorService.DEFAULT_VAT_RATE),
+                discount=payment_data.get('discount', payment.discount)
+            )
+            if payment.total < 0:
+                raise BusinessRuleViolationException("The discount can't exceed the payment total")
+
+            Payment.objects.bulk_create([payment])
             ItemService.save_items(payment_items)
-            
-            CalculatorService.calculate_totals(payment, payment_items)
-            payment.save()
-            
-            return payment
-            
-        except Exception as e:
-            payment.delete()
-            raise e
+
+        logger.info(f"Payment {payment.id} created with {len(payment_items)} items.")
+        return payment
+
+    @classmethod
+    def lock_chargeable_order(cls, order: Order) -> Order:
+        """
+        Locks the order row and checks it has no payment yet. Every path that creates
+        payments for an order goes through it, so two payments can't both pass the check.
+        Must run inside a transaction.
+
+        Returns:
+            The locked, freshly loaded order
+
+        Raises:
+            BusinessRuleViolationException: If the order already has a payment
+        """
+        locked_order = Order.objects.select_for_update().get(id=order.id)
+        if Payment.objects.filter(order=locked_order).exists():
+            raise BusinessRuleViolationException(f"Order {order.id} already has a payment")
+        return locked_order
 
     @classmethod
     def update_payment(cls, payment: Payment, payment_data: dict):
         pass
 
+    @classmethod
+    def complete_payment(cls, payment: Payment, payment_method: str = None) -> Payment:
+        """
+        Marks a pending payment as paid and adds it to the daily and per-dish sales rollups.
+
+        Raises:
+            BusinessRuleViolationException: If the payment is not PENDING or has no payment method
+        """
+        payment_method = payment_method or payment.payment_method
+        if not payment_method:
+            raise BusinessRuleViolationException(f"A payment method is required to complete payment {payment.id}")
+
+        with transaction.atomic():
+            completed_payment = cls._apply_transition(
+                payment, 'PENDING', 'COMPLETED',
+                payment_method=payment_method,
+                paid_at=timezone.now()
+            )
+            DishDailySales.objects.record_payment(completed_payment)
+            return completed_payment
+
+    @classmethod
+    def refund_payment(cls, payment: Payment) -> Payment:
+        """
+        Marks a completed payment as refunded, moving it from the sales sums to the
+        refund counters of the daily sales rollup and taking its items out of the
+        per-dish sales.
+
+        Raises:
+            BusinessRuleViolationException: If the payment is not COMPLETED
+        """
+        with transaction.atomic():
+            refunded_payment = cls._apply_transition(payment, 'COMPLETED', 'REFUNDED')
+            DishDailySales.objects.record_payment(refunded_payment, removed=True)
+            return refunded_payment
+
+    @classmethod
+    def settle_payments(cls, settlements: List[dict]) -> List[dict]:
+        """
+        Settles many pending payments at once, e.g. at close of day.
+
+        The payments are locked and validated together, then every payment method
+        group is completed with a single UPDATE, and the daily and per-dish sales
+        rollups are adjusted once for the whole batch, all in one transaction.
+        Invalid entries are reported and skipped; the valid ones are still settled.
+
+        Args:
+            settlements: `{'payment_id': int, 'payment_method': str}` entries. The
+                method may be omitted for payments that already have one.
+
+        Returns:
+            One result per payment, in input order. A payment listed more than once
+            is ambiguous and is not settled:
+            `{'payment_id', 'settled', 'payment_method'}` or `{'payment_id', 'settled', 'error'}`
+        """
+        payment_ids = [settlement['payment_id'] for settlement in settlements]
+        results = {}
+        method_groups = defaultdict(list)
+
+        with transaction.atomic():
+            locked_payments = {
+                payment_id: (payment_status, payment_method, deleted_at)
+                for payment_id, payment_status, payment_method, deleted_at in (
+                    Payment.objects.select_for_update()
+                    .filter(id__in=payment_ids)
+                    .order_by('id')
+                    .values_list('id', 'payment_status', 'payment_method', 'deleted_at')
+                )
+            }
+
+            for settlement in settlements:
+                payment_id = settlement['payment_id']
+                if payment_id in results:
+                    results[payment_id] = cls._settle_error(payment_id, f"Payment {payment_id} is listed more than once")
+                    continue
+                if payment_id not in locked_payments:
+                    results[payment_id] = cls._settle_error(payment_id, f"Payment {payment_id} not found")
+                    continue
+
+                payment_status, current_method, deleted_at = locked_payments[payment_id]
+                payment_method = settlement.get('payment_method') or current_method
+                if payment_status != 'PENDING' or deleted_at:
+                    results[payment_id] = cls._settle_error(
+                        payment_id, f"Payment {payment_id} is {payment_status} and can't be COMPLETED"
+                    )
+                elif not payment_method:
+                    results[payment_id] = cls._settle_error(
+                        payment_id, f"A payment method is required to complete payment {payment_id}"
+                    )
+                else:
+                    results[payment_id] = {'payment_id': payment_id, 'settled': True, 'payment_method': payment_method}
+
+            for payment_id, result in results.items():
+                if result['settled']:
+                    method_groups[result['payment_method']].append(payment_id)
+
+            paid_at = timezone.now()
+            for payment_method, group_ids in method_groups.items():
+                Payment.objects.filter(id__in=group_ids).update(
+                    payment_status='COMPLETED',
+                    payment_method=payment_method,
+                    paid_at=paid_at
+                )
+
+            settled_ids = [payment_id for group_ids in method_groups.values() for payment_id in group_ids]
+            if settled_ids:
+                DailySalesRollup.objects.record_change({}, cls._settled_contribution(settled_ids, paid_at))
+                DishDailySales.objects.record_payments(settled_ids, paid_at)
+
+        logger.info(f"Settled {len(settled_ids)} of {len(settlements)} payments.")
+        return [results[payment_id] for payment_id in dict.fromkeys(payment_ids)]
+
     @classmethod
     def delete_payment(cls, payment: Payment, hard_delete=False):
         if hard_delete:
-            payment.delete()
+            with transaction.atomic():
+                DailySalesRollup.objects.record_change(DailySalesRollup.contribution_of(payment), {})
+                if payment.payment_status == 'COMPLETED' and not payment.deleted_at:
+                    DishDailySales.objects.record_payment(payment, removed=True)
+                payment.delete()
         else:
             payment.soft_delete()
+
+    @classmethod
+    def _apply_transition(cls, payment: Payment, from_status: str, to_status: str, **changes) -> Payment:
+        """
+        Internal: Moves a payment between statuses under a row lock and applies the
+        change in its contribution to the daily sales rollup in the same transaction.
+        """
+        with transaction.atomic():
+            locked_payment = Payment.objects.select_for_update().get(id=payment.id)
+            if locked_payment.payment_status != from_status or locked_payment.deleted_at:
+                raise BusinessRuleViolationException(
+                    f"Payment {payment.id} is {locked_payment.payment_status} and can't be {to_status}"
+                )
+
+            previous_contribution = DailySalesRollup.contribution_of(locked_payment)
+            locked_payment.payment_status = to_status
+            for field, value in changes.items():
+                setattr(locked_payment, field, value)
+            locked_payment.save(update_fields=['payment_status', *changes])
+            DailySalesRollup.objects.record_change(
+                previous_contribution,
+                DailySalesRollup.contribution_of(locked_payment)
+            )
+
+        logger.info(f"Payment {payment.id} moved from {from_status} to {to_status}.")
+        return locked_payment
+
+    @staticmethod
+    def _lock_orders_of_items(items_data: List[dict]) -> None:
+        """
+        Internal: Locks, in id order, the orders of the order items a payment without
+        an order charges, before checking that the items are not charged yet.
+        """
+        order_item_ids = [item['order_item_id'] for item in items_data if item.get('order_item_id')]
+        if order_item_ids:
+            list(
+                Order.objects.select_for_update()
+                .filter(id__in=OrderItem.objects.filter(id__in=order_item_ids).values('order_id'))
+                .order_by('id')
+                .values_list('id', flat=True)
+            )
+
+    @staticmethod
+    def _settled_contribution(payment_ids: List[int], paid_at) -> dict:
+        """
+        Internal: What a batch of payments completed at `paid_at` adds to the daily
+        sales rollup, in the format of `DailySalesRollup.contribution_of`.
+        """
+        day = timezone.localdate(paid_at)
+        sums = (
+            Payment.objects.filter(id__in=payment_ids)
+            .values('currency_type', 'payment_method')
+            .annotate(
+                count=Count('id'),
+                **{f'{field}_sum': Sum(field) for field in DailySalesRollup.SALES_FIELDS}
+            )
+            .order_by()
+        )
+        return {
+            (day, row['currency_type'], row['payment_method']): {
+                'payments_count': row['count'],
+                **{field: row[f'{field}_sum'] for field in DailySalesRollup.SALES_FIELDS}
+            }
+            for row in sums
+        }
+
+    @staticmethod
+    def _settle_error(payment_id: int, error: str) -> dict:
+        return {'payment_id': payment_id, 'settled': False, 'error': error}
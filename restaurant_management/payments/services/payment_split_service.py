@@ -0,0 +1,207 @@
+from typing import List, Optional, Tuple
+from django.db import transaction
+from ..models import Payment, PaymentItem
+from orders.models import Order, OrderItem
+from orders.services.order_service import OrderService
+from .payment_item_service import PaymentItemService as ItemService
+from .payment_service import PaymentService
+from .payment_calculator_service import PaymentCalculatorService as CalculatorService
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PaymentSplitService:
+    """
+    Closes an order with its check split into several pending payments.
+
+    The allocation runs in memory over one list of the order's items, in integer
+    cents: every item is given to one payment (by item, or by seat) or shared
+    between several (shared seat items, or an even split). Shared amounts and
+    quantities are divided evenly, and the leftover cents are handed out in turn
+    across the payments, so the parts never differ by more than a cent per amount
+    and always add up exactly to the single check. VAT is computed on the whole
+    check and apportioned the same way. All payments and items are then written
+    with one bulk INSERT each, whatever the number of parts.
+
+    A share keeps the full unit price and a part of the quantity (possibly 0), so
+    per-dish sales still add up; it is flagged `is_split_share`, as its total is
+    not `price * quantity + extras`.
+    """
+    MODES = ('item', 'seat', 'even')
+    MAX_PARTS = 20
+
+    @classmethod
+    def split_check(
+        cls,
+        order: Order,
+        mode: str,
+        parts: Optional[int] = None,
+        item_groups: Optional[List[List[int]]] = None
+    ) -> List[Payment]:
+        """
+        Completes an order and creates one pending payment per part of its check,
+        in a single transaction.
+
+        Args:
+            order: The order to close
+            mode: 'item' (one payment per group of order items), 'seat' (one payment
+                per seat, shared items split evenly) or 'even' (every item split evenly)
+            parts: Number of payments, for the 'even' mode
+            item_groups: Order item ids of each payment, for the 'item' mode; every item
+                of the order must be in exactly one group
+
+        Returns:
+            The created payments, in part order
+
+        Raises:
+            BusinessRuleViolationException: If the split doesn't match the order, or the order
+                already has a payment
+        """
+        if mode not in cls.MODES:
+            raise BusinessRuleViolationException(f"mode must be one of {', '.join(cls.MODES)}")
+
+        with transaction.atomic():
+            locked_order = PaymentService.lock_chargeable_order(order)
+            completed_order = OrderService.complete_order(locked_order)
+
+            order_items = list(completed_order.order_items.select_related('menu_item', 'menu_extra').order_by('id'))
+            if not order_items:
+                raise BusinessRuleViolationException(f"Order {order.id} has no items to charge")
+
+            allocation, part_count = cls._allocate(mode, order_items, parts, item_groups)
+            payments, payment_items = cls._build_payments(completed_order, order_items, allocation, part_count)
+
+            Payment.objects.bulk_create(payments)
+            ItemService.save_items(payment_items)
+
+        logger.info(f"Check of order {order.id} split {mode} into {part_count} payments.")
+        return payments
+
+    @classmethod
+    def _allocate(
+        cls,
+        mode: str,
+        order_items: List[OrderItem],
+        parts: Optional[int],
+        item_groups: Optional[List[List[int]]]
+    ) -> Tuple[List[List[int]], int]:
+        """
+        Returns, for every order item, the indexes of the payments sharing it, and
+        the number of payments.
+        """
+        if mode == 'even':
+            if not parts or not 2 <= parts <= cls.MAX_PARTS:
+                raise BusinessRuleViolationException(f"An even split needs between 2 and {cls.MAX_PARTS} parts")
+            return [list(range(parts)) for _ in order_items], parts
+
+        if mode == 'seat':
+            seats = sorted({item.seat for item in order_items if item.seat is not None})
+            if not 2 <= len(seats) <= cls.MAX_PARTS:
+                raise BusinessRuleViolationException(
+                    f"A split by seat needs items on between 2 and {cls.MAX_PARTS} seats"
+                )
+            seat_indexes = {seat: index for index, seat in enumerate(seats)}
+            everyone = list(range(len(seats)))
+            return [
+                [seat_indexes[item.seat]] if item.seat is not None else everyone
+                for item in order_items
+            ], len(seats)
+
+        if not item_groups or not 2 <= len(item_groups) <= cls.MAX_PARTS:
+            raise BusinessRuleViolationException(f"A split by item needs between 2 and {cls.MAX_PARTS} groups")
+        group_of_item = {}
+        for index, group in enumerate(item_groups):
+            if not group:
+                raise BusinessRuleViolationException("Every group of a split by item needs at least one item")
+            for item_id in group:
+                if item_id in group_of_item:
+                    raise BusinessRuleViolationException(f"Order item {item_id} is in more than one group")
+                group_of_item[item_id] = index
+
+        order_item_ids = {item.id for item in order_items}
+        unknown_items = group_of_item.keys() - order_item_ids
+        if unknown_items:
+            raise BusinessRuleViolationException(f"Order items {sorted(unknown_items)} don't belong to the order")
+        missing_items = order_item_ids - group_of_item.keys()
+        if missing_items:
+            raise BusinessRuleViolationException(f"Order items {sorted(missing_items)} are not in any group")
+
+        return [[group_of_item[item.id]] for item in order_items], len(item_groups)
+
+    @classmethod
+    def _build_payments(
+        cls,
+        order: Order,
+        order_items: List[OrderItem],
+        allocation: List[List[int]],
+        part_count: int
+    ) -> Tuple[List[Payment], List[PaymentItem]]:
+        payments = [Payment.from_order(order) for _ in range(part_count)]
+        sub_totals = [0] * part_count
+        payment_items = []
+        cents_offset = quantity_offset = 0
+
+        for order_item, shares in zip(order_items, allocation):
+            menu_item = order_item.menu_item
+            base_cents = CalculatorService.to_cents(order_item.unit_price) * order_item.quantity
+
+            share_count = len(shares)
+            quantities, quantity_offset = cls._split_evenly(order_item.quantity, share_count, quantity_offset)
+            bases, cents_offset = cls._split_evenly(base_cents, share_count, cents_offset)
+            extras, cents_offset = cls._split_evenly(CalculatorService.to_cents(order_item.extra_price), share_count, cents_offset)
+
+            for position, payment_index in enumerate(shares):
+                item_cents = bases[position] + extras[position]
+                sub_totals[payment_index] += item_cents
+                payment_items.append(PaymentItem(
+                    payment=payments[payment_index],
+                    order_item=order_item,
+                    menu_item=menu_item,
+                    menu_item_extra=order_item.menu_extra,
+                    price=order_item.unit_price,
+                    quantity=quantities[position],
+                    extras_charges=CalculatorService.from_cents(extras[position]),
+                    total=CalculatorService.from_cents(item_cents),
+                    charge_description=menu_item.name if share_count == 1 else f"{menu_item.name} (1/{share_count})",
+                    is_split_share=share_count > 1,
+                ))
+
+        vat_rate = CalculatorService.DEFAULT_VAT_RATE
+        vat_hundredths = int(vat_rate * 100)
+        check_vat = (sum(sub_totals) * vat_hundredths + 50) // 100
+        vats = cls._split_proportionally(check_vat, sub_totals)
+
+        for payment, sub_total, vat in zip(payments, sub_totals, vats):
+            payment.sub_total = CalculatorService.from_cents(sub_total)
+            payment.vat_rate = vat_rate
+            payment.vat = CalculatorService.from_cents(vat)
+            payment.total = CalculatorService.from_cents(sub_total + vat)
+
+        return payments, payment_items
+
+    @staticmethod
+    def _split_evenly(amount: int, parts: int, offset: int) -> Tuple[List[int], int]:
+        """
+        Splits an integer amount into equal parts. The remainder goes one unit at a
+        time to the parts starting at `offset`; returns the shares and the next offset.
+        """
+        base, remainder = divmod(amount, parts)
+        shares = [base] * parts
+        for step in range(remainder):
+            shares[(offset + step) % parts] += 1
+        return shares, (offset + remainder) % parts
+
+    @staticmethod
+    def _split_proportionally(amount: int, weights: List[int]) -> List[int]:
+        """Splits an integer amount in proportion to the weights (largest remainder method)."""
+        total_weight = sum(weights)
+        if not total_weight:
+            return PaymentSplitService._split_evenly(amount, len(weights), 0)[0]
+
+        shares = [amount * weight // total_weight for weight in weights]
+        leftover = amount - sum(shares)
+        by_remainder = sorted(range(len(weights)), key=lambda i: (-(amount * weights[i] % total_weight), i))
+        for index in by_remainder[:leftover]:
+            shares[index] += 1
+        return shares
@@ -0,0 +1,163 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from ..models import Payment, PaymentItem, DailySalesRollup, DishDailySales, lock_sales_days
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SalesRollupService:
+    """Reads and rebuilds the daily and per-dish sales rollups."""
+    DEFAULT_CHUNK_DAYS = 31
+
+    @classmethod
+    def get_daily_sales(cls, date_from: date, date_to: date) -> QuerySet:
+        """
+        Returns the rollup rows between two days (inclusive), one row per
+        (date, currency, payment method), oldest first.
+        """
+        return DailySalesRollup.objects.filter(
+            date__gte=date_from,
+            date__lte=date_to
+        ).order_by('date', 'currency_type', 'payment_method')
+
+    @classmethod
+    def rebuild(
+        cls,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        chunk_days: int = DEFAULT_CHUNK_DAYS
+    ) -> int:
+        """
+        Recomputes the daily and per-dish rollups from `payments` and `payment_items`,
+        one chunk of days per transaction, so a rebuild never holds locks over the
+        whole history. Defaults to every day with a paid payment.
+
+        Returns:
+            Number of daily rollup rows written
+        """
+        if date_from is None or date_to is None:
+            bounds = cls._countable_payments().aggregate(
+                first=Min(TruncDate('paid_at')),
+                last=Max(TruncDate('paid_at'))
+            )
+            date_from = date_from or bounds['first']
+            date_to = date_to or bounds['last']
+            if date_from is None or date_to is None:
+                return 0
+
+        rows_written = 0
+        chunk_start = date_from
+        while chunk_start <= date_to:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), date_to)
+            rows_written += cls._rebuild_chunk(chunk_start, chunk_end)
+            logger.info(f"Daily sales rollup rebuilt from {chunk_start} to {chunk_end}.")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        return rows_written
+
+    @classmethod
+    def _rebuild_chunk(cls, date_from: date, date_to: date) -> int:
+        """
+        Replaces the daily and per-dish rollups of a range of days in one transaction.
+        The days are locked exclusively before the payments are read, so updates of
+        those days that are still in flight commit first and are counted, and later
+        ones wait and then apply on top of the rebuilt rows.
+        """
+        with transaction.atomic():
+            lock_sales_days(
+                (date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)),
+                exclusive=True
+            )
+            rows = cls._aggregate_daily_sales(date_from, date_to)
+            DailySalesRollup.objects.filter(date__gte=date_from, date__lte=date_to).delete()
+            DailySalesRollup.objects.bulk_create(rows)
+            cls._rebuild_dish_sales_chunk(date_from, date_to)
+
+        return len(rows)
+
+    @classmethod
+    def _aggregate_daily_sales(cls, date_from: date, date_to: date) -> List[DailySalesRollup]:
+        completed = Q(payment_status='COMPLETED')
+        refunded = Q(payment_status='REFUNDED')
+        zero = Value(Decimal('0.00'))
+
+        aggregates = (
+            cls._countable_payments()
+            .annotate(day=TruncDate('paid_at'))
+            .filter(day__gte=date_from, day__lte=date_to)
+            .annotate(method=Coalesce('payment_method', Value(DailySalesRollup.UNSPECIFIED_METHOD)))
+            .values('day', 'currency_type', 'method')
+            .annotate(
+                payments_count=Count('id', filter=completed),
+                sub_total_sum=Coalesce(Sum('sub_total', filter=completed), zero),
+                vat_sum=Coalesce(Sum('vat', filter=completed), zero),
+                discount_sum=Coalesce(Sum('discount', filter=completed), zero),
+                total_sum=Coalesce(Sum('total', filter=completed), zero),
+                refunds_count=Count('id', filter=refunded),
+                refunded_total=Coalesce(Sum('total', filter=refunded), zero),
+            )
+            .order_by()
+        )
+
+        return [
+            DailySalesRollup(
+                date=row['day'],
+                currency_type=row['currency_type'],
+                payment_method=row['method'],
+                payments_count=row['payments_count'],
+                sub_total=row['sub_total_sum'],
+                vat=row['vat_sum'],
+                discount=row['discount_sum'],
+                total=row['total_sum'],
+                refunds_count=row['refunds_count'],
+                refunded_total=row['refunded_total'],
+            )
+            for row in aggregates
+        ]
+
+    @classmethod
+    def _rebuild_dish_sales_chunk(cls, date_from: date, date_to: date) -> None:
+        """Internal: Must run in `_rebuild_chunk`'s transaction, after the days are locked."""
+        aggregates = (
+            PaymentItem.objects
+            .filter(
+                menu_item__isnull=False,
+                payment__payment_status='COMPLETED',
+                payment__deleted_at__isnull=True,
+                payment__paid_at__isnull=False
+            )
+            .annotate(day=TruncDate('payment__paid_at'))
+            .filter(day__gte=date_from, day__lte=date_to)
+            .values('menu_item_id', 'day')
+            .annotate(
+                quantity_sum=Sum('quantity'),
+                total_sum=Sum('total'),
+                extras_sum=Sum('extras_charges'),
+            )
+            .order_by()
+        )
+        dish_sales = [
+            DishDailySales(
+                dish_id=row['menu_item_id'],
+                date=row['day'],
+                quantity_sold=row['quantity_sum'],
+                gross_revenue=row['total_sum'],
+                extras_revenue=row['extras_sum'],
+            )
+            for row in aggregates
+        ]
+
+        DishDailySales.objects.filter(date__gte=date_from, date__lte=date_to).delete()
+        DishDailySales.objects.bulk_create(dish_sales)
+
+    @staticmethod
+    def _countable_payments() -> QuerySet:
+        return Payment.objects.filter(
+            deleted_at__isnull=True,
+            paid_at__isnull=False,
+            payment_status__in=['COMPLETED', 'REFUNDED']
+        )
@@ -1,3 +1,573 @@
+import json
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from menu.models import Dish, MenuExtra
+from orders.models import Order
+from orders.services.order_item_service import OrderItemService
+from tables.models import Table
+from shared.exceptions.custom_exceptions import BusinessRuleViolationException
+from .models import DailySalesRollup, DishDailySales, Payment, PaymentItem
+from .services.payment_recalculation_service import PaymentRecalculationService
+from .services.payment_service import PaymentService
+from .services.payment_export_service import PaymentExportService
+from .services.payment_split_service import PaymentSplitService
+from .services.sales_rollup_service import SalesRollupService
 
-# Create your tests here.
+
+class PaymentListQueryCountTest(TestCase):
+    """
+    The admin payment list eager-loads orders and items, so its query count must not
+    grow with the number of payments on the page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dishes = [
+            Dish.objects.create(name=f'Dish {i}', price=Decimal('10.00') + i, category='MEALS')
+            for i in range(2)
+        ]
+        cls.admin = get_user_model().objects.create(username='admin', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _create_payments(self, count):
+        for _ in range(count):
+            table = Table.objects.create(number=f'T{Table.objects.count() + 1}', capacity=4)
+            order = Order.objects.create(table=table, status='COMPLETED')
+            payment = Payment.objects.create(
+                order=order, payment_status='COMPLETED', currency_type='MXN', total=Decimal('20.00')
+            )
+            PaymentItem.objects.bulk_create([
+                PaymentItem(payment=payment, menu_item=dish, price=dish.price, quantity=1, total=dish.price)
+                for dish in self.dishes
+            ])
+
+    def _assert_list_queries(self, payment_count):
+        # count, page of payments with their orders, prefetched payment items
+        with self.assertNumQueries(3):
+            response = self.client.get('/v1/api/payments/', {'page_size': 100})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), payment_count)
+        self.assertEqual(len(response.data['data'][0]['payment_items']), len(self.dishes))
+
+    def test_list_query_count_is_constant(self):
+        self._create_payments(2)
+        self._assert_list_queries(2)
+
+        self._create_payments(28)
+        self._assert_list_queries(30)
+
+
+class PaymentSearchTest(TestCase):
+    """
+    The free-text search routes numbers to the order, method/status/currency codes
+    to their column, and any other text to item descriptions and dish names.
+    """
+
+    def setUp(self):
+        self.salmon = Dish.objects.create(name='Grilled Salmon', price=Decimal('20.00'), category='MEALS')
+        table = Table.objects.create(number='T1', capacity=4)
+        self.order = Order.objects.create(table=table, status='COMPLETED')
+        self.card_payment = self._create_payment(self.order, 'CARD', [
+            PaymentItem(menu_item=self.salmon, price=Decimal('20.00'), quantity=1, total=Decimal('20.00'),
+                        charge_description="Chef's special"),
+            PaymentItem(menu_item=self.salmon, price=Decimal('20.00'), quantity=1, total=Decimal('20.00'),
+                        charge_description='Grilled Salmon'),
+        ])
+        self.cash_payment = self._create_payment(None, 'CASH', [
+            PaymentItem(price=Decimal('5.00'), quantity=1, total=Decimal('5.00'), charge_description='Corkage fee'),
+        ])
+
+    def _create_payment(self, order, method, items):
+        payment = Payment.objects.create(
+            order=order, payment_method=method, payment_status='COMPLETED', currency_type='MXN', total=Decimal('20.00')
+        )
+        for item in items:
+            item.payment = payment
+        PaymentItem.objects.bulk_create(items)
+        return payment
+
+    def _search(self, term):
+        return list(Payment.objects.dynamic_search({'search': term}).values_list('id', flat=True))
+
+    def test_number_matches_the_order(self):
+        self.assertEqual(self._search(str(self.order.id)), [self.card_payment.id])
+
+    def test_code_matches_its_column(self):
+        self.assertEqual(self._search('cash'), [self.cash_payment.id])
+
+    def test_text_matches_descriptions_and_dish_names(self):
+        self.assertEqual(self._search('corkage'), [self.cash_payment.id])
+        self.assertEqual(self._search('salmon'), [self.card_payment.id])
+
+        self.salmon.name = 'Cedar Plank Salmon'
+        self.salmon.save()
+        self.assertEqual(self._search('cedar'), [self.card_payment.id])
+
+
+class CloseCheckTest(TestCase):
+    """
+    Closing a check charges the items at the prices they were added with, which the
+    running subtotal also uses, and rejects orders with nothing to charge.
+    """
+
+    def setUp(self):
+        self.dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        self.extra = MenuExtra.objects.create(name='Extra Cheese', price=Decimal('2.50'))
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+
+    def test_payment_charges_running_subtotal(self):
+        OrderItemService.add_items(self.order, [
+            {'menu_item': self.dish.id, 'menu_extra': self.extra.id, 'quantity': 2},
+            {'menu_item': self.dish.id, 'quantity': 1},
+        ])
+
+        payment = PaymentService.close_check(self.order)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'COMPLETED')
+        self.assertEqual(self.order.running_subtotal, Decimal('32.50'))
+        self.assertEqual(payment.sub_total, Decimal('32.50'))
+        self.assertEqual(payment.total, Decimal('37.70'))
+        self.assertEqual(sum(item.total for item in payment.payment_items.all()), payment.sub_total)
+
+    def test_price_change_after_adding_keeps_the_charge(self):
+        added_items = OrderItemService.add_items(self.order, [
+            {'menu_item': self.dish.id, 'menu_extra': self.extra.id, 'quantity': 2},
+            {'menu_item': self.dish.id, 'quantity': 1},
+        ])
+        Dish.objects.filter(id=self.dish.id).update(price=Decimal('15.00'))
+        MenuExtra.objects.filter(id=self.extra.id).update(price=Decimal('4.00'))
+        OrderItemService.add_items(self.order, [{'menu_item': self.dish.id, 'quantity': 1}])
+        OrderItemService.delete_items(self.order, [added_items[1].id])
+
+        payment = PaymentService.close_check(self.order)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.running_subtotal, Decimal('37.50'))
+        self.assertEqual(payment.sub_total, self.order.running_subtotal)
+        self.assertEqual(
+            sorted((item.price, item.quantity, item.total) for item in payment.payment_items.all()),
+            [(Decimal('10.00'), 2, Decimal('22.50')), (Decimal('15.00'), 1, Decimal('15.00'))]
+        )
+
+    def test_empty_order_is_not_closed(self):
+        with self.assertRaises(BusinessRuleViolationException):
+            PaymentService.close_check(self.order)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'IN_PROGRESS')
+        self.assertFalse(Payment.objects.exists())
+
+
+class PaymentRecalculationRollupTest(TestCase):
+    """
+    Sales rollups are rebuilt inside each chunk's transaction, so a failure in a
+    later chunk leaves them matching the payments already recalculated.
+    """
+
+    def setUp(self):
+        dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        self.payments = []
+        for number in ('T1', 'T2'):
+            table = Table.objects.create(number=number, capacity=4, is_available=False)
+            order = Order.objects.create(table=table, status='IN_PROGRESS')
+            OrderItemService.add_items(order, [{'menu_item': dish.id, 'quantity': 2}])
+            payment = PaymentService.close_check(order)
+            self.payments.append(PaymentService.complete_payment(payment, 'CARD'))
+
+    def test_failed_chunk_keeps_rollups_consistent(self):
+        recalculate_chunk = PaymentRecalculationService._recalculate_chunk
+        calls = []
+
+        def fail_on_second_chunk(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("chunk failed")
+            return recalculate_chunk(*args)
+
+        with mock.patch.object(PaymentRecalculationService, '_recalculate_chunk', side_effect=fail_on_second_chunk):
+            with self.assertRaises(RuntimeError):
+                PaymentRecalculationService.recalculate(Payment.objects.all(), vat_rate=Decimal('0.08'), chunk_size=1)
+
+        first, second = (Payment.objects.get(id=payment.id) for payment in self.payments)
+        self.assertEqual(first.total, Decimal('21.60'))
+        self.assertEqual(second.total, Decimal('23.20'))
+        self.assertEqual(DailySalesRollup.objects.get().total, first.total + second.total)
+
+
+class SalesRollupRebuildTest(TestCase):
+    """
+    A rebuild reproduces the rollups the incremental updates maintain, and locks the
+    days it replaces before it reads their payments.
+    """
+
+    def setUp(self):
+        self.dishes = [
+            Dish.objects.create(name=name, price=price, category='MEALS')
+            for name, price in (('Soup', Decimal('4.50')), ('Steak', Decimal('18.00')))
+        ]
+        self.payments = []
+        for number, quantities in (('T1', (1, 2)), ('T2', (3, 0)), ('T3', (0, 1))):
+            table = Table.objects.create(number=number, capacity=4, is_available=False)
+            order = Order.objects.create(table=table, status='IN_PROGRESS')
+            OrderItemService.add_items(order, [
+                {'menu_item': dish.id, 'quantity': quantity}
+                for dish, quantity in zip(self.dishes, quantities) if quantity
+            ])
+            self.payments.append(PaymentService.close_check(order))
+
+    @staticmethod
+    def _snapshot():
+        daily = list(DailySalesRollup.objects.order_by('date', 'currency_type', 'payment_method').values(
+            'date', 'currency_type', 'payment_method', 'payments_count', 'sub_total', 'vat', 'discount',
+            'total', 'refunds_count', 'refunded_total'
+        ))
+        dishes = list(DishDailySales.objects.order_by('date', 'dish_id').values(
+            'date', 'dish_id', 'quantity_sold', 'gross_revenue', 'extras_revenue'
+        ))
+        return daily, dishes
+
+    def test_rebuild_matches_incremental_updates(self):
+        PaymentService.complete_payment(self.payments[0], 'CARD')
+        PaymentService.complete_payment(self.payments[1], 'CASH')
+        PaymentService.refund_payment(Payment.objects.get(id=self.payments[1].id))
+        incremental = self._snapshot()
+        self.assertTrue(incremental[0] and incremental[1])
+
+        today = timezone.localdate()
+        SalesRollupService.rebuild(today, today)
+        self.assertEqual(self._snapshot(), incremental)
+
+        PaymentService.complete_payment(self.payments[2], 'CARD')
+        after_rebuild = self._snapshot()
+        SalesRollupService.rebuild(today, today)
+        self.assertEqual(self._snapshot(), after_rebuild)
+        self.assertEqual(DishDailySales.objects.get(dish=self.dishes[1]).quantity_sold, 3)
+
+    def test_rebuild_locks_the_days_before_reading_payments(self):
+        PaymentService.complete_payment(self.payments[0], 'CARD')
+        today = timezone.localdate()
+        lock_calls = []
+
+        def record_lock(days, exclusive=False):
+            lock_calls.append((list(days), exclusive, connection.in_atomic_block, len(queries.captured_queries)))
+
+        with mock.patch('payments.services.sales_rollup_service.lock_sales_days', side_effect=record_lock):
+            with CaptureQueriesContext(connection) as queries:
+                SalesRollupService._rebuild_chunk(today, today)
+
+        [(days, exclusive, in_atomic_block, queries_before_lock)] = lock_calls
+        self.assertEqual(days, [today])
+        self.assertTrue(exclusive)
+        self.assertTrue(in_atomic_block)
+        self.assertFalse(any(
+            '"payments"' in query['sql'] for query in queries.captured_queries[:queries_before_lock]
+        ))
+        self.assertTrue(any(
+            '"payments"' in query['sql'] for query in queries.captured_queries[queries_before_lock:]
+        ))
+        self.assertEqual(DailySalesRollup.objects.get().total, self.payments[0].total)
+
+
+class DishSalesTest(TestCase):
+    """
+    Completing a payment adds its items to the per-dish sales of the day, a refund
+    takes them out again, and the menu reports read those sums.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='admin', is_staff=True))
+        self.soup = Dish.objects.create(name='Soup', price=Decimal('4.50'), category='MEALS')
+        self.steak = Dish.objects.create(name='Steak', price=Decimal('18.00'), category='MEALS')
+        extra = MenuExtra.objects.create(name='Truffle', price=Decimal('2.50'))
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        order = Order.objects.create(table=table, status='IN_PROGRESS')
+        OrderItemService.add_items(order, [
+            {'menu_item': self.soup.id, 'quantity': 3},
+            {'menu_item': self.steak.id, 'quantity': 1, 'menu_extra': extra.id},
+        ])
+        self.payment = PaymentService.complete_payment(PaymentService.close_check(order), 'CARD')
+
+    def _sales(self, dish):
+        return DishDailySales.objects.filter(dish=dish).values_list('quantity_sold', 'gross_revenue', 'extras_revenue').get()
+
+    def test_completion_and_refund_update_dish_sales(self):
+        self.assertEqual(self._sales(self.soup), (3, Decimal('13.50'), Decimal('0.00')))
+        self.assertEqual(self._sales(self.steak), (1, Decimal('20.50'), Decimal('2.50')))
+
+        PaymentService.refund_payment(Payment.objects.get(id=self.payment.id))
+
+        self.assertEqual(self._sales(self.soup), (0, Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(self._sales(self.steak), (0, Decimal('0.00'), Decimal('0.00')))
+
+    def test_top_dishes_rank_by_quantity_or_revenue(self):
+        by_quantity = self.client.get('/v1/api/payments/sales/dishes/top/')
+        by_revenue = self.client.get('/v1/api/payments/sales/dishes/top/', {'rank_by': 'revenue'})
+
+        self.assertEqual([row['dish_name'] for row in by_quantity.data['data']], ['Soup', 'Steak'])
+        self.assertEqual([row['dish_name'] for row in by_revenue.data['data']], ['Steak', 'Soup'])
+        self.assertEqual(
+            self.client.get('/v1/api/payments/sales/dishes/top/', {'rank_by': 'margin'}).status_code, 400
+        )
+
+    def test_dish_trend_groups_by_period(self):
+        response = self.client.get(f'/v1/api/payments/sales/dishes/{self.soup.id}/trend/', {'granularity': 'month'})
+
+        self.assertEqual(response.status_code, 200)
+        [period] = response.data['data']
+        self.assertEqual((period['total_quantity'], period['total_revenue']), (3, Decimal('13.50')))
+
+
+class BulkSettleTest(TestCase):
+    """
+    Settling reports every entry separately, completes the valid payments with one
+    UPDATE per payment method, and adds them to the sales rollups once.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='admin', is_staff=True))
+        self.dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        self.payments = []
+        for number in range(1, 6):
+            table = Table.objects.create(number=f'T{number}', capacity=4, is_available=False)
+            order = Order.objects.create(table=table, status='IN_PROGRESS')
+            OrderItemService.add_items(order, [{'menu_item': self.dish.id, 'quantity': number}])
+            self.payments.append(PaymentService.close_check(order))
+
+    def _settle(self, settlements):
+        return self.client.post('/v1/api/payments/settle/', {'settlements': settlements}, format='json')
+
+    def test_valid_entries_are_settled_and_invalid_ones_reported(self):
+        PaymentService.complete_payment(self.payments[4], 'CASH')
+        first, second, third, duplicated, completed = (payment.id for payment in self.payments)
+
+        response = self._settle([
+            {'payment_id': first, 'payment_method': 'CARD'},
+            {'payment_id': second, 'payment_method': 'CASH'},
+            {'payment_id': third},
+            {'payment_id': duplicated, 'payment_method': 'CARD'},
+            {'payment_id': duplicated, 'payment_method': 'CASH'},
+            {'payment_id': completed, 'payment_method': 'CARD'},
+            {'payment_id': 9999, 'payment_method': 'CARD'},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['data']
+        self.assertEqual([result['payment_id'] for result in results], [first, second, third, duplicated, completed, 9999])
+        self.assertEqual([result['settled'] for result in results], [True, True, False, False, False, False])
+        self.assertIn('payment method is required', results[2]['error'])
+        self.assertIn('more than once', results[3]['error'])
+        self.assertIn('COMPLETED', results[4]['error'])
+        self.assertIn('not found', results[5]['error'])
+
+        statuses = dict(Payment.objects.values_list('id', 'payment_status'))
+        self.assertEqual([statuses[payment.id] for payment in self.payments], ['COMPLETED', 'COMPLETED', 'PENDING', 'PENDING', 'COMPLETED'])
+        rollups = {row.payment_method: row for row in DailySalesRollup.objects.all()}
+        self.assertEqual(rollups['CARD'].payments_count, 1)
+        self.assertEqual(rollups['CASH'].payments_count, 2)
+        self.assertEqual(rollups['CARD'].total + rollups['CASH'].total, sum(
+            Payment.objects.filter(payment_status='COMPLETED').values_list('total', flat=True)
+        ))
+        self.assertEqual(DishDailySales.objects.get(dish=self.dish).quantity_sold, 1 + 2 + 5)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        # The first settlement of the day creates the rollup rows; later ones update them
+        self._settle([{'payment_id': self.payments[0].id, 'payment_method': 'CARD'}])
+        with CaptureQueriesContext(connection) as one_payment:
+            self._settle([{'payment_id': self.payments[1].id, 'payment_method': 'CARD'}])
+        with CaptureQueriesContext(connection) as three_payments:
+            self._settle([{'payment_id': payment.id, 'payment_method': 'CARD'} for payment in self.payments[2:]])
+
+        self.assertEqual(len(three_payments), len(one_payment))
+        self.assertEqual(Payment.objects.filter(payment_status='COMPLETED').count(), 5)
+
+
+class PaymentExportTest(TestCase):
+    """
+    Exports stream the filtered payments or their items line by line, and nothing
+    is queried before the response starts streaming.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='admin', is_staff=True))
+        dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        self.payments = []
+        for number, method in (('T1', 'CARD'), ('T2', 'CASH'), ('T3', 'CARD')):
+            table = Table.objects.create(number=number, capacity=4, is_available=False)
+            order = Order.objects.create(table=table, status='IN_PROGRESS')
+            OrderItemService.add_items(order, [{'menu_item': dish.id}, {'menu_item': dish.id, 'quantity': 2}])
+            self.payments.append(PaymentService.complete_payment(PaymentService.close_check(order), method))
+
+    def _export(self, **params):
+        response = self.client.get('/v1/api/payments/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_csv_of_filtered_payments(self):
+        lines = self._export(method='CARD')
+
+        self.assertEqual(lines[0].split(','), list(PaymentExportService.PAYMENT_FIELDS))
+        self.assertEqual(
+            [int(line.split(',')[0]) for line in lines[1:]],
+            [self.payments[0].id, self.payments[2].id]
+        )
+
+    def test_ndjson_of_payment_items(self):
+        lines = self._export(rows='items', output='ndjson', method='CASH')
+
+        [record] = [json.loads(line) for line in lines]
+        self.assertEqual(record['payment_id'], self.payments[1].id)
+        self.assertEqual((record['quantity'], record['total']), (3, '30.00'))
+
+    def test_rows_are_read_lazily_in_chunks(self):
+        with self.assertNumQueries(0):
+            lines = PaymentExportService.export(Payment.objects.all(), output='ndjson', chunk_size=1)
+
+        self.assertEqual(len(list(lines)), len(self.payments))
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/v1/api/payments/export/', {'output': 'xlsx'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class PaymentCreateTest(TestCase):
+    """
+    A manual payment resolves its references with one query per table, is priced in
+    memory and written in one transaction, so a rejected request leaves nothing behind.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='admin', is_staff=True))
+        self.dishes = [
+            Dish.objects.create(name=f'Dish {number}', price=Decimal('10.00'), category='MEALS')
+            for number in range(3)
+        ]
+        self.extra = MenuExtra.objects.create(name='Sauce', price=Decimal('1.50'))
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        self.order_items = OrderItemService.add_items(self.order, [
+            {'menu_item': self.dishes[0].id},
+            {'menu_item': self.dishes[1].id, 'quantity': 2},
+        ])
+
+    def _create(self, payment_items, **payment_data):
+        payment_data = {'currency_type': 'MXN', 'payment_items': payment_items, **payment_data}
+        return self.client.post('/v1/api/payments/', payment_data, format='json')
+
+    def _manual_item(self, dish, **item):
+        return {'menu_item': dish.id, 'price': '5.00', 'quantity': 2, **item}
+
+    def _assert_nothing_created(self):
+        self.assertFalse(Payment.objects.exists())
+        self.assertFalse(PaymentItem.objects.exists())
+
+    def test_order_and_manual_items_are_priced_together(self):
+        response = self._create(
+            [{'order_item': self.order_items[0].id}, self._manual_item(self.dishes[2], menu_item_extra=self.extra.id)],
+            order_id=self.order.id, vat_rate='0.10', discount='2.00'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        payment = Payment.objects.get()
+        self.assertEqual(payment.payment_status, 'PENDING')
+        self.assertEqual(
+            sorted(payment.payment_items.values_list('charge_description', 'total')),
+            [('Dish 0', Decimal('10.00')), ('Dish 2', Decimal('11.50'))]
+        )
+        self.assertEqual((payment.sub_total, payment.vat, payment.total), (Decimal('21.50'), Decimal('2.15'), Decimal('21.65')))
+
+    def test_query_count_does_not_grow_with_the_items(self):
+        with CaptureQueriesContext(connection) as one_item:
+            PaymentService.create_payment({'payment_items': [
+                {'menu_item_id': self.dishes[0].id, 'menu_item_extra_id': self.extra.id, 'price': Decimal('5.00'), 'quantity': 1},
+            ]})
+        with CaptureQueriesContext(connection) as three_items:
+            PaymentService.create_payment({'payment_items': [
+                {'menu_item_id': dish.id, 'menu_item_extra_id': self.extra.id, 'price': Decimal('5.00'), 'quantity': 1}
+                for dish in self.dishes
+            ]})
+
+        self.assertEqual(len(three_items), len(one_item))
+        self.assertEqual(PaymentItem.objects.count(), 4)
+
+    def test_unknown_reference_leaves_nothing(self):
+        response = self._create([self._manual_item(self.dishes[0]), self._manual_item(self.dishes[1], menu_item_extra=9999)])
+
+        self.assertEqual(response.status_code, 404)
+        self._assert_nothing_created()
+
+    def test_discount_above_the_total_leaves_nothing(self):
+        response = self._create([self._manual_item(self.dishes[0])], discount='100.00')
+
+        self.assertEqual(response.status_code, 400)
+        self._assert_nothing_created()
+
+    def test_order_item_is_charged_once(self):
+        self.assertEqual(self._create([{'order_item': self.order_items[1].id}]).status_code, 201)
+
+        response = self._create([{'order_item': self.order_items[1].id}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(PaymentItem.objects.filter(order_item=self.order_items[1]).count(), 1)
+
+
+class SplitCheckTest(TestCase):
+    """
+    Split shares keep their allocated totals through a recalculation, and an order
+    can only be charged once, whichever path creates its payments.
+    """
+
+    def setUp(self):
+        self.dish = Dish.objects.create(name='Dish', price=Decimal('10.00'), category='MEALS')
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        OrderItemService.add_items(self.order, [{'menu_item': self.dish.id}])
+
+    def test_recalculation_keeps_split_shares(self):
+        payments = PaymentSplitService.split_check(self.order, 'even', parts=3)
+        shares = PaymentItem.objects.filter(payment__in=payments)
+        self.assertTrue(all(share.is_split_share for share in shares))
+        self.assertEqual(sorted(share.total for share in shares), [Decimal('3.33'), Decimal('3.33'), Decimal('3.34')])
+
+        result = PaymentRecalculationService.recalculate(Payment.objects.all(), vat_rate=Decimal('0.08'))
+
+        self.assertEqual(result.items_updated, 0)
+        self.assertEqual(sorted(share.total for share in shares.all()), [Decimal('3.33'), Decimal('3.33'), Decimal('3.34')])
+        self.assertEqual(sum(payment.sub_total for payment in Payment.objects.all()), Decimal('10.00'))
+
+    def test_split_charges_the_price_the_item_was_added_at(self):
+        Dish.objects.filter(id=self.dish.id).update(price=Decimal('12.00'))
+
+        payments = PaymentSplitService.split_check(self.order, 'even', parts=2)
+
+        self.assertEqual(sum(payment.sub_total for payment in payments), Decimal('10.00'))
+        self.assertTrue(all(item.price == Decimal('10.00') for item in PaymentItem.objects.filter(payment__in=payments)))
+
+    def test_order_with_a_payment_is_not_charged_again(self):
+        PaymentService.create_payment({
+            'order': self.order,
+            'payment_items': [{'order_item_id': self.order.order_items.get().id}],
+        })
+
+        with self.assertRaises(BusinessRuleViolationException):
+            PaymentService.close_check(self.order)
+        with self.assertRaises(BusinessRuleViolationException):
+            PaymentSplitService.split_check(self.order, 'even', parts=2)
+        self.assertEqual(Payment.objects.count(), 1)
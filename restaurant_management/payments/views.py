@@ -1,16 +1,26 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAdminUser
+from rest_framework.decorators import action
+
+from datetime import timedelta
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from .services.payment_service import PaymentService
-from .serializers import PaymentSerializer
+from .services.sales_rollup_service import SalesRollupService
+from .services.dish_sales_service import DishSalesService
+from .services.payment_export_service import PaymentExportService
+from .serializers import PaymentSerializer, PaymentCompleteSerializer, PaymentBulkSettleSerializer, DailySalesRollupSerializer
 from .models import Payment
 from .documentation.payment_doc_data import PaymentDocumentationData as PaymentDocData
 
 from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
 from shared.pagination import CustomPagination
+from shared.cache.idempotency import idempotent, idempotency_key_parameter
 
 import logging
 
@@ -25,6 +35,7 @@ class PaymentAdminViews(viewsets.ModelViewSet):
         operation_summary=PaymentDocData.list_operation_summary,
         operation_description=PaymentDocData.list_operation_description,
         manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search by order ID, method/status/currency code or dish name", type=openapi.TYPE_STRING),
             openapi.Parameter('status', openapi.IN_QUERY, description="Filter by payment status", type=openapi.TYPE_STRING),
             openapi.Parameter('payment_method', openapi.IN_QUERY, description="Filter by payment method", type=openapi.TYPE_STRING),
             openapi.Parameter('start_date', openapi.IN_QUERY, description="Start date for date range filter (YYYY-MM-DD)", type=openapi.TYPE_STRING),
@@ -49,7 +60,7 @@ class PaymentAdminViews(viewsets.ModelViewSet):
         search_params = PaymentService.get_search_params(query_params)
         applied_filters = PaymentService.get_applied_filter_names(search_params)
         
-        queryset = Payment.objects.dynamic_search(search_params)
+        queryset = Payment.objects.dynamic_search(search_params).with_items().order_by('-created_at', '-id')
         page = self.paginate_queryset(queryset)
         
         logger.info(f"Returning {len(page if page else [])} payments with applied filters: {applied_filters}")
@@ -59,7 +70,7 @@ class PaymentAdminViews(viewsets.ModelViewSet):
             data=serializer.data,
             entity="Payment List",
             metadata={
-                "pagination": self.paginator.get_paginated_response({}).data,
+                "pagination": self.paginator.get_paginated_metadata(),
                 "applied_filters": applied_filters
             }
         )
@@ -94,6 +105,7 @@ class PaymentAdminViews(viewsets.ModelViewSet):
         operation_summary=PaymentDocData.create_operation_summary,
         operation_description=PaymentDocData.create_operation_description,
         request_body=PaymentSerializer,
+        manual_parameters=[idempotency_key_parameter],
         responses={
             status.HTTP_201_CREATED: PaymentDocData.payment_response,
             status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
@@ -103,6 +115,7 @@ class PaymentAdminViews(viewsets.ModelViewSet):
         },
         tags=['Payments (Admin)']
     )
+    @idempotent('create_payment')
     def create(self, request, *args, **kwargs):
         user_id = getattr(request.user, 'id', 'Anonymous') 
         logger.info(f"User {user_id} is requesting to create a Payment.")
@@ -176,9 +189,262 @@ class PaymentAdminViews(viewsets.ModelViewSet):
 
         return ResponseWrapper.deleted(f"Payment {payment_id}")
 
+    @swagger_auto_schema(
+        operation_id='complete_payment',
+        operation_summary=PaymentDocData.complete_operation_summary,
+        operation_description=PaymentDocData.complete_operation_description,
+        request_body=PaymentCompleteSerializer,
+        responses={
+            status.HTTP_200_OK: PaymentDocData.payment_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_404_NOT_FOUND: PaymentDocData.not_found_response,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=True, methods=['patch'])
+    def complete(self, request, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        instance = self.get_object()
+        logger.info(f"User {user_id} is requesting to complete Payment Id {instance.id}.")
+
+        serializer = PaymentCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        payment = PaymentService.complete_payment(instance, serializer.validated_data.get('payment_method'))
+        return ResponseWrapper.success(
+            data=self.get_serializer(payment).data,
+            message=f"Payment {payment.id} Successfully Completed"
+        )
+
+    @swagger_auto_schema(
+        operation_id='settle_payments',
+        operation_summary=PaymentDocData.settle_operation_summary,
+        operation_description=PaymentDocData.settle_operation_description,
+        request_body=PaymentBulkSettleSerializer,
+        responses={
+            status.HTTP_200_OK: PaymentDocData.settle_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=False, methods=['post'], url_path='settle')
+    def settle(self, request, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        serializer = PaymentBulkSettleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        settlements = serializer.validated_data['settlements']
+        logger.info(f"User {user_id} is requesting to settle {len(settlements)} payments.")
+
+        results = PaymentService.settle_payments(settlements)
+        settled_count = sum(result['settled'] for result in results)
+        return ResponseWrapper.success(
+            data=results,
+            message=f"{settled_count} of {len(results)} Payments Successfully Completed"
+        )
+
+    @swagger_auto_schema(
+        operation_id='refund_payment',
+        operation_summary=PaymentDocData.refund_operation_summary,
+        operation_description=PaymentDocData.refund_operation_description,
+        responses={
+            status.HTTP_200_OK: PaymentDocData.payment_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_404_NOT_FOUND: PaymentDocData.not_found_response,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=True, methods=['patch'])
+    def refund(self, request, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        instance = self.get_object()
+        logger.info(f"User {user_id} is requesting to refund Payment Id {instance.id}.")
+
+        payment = PaymentService.refund_payment(instance)
+        return ResponseWrapper.success(
+            data=self.get_serializer(payment).data,
+            message=f"Payment {payment.id} Successfully Refunded"
+        )
+
+    @swagger_auto_schema(
+        operation_id='daily_sales',
+        operation_summary=PaymentDocData.daily_sales_operation_summary,
+        operation_description=PaymentDocData.daily_sales_operation_description,
+        manual_parameters=[
+            openapi.Parameter('from', openapi.IN_QUERY, description="First day (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('to', openapi.IN_QUERY, description="Last day (YYYY-MM-DD)", type=openapi.TYPE_STRING)
+        ],
+        responses={
+            status.HTTP_200_OK: PaymentDocData.daily_sales_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=False, methods=['get'], url_path='sales/daily')
+    def daily_sales(self, request, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        logger.info(f"User {user_id} is requesting daily sales.")
+
+        date_range, error_message = _parse_date_range(request.query_params, default_days=30)
+        if error_message:
+            return ResponseWrapper.bad_request(message=error_message)
+
+        rollups = SalesRollupService.get_daily_sales(*date_range)
+        return ResponseWrapper.found(
+            data=DailySalesRollupSerializer(rollups, many=True).data,
+            entity="Daily Sales"
+        )
+
+    @swagger_auto_schema(
+        operation_id='top_dishes',
+        operation_summary=PaymentDocData.top_dishes_operation_summary,
+        operation_description=PaymentDocData.top_dishes_operation_description,
+        manual_parameters=[
+            openapi.Parameter('from', openapi.IN_QUERY, description="First day (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('to', openapi.IN_QUERY, description="Last day (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Number of dishes to return", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('rank_by', openapi.IN_QUERY, description="quantity or revenue", type=openapi.TYPE_STRING)
+        ],
+        responses={
+            status.HTTP_200_OK: PaymentDocData.top_dishes_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=False, methods=['get'], url_path='sales/dishes/top')
+    def top_dishes(self, request, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        logger.info(f"User {user_id} is requesting the top selling dishes.")
+
+        date_range, error_message = _parse_date_range(request.query_params, default_days=30)
+        if error_message:
+            return ResponseWrapper.bad_request(message=error_message)
+        try:
+            limit = int(request.query_params.get('limit', DishSalesService.DEFAULT_TOP_LIMIT))
+        except ValueError:
+            return ResponseWrapper.bad_request(message="limit must be an integer")
+
+        top_dishes = DishSalesService.get_top_dishes(
+            *date_range,
+            limit=limit,
+            rank_by=request.query_params.get('rank_by', 'quantity')
+        )
+        return ResponseWrapper.found(data=top_dishes, entity="Top Dishes")
+
+    @swagger_auto_schema(
+        operation_id='dish_sales_trend',
+        operation_summary=PaymentDocData.dish_trend_operation_summary,
+        operation_description=PaymentDocData.dish_trend_operation_description,
+        manual_parameters=[
+            openapi.Parameter('from', openapi.IN_QUERY, description="First day (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('to', openapi.IN_QUERY, description="Last day (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('granularity', openapi.IN_QUERY, description="day, week or month", type=openapi.TYPE_STRING)
+        ],
+        responses={
+            status.HTTP_200_OK: PaymentDocData.dish_trend_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=False, methods=['get'], url_path=r'sales/dishes/(?P<dish_id>[0-9]+)/trend')
+    def dish_trend(self, request, dish_id=None, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        logger.info(f"User {user_id} is requesting the sales trend of dish {dish_id}.")
+
+        date_range, error_message = _parse_date_range(request.query_params, default_days=365)
+        if error_message:
+            return ResponseWrapper.bad_request(message=error_message)
+
+        trend = DishSalesService.get_dish_trend(
+            int(dish_id),
+            *date_range,
+            granularity=request.query_params.get('granularity', 'day')
+        )
+        return ResponseWrapper.found(data=trend, entity=f"Dish {dish_id} Sales Trend")
+
+    @swagger_auto_schema(
+        operation_id='export_payments',
+        operation_summary=PaymentDocData.export_operation_summary,
+        operation_description=PaymentDocData.export_operation_description,
+        manual_parameters=[
+            openapi.Parameter('rows', openapi.IN_QUERY, description="payments or items", type=openapi.TYPE_STRING),
+            openapi.Parameter('output', openapi.IN_QUERY, description="csv or ndjson", type=openapi.TYPE_STRING),
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search by order ID, method/status/currency code or dish name", type=openapi.TYPE_STRING),
+            openapi.Parameter('status', openapi.IN_QUERY, description="Filter by payment status", type=openapi.TYPE_STRING),
+            openapi.Parameter('method', openapi.IN_QUERY, description="Filter by payment method", type=openapi.TYPE_STRING),
+            openapi.Parameter('from', openapi.IN_QUERY, description="Start date for date range filter (YYYY-MM-DD)", type=openapi.TYPE_STRING),
+            openapi.Parameter('to', openapi.IN_QUERY, description="End date for date range filter (YYYY-MM-DD)", type=openapi.TYPE_STRING)
+        ],
+        responses={
+            status.HTTP_200_OK: PaymentDocData.export_response,
+            status.HTTP_400_BAD_REQUEST: PaymentDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: PaymentDocData.unauthorized_reponse,
+            status.HTTP_403_FORBIDDEN: PaymentDocData.forbidden_reponse,
+            status.HTTP_500_INTERNAL_SERVER_ERROR: PaymentDocData.server_error_reponse
+        },
+        tags=['Payments (Admin)']
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request, *args, **kwargs):
+        user_id = getattr(request.user, 'id', 'Anonymous') 
+        query_params = request.query_params
+        rows = query_params.get('rows', 'payments')
+        output = query_params.get('output', 'csv')
+
+        search_params = PaymentService.get_search_params(query_params)
+        logger.info(f"User {user_id} is exporting {rows} as {output} with filters: {PaymentService.get_applied_filter_names(search_params)}")
+
+        lines = PaymentExportService.export(Payment.objects.dynamic_search(search_params), rows=rows, output=output)
+        filename = f"{rows}-{timezone.localdate().isoformat()}.{output}"
+        return StreamingHttpResponse(
+            lines,
+            content_type=PaymentExportService.CONTENT_TYPES[output],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+
     def get_queryset(self):
         """Apply search filters to the base queryset"""
-        queryset = Payment.objects.all()
         query_params = self.request.query_params
         search_params = PaymentService.get_search_params(query_params)
-        return Payment.objects.dynamic_search(search_params)
+        return Payment.objects.dynamic_search(search_params).with_items()
+
+
+def _parse_date_range(query_params, default_days):
+    """
+    Reads the inclusive `from` / `to` day range of the sales reports, defaulting to
+    the last `default_days` days.
+
+    Returns:
+        ((date_from, date_to), None), or (None, error message) if a date is invalid
+    """
+    date_to = timezone.localdate()
+    date_range = {'from': date_to - timedelta(days=default_days - 1), 'to': date_to}
+    for param in date_range:
+        raw_value = query_params.get(param)
+        if raw_value:
+            try:
+                date_range[param] = parse_date(raw_value)
+            except ValueError:
+                date_range[param] = None
+            if date_range[param] is None:
+                return None, f"'{param}' must be a date (YYYY-MM-DD)"
+
+    return (date_range['from'], date_range['to']), None
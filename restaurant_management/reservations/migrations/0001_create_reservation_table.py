@@ -1,16 +1,18 @@
 # menu/migrations/000C_create_reservations_table.py
 
 from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
 
 
 class Migration(migrations.Migration):
 
     dependencies = [
+        ('tables', '0001_create_tables_and_data'),
     ]
 
     operations = [
         # --- Create reservations table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE reservations (
                 id SERIAL PRIMARY KEY,
@@ -48,12 +50,15 @@ class Migration(migrations.Migration):
                         ('created_at', models.DateTimeField(auto_now_add=True)),
                         ('cancelled_at', models.DateTimeField(null=True, blank=True)),
                     ],
+                    options={
+                        'db_table': 'reservations',
+                    },
                 ),
             ]
         ),
 
         # --- Insert initial data for reservations ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             INSERT INTO reservations (name, phone_number, customer_number, email, table_id, reservation_date, status)
             VALUES (
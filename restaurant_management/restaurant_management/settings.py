@@ -153,6 +153,11 @@ CACHES = {
     }
 }
 
+if os.getenv('TESTING', 'False') == 'True' or 'test' in sys.argv:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -57,6 +57,33 @@ class CacheManager:
         """
         cache.set(key, value, timeout or self.CACHE_TIMEOUT)
 
+    def set_persistent(self, key: str, value: Any):
+        """
+        Store a value in the cache with no expiration, e.g. a version counter that
+        other keys are derived from.
+        
+        Args:
+            key (str): The cache key to store the value under.
+            value (Any): The value to store in the cache.
+        """
+        cache.set(key, value, None)
+
+    def add(self, key: str, value: Any, timeout: int = None) -> bool:
+        """
+        Store a value only if the key is not already cached. The check and the write
+        are a single atomic operation on the cache backend, so it can serve as a lock.
+        
+        Args:
+            key (str): The cache key to store the value under.
+            value (Any): The value to store in the cache.
+            timeout (int, optional): The expiration time for the cache entry in seconds. 
+                                     Defaults to `CACHE_TIMEOUT` if not provided.
+        
+        Returns:
+            bool: True if the value was stored, False if the key already existed.
+        """
+        return cache.add(key, value, timeout or self.CACHE_TIMEOUT)
+
     def set_multi(self, data: Dict[str, Any], timeout: int = None):
         """
         Store multiple key-value pairs in the cache with an optional timeout.
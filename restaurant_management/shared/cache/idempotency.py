@@ -0,0 +1,129 @@
+import hashlib
+import json
+import uuid
+from functools import wraps
+from drf_yasg import openapi
+from rest_framework.response import Response
+from shared.cache.django_cache_manager import CacheManager
+from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+RESPONSE_TTL = 60 * 60 * 24
+LOCK_TIMEOUT = 30
+RETRY_AFTER_SECONDS = 1
+
+cache_manager = CacheManager('idempotency_')
+
+idempotency_key_parameter = openapi.Parameter(
+    IDEMPOTENCY_HEADER,
+    openapi.IN_HEADER,
+    description="Unique key of the request; retries with the same key replay the first successful response",
+    type=openapi.TYPE_STRING,
+    required=False
+)
+
+
+def idempotent(scope: str):
+    """
+    Makes a view method safe to retry with an `Idempotency-Key` header.
+
+    The first successful (2xx) response for a key is cached for `RESPONSE_TTL` and
+    replayed for every retry, without running the view again. Concurrent requests
+    with the same key are serialized with a short cache lock: a duplicate that finds
+    the lock taken gets 409 Conflict at once, with a `Retry-After` header, instead
+    of holding a worker while the first one finishes. Failed requests are not
+    stored, so they can be retried. Requests without the header run as usual.
+
+    Keys are namespaced by scope, user and URL, and reusing a key with a different
+    request body is rejected with 409 Conflict.
+
+    Args:
+        scope: Name of the operation, e.g. 'create_payment'
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if not idempotency_key:
+                return view_method(view, request, *args, **kwargs)
+
+            user_id = getattr(request.user, 'id', None)
+            cache_key = _get_cache_key(scope, user_id, request.path, idempotency_key)
+            lock_key = f"{cache_key}_lock"
+            fingerprint = _get_fingerprint(request)
+            lock_token = uuid.uuid4().hex
+
+            stored, locked = _get_response_or_lock(cache_key, lock_key, lock_token)
+            if stored is not None:
+                return _replay(stored, fingerprint, idempotency_key)
+            if not locked:
+                response = ResponseWrapper.conflict(
+                    message=f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+                )
+                response['Retry-After'] = str(RETRY_AFTER_SECONDS)
+                return response
+
+            try:
+                response = view_method(view, request, *args, **kwargs)
+                if 200 <= response.status_code < 300:
+                    cache_manager.set(cache_key, {
+                        'fingerprint': fingerprint,
+                        'status': response.status_code,
+                        'data': response.data,
+                    }, RESPONSE_TTL)
+                return response
+            finally:
+                _release_lock(lock_key, lock_token)
+
+        return wrapper
+    return decorator
+
+
+def _get_response_or_lock(cache_key: str, lock_key: str, lock_token: str):
+    """
+    Returns `(stored response, None)` if the key was already answered, `(None, True)`
+    if this request took the lock (stored as `lock_token`), or `(None, False)` if
+    another request holds it. Never waits.
+    """
+    stored = cache_manager.get(cache_key)
+    if stored is not None:
+        return stored, None
+    if cache_manager.add(lock_key, lock_token, LOCK_TIMEOUT):
+        return None, True
+
+    # The holder may have stored its response between the two calls
+    stored = cache_manager.get(cache_key)
+    return stored, None if stored is not None else False
+
+
+def _release_lock(lock_key: str, lock_token: str) -> None:
+    """
+    Deletes the lock only if it still holds this request's token. If the view ran
+    past `LOCK_TIMEOUT`, the lock has expired and may now belong to a retry.
+    """
+    if cache_manager.get(lock_key) == lock_token:
+        cache_manager.delete(lock_key)
+
+
+def _replay(stored: dict, fingerprint: str, idempotency_key: str) -> Response:
+    if stored['fingerprint'] != fingerprint:
+        return ResponseWrapper.conflict(
+            message=f"{IDEMPOTENCY_HEADER} {idempotency_key} was already used for a different request"
+        )
+
+    logger.info(f"Replaying the stored response for {IDEMPOTENCY_HEADER} {idempotency_key}.")
+    return Response(data=stored['data'], status=stored['status'], headers={REPLAYED_HEADER: 'true'})
+
+
+def _get_cache_key(scope: str, user_id, path: str, idempotency_key: str) -> str:
+    key_hash = hashlib.sha256(f"{path}:{idempotency_key}".encode()).hexdigest()
+    return f"{cache_manager.cache_prefix}{scope}_{user_id}_{key_hash}"
+
+
+def _get_fingerprint(request) -> str:
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method}:{body}".encode()).hexdigest()
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+class PostgresRunSQL(migrations.RunSQL):
+    """
+    RunSQL for the hand-written PostgreSQL schema.
+
+    On PostgreSQL the SQL runs as written. Other backends (SQLite in tests) can't run
+    it, so the state operations are applied to the schema instead: the tables and
+    columns of the models still exist, while data inserts, backfills and
+    Postgres-only indexes are skipped.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+        for operation in self.state_operations:
+            operation_to_state = from_state.clone()
+            operation.state_forwards(app_label, operation_to_state)
+            operation.database_forwards(app_label, schema_editor, from_state, operation_to_state)
+            from_state = operation_to_state
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+        states = [to_state]
+        for operation in self.state_operations[:-1]:
+            state = states[-1].clone()
+            operation.state_forwards(app_label, state)
+            states.append(state)
+
+        for operation, operation_to_state in reversed(list(zip(self.state_operations, states))):
+            operation_from_state = operation_to_state.clone()
+            operation.state_forwards(app_label, operation_from_state)
+            operation.database_backwards(app_label, schema_editor, operation_from_state, operation_to_state)
@@ -0,0 +1,34 @@
+import json
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one JSON object per line).
+
+    Returns a generator instead of a list, so the request body is read line by
+    line as the view consumes it rather than being loaded all at once.
+    It yields `(line number, object)` pairs numbered by physical line, so parse
+    errors and the caller's validation errors point at the same line. Blank
+    lines are ignored but still counted.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if stream is None:
+            return iter(())
+        return self._iter_lines(stream, encoding)
+
+    @staticmethod
+    def _iter_lines(stream, encoding):
+        for line_number, raw_line in enumerate(stream, start=1):
+            line = raw_line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as exc:
+                raise ParseError(f"Line {line_number}: invalid JSON - {exc}")
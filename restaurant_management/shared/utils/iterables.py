@@ -0,0 +1,9 @@
+from itertools import islice
+from typing import Iterable, Iterator
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    """Yields consecutive lists of at most `size` items, without loading the whole iterable."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+
+class PriceCalculator:
+    """
+    Line-item price arithmetic shared by orders (running totals) and payments (charged items).
+    Bulk computations work in integer cents, converted with `to_cents` / `from_cents`.
+    """
+    CENT = Decimal('0.01')
+
+    @classmethod
+    def calculate_item_base_price(cls, unit_price, quantity) -> Decimal:
+        return unit_price * quantity
+
+    @classmethod
+    def calculate_item_total_price(cls, base_price, extra_price) -> Decimal:
+        return base_price + extra_price
+
+    @classmethod
+    def calculate_menu_extra_charges(cls, menu_extra) -> Decimal:
+        return menu_extra.price if menu_extra else Decimal("0.00")
+
+    @staticmethod
+    def to_cents(amount: Decimal) -> int:
+        return int(amount * 100)
+
+    @staticmethod
+    def from_cents(cents: int) -> Decimal:
+        return Decimal(cents).scaleb(-2)
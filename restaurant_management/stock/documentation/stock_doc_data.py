@@ -1,6 +1,7 @@
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import status, serializers
+from ..serializers import LowStockSerializer
 
 # TODO: Use It in Response Wrapper?????
 class StockResponseSerializer(serializers.Serializer):
@@ -61,8 +62,42 @@ class StockDocumentationData:
                     }
                 ],
                 "metadata": {
-                    "total": 5,
-                    "note": "Add ?include_transactions=true to include transactions"
+                    "pagination": {
+                        "count": 5,
+                        "total_pages": 1,
+                        "current_page": 1,
+                        "next": None,
+                        "previous": None,
+                        "page_size": 25
+                    },
+                    "note": "Add ?include_transactions=true to include the latest transactions"
+                }
+            }
+        }
+    )
+    
+    low_stock_response = openapi.Response(
+        description="Stocks below the low-stock threshold, most depleted first",
+        schema=LowStockSerializer(many=True),
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "Low Stock successfully found",
+                "data": [
+                    {
+                        "id": 8,
+                        "item_id": 8,
+                        "item_name": "Black Peppercorns",
+                        "unit": "kg",
+                        "total_stock": 0,
+                        "optimal_stock_quantity": 1,
+                        "fill_ratio": 0.0,
+                        "updated_at": "2024-01-01T12:00:00Z"
+                    }
+                ],
+                "metadata": {
+                    "ratio": 1.0,
+                    "total": 1
                 }
             }
         }
@@ -100,13 +135,31 @@ class StockDocumentationData:
     # Operation metadata
     list_operation_summary = 'List all stock'
     list_operation_description = """
-    Returns a list of all stock in inventory.
+    Returns a paginated list of the stock in inventory, most recently updated first.
     
     **Permissions:**
     - `IsAuthenticated`: User must be logged in.
     
     **Query Parameters:**
-    - `include_transactions=true`: Include transaction history for each stock 
+    - `include_transactions=true`: Include the latest transactions of each stock, newest first
+    - `transactions_limit`: Transactions per stock when included (default 10, max 50)
+    - `page` / `page_size`: Page number and size (default 25, max 100)
+    """
+    
+    low_stock_operation_summary = 'List low stock'
+    low_stock_operation_description = """
+    Returns the stocks holding less than `ratio` times their optimal quantity, most depleted first.
+    
+    **Permissions:**
+    - `IsAuthenticated`: User must be logged in.
+    
+    **Query Parameters:**
+    - `ratio`: Threshold as a fraction of the optimal quantity, e.g. `0.5` for stocks under half
+      of it (default 1.0, max 10)
+    
+    **Note:**
+    - Filtered in the database on an indexed fill ratio, so there is no need to pull the whole inventory
+    - Server-side receivers of the `stock_low` signal are notified when a stock drops below its optimal quantity
     """
     
     retrieve_operation_summary = 'Retrieve a specific stock '
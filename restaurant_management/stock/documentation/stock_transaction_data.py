@@ -57,6 +57,28 @@ class StockTransactionDocumentationData:
             }
         }
     )
+    batch_response = openapi.Response(
+        description="Result of each transaction line",
+        examples={
+            "application/json": {
+                "success": True,
+                "message": "1 of 2 Stock Transactions Successfully Registered",
+                "data": [
+                    {
+                        "line": 1,
+                        "registered": True,
+                        "transaction_id": 321
+                    },
+                    {
+                        "line": 2,
+                        "registered": False,
+                        "error": "Quantity to add exceeds the optimal stock quantity."
+                    }
+                ]
+            }
+        }
+    )
+    
     server_error_reponse = ErrorResponses.get_server_error_response()
     unauthorized_reponse = ErrorResponses.get_unauthorized_response()
     forbidden_reponse = ErrorResponses.get_forbidden_response()
@@ -78,6 +100,23 @@ class StockTransactionDocumentationData:
     - This will automatically update the associated stock total
     """
     
+    register_batch_operation_summary = 'Register a batch of stock transactions'
+    register_batch_operation_description = """
+    Records up to 500 stock movements at once, e.g. when receiving a supplier delivery.
+    
+    **Permissions:**
+    - `IsAuthenticated`: User must be logged in.
+    
+    **Request Body:**
+    - `transactions`: List of lines with `stock` (ID), `transaction_type` ('IN' or 'OUT'),
+      `quantity` and optional `date`, `expires_at` and `notes`
+    
+    **Note:**
+    - Lines are applied in order, so an OUT can use stock received earlier in the same batch
+    - Invalid lines are reported with their 1-based position and skipped; the valid lines are still registered
+    - The stock totals are updated once per stock for the whole batch
+    """
+    
     update_operation_summary = 'Update a stock transaction'
     update_operation_description = """
     Updates an existing stock transaction record.
@@ -1,13 +1,16 @@
+from django.conf import settings
 from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
 
 class Migration(migrations.Migration):
 
     dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
     ]
 
     operations = [
         # --- Create stock_items table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE stock_items (
                 id SERIAL PRIMARY KEY,
@@ -41,12 +44,15 @@ class Migration(migrations.Migration):
                         ('created_at', models.DateTimeField(auto_now_add=True)),
                         ('updated_at', models.DateTimeField(auto_now=True)),
                     ],
+                    options={
+                        'db_table': 'stock_items',
+                    },
                 ),
             ]
         ),
 
         # --- Create stocks table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE stocks (
                 id SERIAL PRIMARY KEY,
@@ -77,12 +83,15 @@ class Migration(migrations.Migration):
                         ('created_at', models.DateTimeField(auto_now_add=True)),
                         ('updated_at', models.DateTimeField(auto_now=True)),
                     ],
+                    options={
+                        'db_table': 'stocks',
+                    },
                 ),
             ]
         ),
 
         # --- Create stock_transactions table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE stock_transactions (
                 id SERIAL PRIMARY KEY,
@@ -119,7 +128,7 @@ class Migration(migrations.Migration):
                         # If you have a User model in Django's auth app:
                         ('employee', models.ForeignKey(
                             on_delete=models.SET_NULL,
-                            to='auth.user', # Assuming 'users' means Django's default User model
+                            to=settings.AUTH_USER_MODEL,
                             null=True, blank=True
                         )),
                         # If you have a custom User model in a different app, adjust 'auth.user' accordingly,
@@ -127,6 +136,9 @@ class Migration(migrations.Migration):
                         ('notes', models.TextField(null=True, blank=True)),
                         ('created_at', models.DateTimeField(auto_now_add=True)),
                     ],
+                    options={
+                        'db_table': 'stock_transactions',
+                    },
                 ),
             ]
         ),
@@ -135,7 +147,7 @@ class Migration(migrations.Migration):
         # Note: You can create indexes via RunSQL, or by defining them in the Model's Meta class.
         # If defined in Meta, makemigrations will automatically generate the AddIndex operation.
         # Here, we keep them in RunSQL for consistency with your request.
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE INDEX idx_stock_transactions_type ON stock_transactions (transaction_type);
             CREATE INDEX idx_stock_transactions_date ON stock_transactions (date);
@@ -152,7 +164,7 @@ class Migration(migrations.Migration):
         # Note: The subqueries to get 'dishes.id' require that the 'dishes' table
         # and its data are already present when this migration runs.
         # Ensure your dependencies are correctly ordered!
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             INSERT INTO stock_items (menu_item_id, name, unit, category) VALUES
             ((SELECT id FROM dishes WHERE name = 'Grilled Salmon'), 'Fresh Salmon Fillet', 'kg', 'INGREDIENT'),
@@ -206,7 +218,7 @@ class Migration(migrations.Migration):
         # The IDs (1-20) are based on the order of insertion in the previous block.
         # This can be fragile if the order of insertion changes.
         # For robustness, you might consider using subqueries to get item_id by name if possible.
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             INSERT INTO stocks (item_id, total_stock, optimal_stock_quantity) VALUES
             ((SELECT id FROM stock_items WHERE name = 'Fresh Salmon Fillet'), 15, 10),
@@ -244,7 +256,7 @@ class Migration(migrations.Migration):
         ),
 
         # --- Insert sample stock_transactions ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             -- Sample transactions (these are harder to reverse precisely without knowing the IDs
             -- of the stocks they refer to. For initial data, often reversing transactions
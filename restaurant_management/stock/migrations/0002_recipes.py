@@ -0,0 +1,65 @@
+from django.db import migrations, models
+import django.core.validators
+import django.db.models.deletion
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0001_stock_management_tables'),
+    ]
+
+    operations = [
+        # --- Create recipes table (bill of materials of each dish) ---
+        PostgresRunSQL(
+            sql="""
+            CREATE TABLE recipes (
+                id SERIAL PRIMARY KEY,
+                dish_id INTEGER NOT NULL,
+                stock_item_id INTEGER NOT NULL,
+                quantity_per_portion INTEGER NOT NULL,
+                CONSTRAINT unique_recipe_ingredient UNIQUE (dish_id, stock_item_id),
+                CONSTRAINT positive_quantity_per_portion CHECK (quantity_per_portion >= 1),
+                FOREIGN KEY (dish_id) REFERENCES dishes(id) ON DELETE CASCADE,
+                FOREIGN KEY (stock_item_id) REFERENCES stock_items(id) ON DELETE RESTRICT
+            );
+            CREATE INDEX idx_recipes_stock_item ON recipes (stock_item_id);
+            """,
+            reverse_sql="""
+            DROP TABLE recipes;
+            """,
+            state_operations=[
+                migrations.CreateModel(
+                    name='Recipe',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('dish', models.ForeignKey(
+                            on_delete=django.db.models.deletion.CASCADE,
+                            to='menu.dish',
+                            related_name='recipes'
+                        )),
+                        ('stock_item', models.ForeignKey(
+                            on_delete=django.db.models.deletion.PROTECT,
+                            to='stock.stockitem',
+                            related_name='recipes'
+                        )),
+                        ('quantity_per_portion', models.IntegerField(validators=[
+                            django.core.validators.MinValueValidator(1),
+                            django.core.validators.MaxValueValidator(10000)
+                        ])),
+                    ],
+                    options={
+                        'db_table': 'recipes',
+                        'constraints': [
+                            models.UniqueConstraint(fields=('dish', 'stock_item'), name='unique_recipe_ingredient'),
+                            models.CheckConstraint(
+                                check=models.Q(quantity_per_portion__gte=1),
+                                name='positive_quantity_per_portion'
+                            ),
+                        ],
+                    },
+                ),
+            ]
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.functions.comparison
+from shared.migrations import PostgresRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0002_recipes'),
+    ]
+
+    operations = [
+        # --- Index the fill ratio of stocks, for the low-stock query ---
+        PostgresRunSQL(
+            sql="""
+            CREATE INDEX idx_stocks_fill_ratio ON stocks ((total_stock::double precision / optimal_stock_quantity));
+            """,
+            reverse_sql="""
+            DROP INDEX idx_stocks_fill_ratio;
+            """,
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='stock',
+                    index=models.Index(
+                        django.db.models.functions.comparison.Cast('total_stock', models.FloatField())
+                        / models.F('optimal_stock_quantity'),
+                        name='idx_stocks_fill_ratio'
+                    ),
+                ),
+            ]
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Cast
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
@@ -147,6 +148,12 @@ class Stock(models.Model):
                 name='unique_item_inventory'
             )
         ]
+        indexes = [
+            models.Index(
+                Cast('total_stock', models.FloatField()) / models.F('optimal_stock_quantity'),
+                name='idx_stocks_fill_ratio'
+            )
+        ]
 
     def __str__(self):
         return f"{self.item.name} - {self.total_stock} {self.item.unit}"
@@ -154,6 +161,11 @@ class Stock(models.Model):
     def get_transactions(self):
         return self.transactions.all().order_by('-date')
 
+    @staticmethod
+    def fill_ratio():
+        """Current stock over optimal stock, the expression indexed by idx_stocks_fill_ratio"""
+        return Cast('total_stock', models.FloatField()) / models.F('optimal_stock_quantity')
+
     def clean(self):
         super().clean()
         if self.total_stock > self.optimal_stock_quantity * 3:
@@ -244,4 +256,49 @@ class StockTransaction(models.Model):
         if self.expires_at and self.expires_at < timezone.now():
             raise ValidationError({
                 'expires_at': _('Expiration date cannot be in the past')
-            })
\ No newline at end of file
+            })
+
+class Recipe(models.Model):
+    """
+    One ingredient line of a dish's bill of materials: how much of a stock item
+    a single portion of the dish consumes.
+    """
+    dish = models.ForeignKey(
+        'menu.Dish',
+        on_delete=models.CASCADE,
+        related_name='recipes',
+        verbose_name=_('Dish')
+    )
+
+    stock_item = models.ForeignKey(
+        StockItem,
+        on_delete=models.PROTECT,
+        related_name='recipes',
+        verbose_name=_('Stock Item')
+    )
+
+    quantity_per_portion = models.IntegerField(
+        validators=[
+            MinValueValidator(1, _('Quantity per portion must be at least 1')),
+            MaxValueValidator(10000, _('Quantity per portion cannot exceed 10,000'))
+        ],
+        verbose_name=_('Quantity per Portion')
+    )
+
+    class Meta:
+        db_table = 'recipes'
+        verbose_name = _('Recipe Ingredient')
+        verbose_name_plural = _('Recipe Ingredients')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dish', 'stock_item'],
+                name='unique_recipe_ingredient'
+            ),
+            models.CheckConstraint(
+                check=models.Q(quantity_per_portion__gte=1),
+                name='positive_quantity_per_portion'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.dish_id}: {self.quantity_per_portion} {self.stock_item.unit} of {self.stock_item.name}"
@@ -127,20 +127,31 @@ class StockTransactionSerializer(serializers.ModelSerializer):
             }
         }
 
-    def validate_quantity(self, value):
-        """Context-aware quantity validation"""
-        if self.context['request'].method in ['POST', 'PUT', 'PATCH']:
-            stock = self.initial_data.get('stock')
-            transaction_type = self.initial_data.get('transaction_type')
-            
-            if transaction_type == 'OUT' and stock:
-                current_stock = Stock.objects.get(pk=stock).total_stock
-                if value > current_stock:
-                    raise serializers.ValidationError(
-                        _('Cannot withdraw more than available stock')
-                    )
+    def validate_expires_at(self, value):
+        """Future date validation"""
+        if value and value < timezone.now():
+            raise serializers.ValidationError(
+                _('Expiration date must be in the future')
+            )
         return value
 
+    def create(self, validated_data):
+        """Auto-update stock levels on transaction creation, with the same guarded UPDATE as the service"""
+        from .services.stock_transaction_service import StockTransactionService
+        return StockTransactionService.process_transaction(validated_data)
+
+
+class StockTransactionLineSerializer(serializers.Serializer):
+    """
+    One line of a stock transaction batch. The stock is a plain ID, resolved by the service
+    """
+    stock = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1, max_value=10000)
+    transaction_type = serializers.ChoiceField(choices=StockTransaction.TransactionType.choices)
+    date = serializers.DateTimeField(required=False)
+    expires_at = serializers.DateTimeField(required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, max_length=500)
+
     def validate_expires_at(self, value):
         """Future date validation"""
         if value and value < timezone.now():
@@ -149,18 +160,14 @@ class StockTransactionSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def create(self, validated_data):
-        """Auto-update stock levels on transaction creation"""
-        transaction = super().create(validated_data)
-        
-        stock = transaction.stock
-        if transaction.transaction_type == 'IN':
-            stock.total_stock += transaction.quantity
-        else:
-            stock.total_stock -= transaction.quantity
-        stock.save()
-        
-        return transaction
+
+class StockTransactionBatchSerializer(serializers.Serializer):
+    """
+    Input for registering many stock transactions at once, e.g. a supplier delivery
+    """
+    MAX_TRANSACTIONS = 500
+
+    transactions = StockTransactionLineSerializer(many=True, allow_empty=False, max_length=MAX_TRANSACTIONS)
 
 
 class StockSerializer(serializers.ModelSerializer):
@@ -204,11 +211,12 @@ class StockSerializer(serializers.ModelSerializer):
         }
 
     def get_transactions(self, obj):
-        """Includes transactions only if explicitly requested"""
+        """Includes transactions only if explicitly requested, preferring the prefetched recent ones"""
         request = self.context.get('request')
         if request and request.query_params.get('include_transactions', '').lower() == 'true':
+            transactions = getattr(obj, 'recent_transactions', None)
             return StockTransactionSerializer(
-                obj.get_transactions(),
+                obj.get_transactions() if transactions is None else transactions,
                 many=True,
                 context=self.context
             ).data
@@ -235,4 +243,18 @@ class StockSerializer(serializers.ModelSerializer):
         """Override to protect auto-generated fields"""
         validated_data.pop('created_at', None)
         validated_data.pop('updated_at', None)
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+class LowStockSerializer(serializers.ModelSerializer):
+    """
+    Read-only view of a stock below its low-stock threshold
+    """
+    item_id = serializers.IntegerField(read_only=True)
+    item_name = serializers.CharField(source='item.name', read_only=True)
+    unit = serializers.CharField(source='item.unit', read_only=True)
+    fill_ratio = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Stock
+        fields = ['id', 'item_id', 'item_name', 'unit', 'total_stock', 'optimal_stock_quantity', 'fill_ratio', 'updated_at']
+        read_only_fields = fields
@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
 from django.db import transaction
+from django.db.models import F, Prefetch, QuerySet, Window
+from django.db.models.functions import RowNumber
 from ..models import Stock, StockTransaction, StockItem
 from ..exceptions.stock_exceptions import InvalidStockFieldError
+from ..signals import stock_low
 import logging
 
 
@@ -13,6 +16,10 @@ class StockService:
     """
     MAX_STOCK_LIMIT = 1000
     MIN_STOCK_LIMIT = 0
+    LOW_STOCK_RATIO = 1.0
+    MAX_LOW_STOCK_RATIO = 10.0
+    RECENT_TRANSACTIONS_LIMIT = 10
+    MAX_RECENT_TRANSACTIONS_LIMIT = 50
     
     @staticmethod
     def validate_stock_quantity(total_stock: int, optimal_stock: int) -> None:
@@ -44,6 +51,8 @@ class StockService:
         optimal_stock_quantity = validated_data.get('optimal_stock_quantity') 
         total_stock = validated_data.get('total_stock', 0) 
 
+        was_low = cls.is_low(instance.total_stock, instance.optimal_stock_quantity)
+
         # Only Allow Total Stock Update if theres not transactions
         if len(instance.get_transactions()) == 0:
             instance.total_stock = total_stock             
@@ -53,8 +62,81 @@ class StockService:
     
         instance.save()
 
+        if not was_low and cls.is_low(instance.total_stock, instance.optimal_stock_quantity):
+            cls.notify_low_stocks([instance.id])
+
         return instance
 
+    @classmethod
+    def get_stock_list(cls, include_transactions: bool = False, transactions_limit: int = RECENT_TRANSACTIONS_LIMIT) -> QuerySet:
+        """
+        Returns the stocks for the inventory screen with their items joined in.
+
+        With `include_transactions`, the latest `transactions_limit` transactions of every
+        stock are fetched by a single prefetch query, ranked per stock with a
+        ROW_NUMBER() window, into `recent_transactions`. A page of stocks then costs the
+        same few queries whatever the number of stocks and transactions.
+
+        Raises:
+            InvalidStockFieldError: If the limit is out of range
+        """
+        stocks = Stock.objects.select_related('item').order_by('-updated_at', 'id')
+        if not include_transactions:
+            return stocks
+
+        if not 1 <= transactions_limit <= cls.MAX_RECENT_TRANSACTIONS_LIMIT:
+            raise InvalidStockFieldError(
+                f"The transactions limit must be within the range (1, {cls.MAX_RECENT_TRANSACTIONS_LIMIT})"
+            )
+
+        recent_transactions = (
+            StockTransaction.objects.annotate(
+                row_number=Window(
+                    RowNumber(),
+                    partition_by=F('stock_id'),
+                    order_by=[F('date').desc(), F('id').desc()]
+                )
+            )
+            .filter(row_number__lte=transactions_limit)
+            .order_by('-date', '-id')
+        )
+        return stocks.prefetch_related(
+            Prefetch('transactions', queryset=recent_transactions, to_attr='recent_transactions')
+        )
+
+    @classmethod
+    def get_low_stocks(cls, ratio: float = LOW_STOCK_RATIO) -> QuerySet:
+        """
+        Returns the stocks holding less than `ratio` times their optimal quantity, most
+        depleted first, with their fill ratio annotated. The filter runs in SQL on the
+        indexed fill ratio expression.
+
+        Raises:
+            InvalidStockFieldError: If the ratio is not positive or above `MAX_LOW_STOCK_RATIO`
+        """
+        if not 0 < ratio <= cls.MAX_LOW_STOCK_RATIO:
+            raise InvalidStockFieldError(f"The ratio must be within the range (0, {cls.MAX_LOW_STOCK_RATIO}]")
+
+        return (
+            Stock.objects.select_related('item')
+            .annotate(fill_ratio=Stock.fill_ratio())
+            .filter(fill_ratio__lt=ratio)
+            .order_by('fill_ratio', 'id')
+        )
+
+    @classmethod
+    def is_low(cls, total_stock: int, optimal_stock_quantity: int) -> bool:
+        return total_stock < optimal_stock_quantity * cls.LOW_STOCK_RATIO
+
+    @classmethod
+    def notify_low_stocks(cls, stock_ids: list) -> None:
+        """
+        Sends the `stock_low` signal for stocks that just crossed the low-stock threshold,
+        once the current transaction commits, so rolled back withdrawals never notify.
+        """
+        if stock_ids:
+            transaction.on_commit(lambda: stock_low.send(sender=Stock, stock_ids=list(stock_ids)))
+
     @classmethod
     def get_current_stock(cls, ingredient_id: int) -> int:
         """Gets the current stock of an ingredient"""
@@ -1,9 +1,16 @@
-from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Dict, List
 from django.db import transaction
-from ..models import Stock, StockTransaction
-from ..exceptions.stock_exceptions import InvalidStockFieldError
-from shared.exceptions.custom_exceptions import EntityNotFoundException
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from ..models import Recipe, Stock, StockTransaction
+from ..exceptions.stock_exceptions import InsufficientStockError, InvalidStockFieldError
+from ..signals import stock_low
 from .stock_service import StockService
+from shared.exceptions.custom_exceptions import EntityNotFoundException
+import logging
+
+logger = logging.getLogger(__name__)
 
 class StockTransactionService:
     """
@@ -25,7 +32,7 @@ class StockTransactionService:
 
         Args:
             validated_data (dict): Validated data from the serializer,
-                                   including 'stock', 'ingredient_quantity', 'transaction_type'.
+                                   including 'stock', 'quantity', 'transaction_type'.
 
         Returns:
             StockTransaction: The newly created transaction.
@@ -34,24 +41,24 @@ class StockTransactionService:
         """
         with transaction.atomic():
             stock = validated_data['stock']
-            quantity = validated_data['ingredient_quantity']
+            quantity = validated_data['quantity']
             transaction_type = validated_data['transaction_type']
 
-            cls._validate_transaction_logic(stock, quantity, transaction_type)
-            cls._adjust_stock_quantity(stock, quantity, transaction_type)
+            cls._validate_transaction_logic(quantity, transaction_type)
+            cls._adjust_stock_quantity(stock.id, cls._get_stock_delta(quantity, transaction_type))
             
-            return StockTransaction.objects.create(stock=stock, **validated_data)
+            return StockTransaction.objects.create(**validated_data)
 
     @classmethod
     def update_transaction(cls, existing_transaction: StockTransaction, validated_data: dict) -> StockTransaction:
         """
-        Updates an existing stock transaction and adjusts the corresponding stock quantity.
-        This involves reverting the old transaction's effect and applying the new one.
+        Updates an existing stock transaction and adjusts the corresponding stock quantity
+        by the difference between the old and the new transaction's effect.
 
         Args:
             existing_transaction (StockTransaction): The transaction instance to be updated.
             validated_data (dict): Validated data for the update, which may include
-                                   'ingredient_quantity' and 'transaction_type'.
+                                   'stock', 'quantity' and 'transaction_type'.
 
         Returns:
             StockTransaction: The updated transaction.
@@ -59,22 +66,23 @@ class StockTransactionService:
             InvalidStockFieldError: If the updated transaction would result in an invalid stock state.
         """
         with transaction.atomic():
-            stock = existing_transaction.stock
-            
-            # Revert the effect of the OLD transaction
-            cls._adjust_stock_quantity(
-                stock, 
-                existing_transaction.ingredient_quantity, 
-                cls._get_reverse_transaction_type(existing_transaction.transaction_type)
-            )
+            old_stock_id = existing_transaction.stock_id
+            old_delta = cls._get_stock_delta(existing_transaction.quantity, existing_transaction.transaction_type)
 
-            new_quantity = validated_data.get('ingredient_quantity', existing_transaction.ingredient_quantity)
+            new_stock = validated_data.get('stock', existing_transaction.stock)
+            new_quantity = validated_data.get('quantity', existing_transaction.quantity)
             new_transaction_type = validated_data.get('transaction_type', existing_transaction.transaction_type)
-            
-            cls._validate_transaction_logic(stock, new_quantity, new_transaction_type)
-            cls._adjust_stock_quantity(stock, new_quantity, new_transaction_type)
-            
-            existing_transaction.ingredient_quantity = new_quantity
+            cls._validate_transaction_logic(new_quantity, new_transaction_type)
+            new_delta = cls._get_stock_delta(new_quantity, new_transaction_type)
+
+            if new_stock.id == old_stock_id:
+                cls._adjust_stock_quantity(old_stock_id, new_delta - old_delta)
+            else:
+                cls._adjust_stock_quantity(old_stock_id, -old_delta)
+                cls._adjust_stock_quantity(new_stock.id, new_delta)
+
+            existing_transaction.stock = new_stock
+            existing_transaction.quantity = new_quantity
             existing_transaction.transaction_type = new_transaction_type
             existing_transaction.save()
 
@@ -91,57 +99,281 @@ class StockTransactionService:
             InvalidStockFieldError: If reverting the transaction would result in an invalid stock state.
         """
         with transaction.atomic():
-            stock = transaction_to_delete.stock
-            reverse_type = cls._get_reverse_transaction_type(transaction_to_delete.transaction_type)
+            delta = cls._get_stock_delta(transaction_to_delete.quantity, transaction_to_delete.transaction_type)
+            cls._adjust_stock_quantity(transaction_to_delete.stock_id, -delta)
             
-            cls._validate_transaction_logic(
-                stock, 
-                transaction_to_delete.ingredient_quantity, 
-                reverse_type
+            transaction_to_delete.delete()
+
+    @classmethod
+    def register_batch(cls, lines: List[dict]) -> List[dict]:
+        """
+        Registers many stock transactions at once, e.g. when receiving a supplier delivery.
+
+        Every referenced stock is locked once, in id order so concurrent batches can't
+        deadlock, and the lines are validated in memory against a running balance per
+        stock. The net change of each stock is then applied with a single UPDATE ... CASE
+        and the transactions are written with one bulk INSERT, all in one transaction.
+        Invalid lines are reported and skipped; the valid ones are still registered.
+
+        Args:
+            lines (List[dict]): Validated lines with 'stock' (ID), 'quantity', 'transaction_type'
+                                and optional 'date', 'expires_at' and 'notes'.
+
+        Returns:
+            List[dict]: One result per line, in input order:
+                        `{'line', 'registered', 'transaction_id'}` or `{'line', 'registered', 'error'}`
+        """
+        results = {}
+        deltas = defaultdict(int)
+        transactions = []
+
+        with transaction.atomic():
+            balances = {
+                stock_id: (total_stock, optimal_stock_quantity)
+                for stock_id, total_stock, optimal_stock_quantity in (
+                    Stock.objects.select_for_update()
+                    .filter(id__in={line['stock'] for line in lines})
+                    .order_by('id')
+                    .values_list('id', 'total_stock', 'optimal_stock_quantity')
+                )
+            }
+
+            initial_balances = dict(balances)
+            for line_number, line in enumerate(lines, start=1):
+                stock_id = line['stock']
+                if stock_id not in balances:
+                    results[line_number] = cls._line_error(line_number, f"Stock {stock_id} not found")
+                    continue
+
+                total_stock, optimal_stock_quantity = balances[stock_id]
+                delta = cls._get_stock_delta(line['quantity'], line['transaction_type'])
+                if total_stock + delta < 0:
+                    results[line_number] = cls._line_error(line_number, "Quantity to withdraw exceeds available stock.")
+                elif delta > 0 and total_stock + delta > optimal_stock_quantity:
+                    results[line_number] = cls._line_error(line_number, "Quantity to add exceeds the optimal stock quantity.")
+                else:
+                    balances[stock_id] = (total_stock + delta, optimal_stock_quantity)
+                    deltas[stock_id] += delta
+                    transactions.append((line_number, StockTransaction(
+                        stock_id=stock_id,
+                        quantity=line['quantity'],
+                        transaction_type=line['transaction_type'],
+                        date=line.get('date') or timezone.now(),
+                        expires_at=line.get('expires_at'),
+                        notes=line.get('notes')
+                    )))
+
+            deltas = {stock_id: delta for stock_id, delta in deltas.items() if delta}
+            if deltas:
+                Stock.objects.filter(id__in=deltas).update(
+                    total_stock=F('total_stock') + cls._get_value_by_stock(deltas),
+                    updated_at=timezone.now()
+                )
+
+            StockTransaction.objects.bulk_create([stock_transaction for _, stock_transaction in transactions])
+            StockService.notify_low_stocks([
+                stock_id for stock_id in deltas
+                if not StockService.is_low(*initial_balances[stock_id]) and StockService.is_low(*balances[stock_id])
+            ])
+
+        for line_number, stock_transaction in transactions:
+            results[line_number] = {'line': line_number, 'registered': True, 'transaction_id': stock_transaction.id}
+
+        logger.info(f"Registered {len(transactions)} of {len(lines)} stock transactions on {len(deltas)} stocks.")
+        return [results[line_number] for line_number in sorted(results)]
+
+    @classmethod
+    def consume_dish_portions(cls, portions_by_dish: Dict[int, int], notes: str = None) -> List[StockTransaction]:
+        """
+        Takes out of stock every ingredient the given dish portions need, according
+        to their recipes.
+
+        The needs are added up per stock in memory from one recipe query, then every
+        affected stock is decremented with a single UPDATE ... CASE guarded against
+        going below zero, and one OUT transaction per stock is written with one bulk
+        INSERT. Ingredients without a stock record are not tracked and are skipped.
+
+        Args:
+            portions_by_dish (Dict[int, int]): Number of portions ordered, keyed by dish ID.
+            notes (str): Notes of the OUT transactions, e.g. the order they were used for.
+
+        Returns:
+            List[StockTransaction]: The created transactions, one per affected stock.
+        Raises:
+            InsufficientStockError: If any ingredient doesn't have enough stock; nothing is taken out.
+        """
+        required = cls._get_recipe_quantities(portions_by_dish)
+        if not required:
+            return []
+
+        sufficient = Q()
+        for stock_id, quantity in required.items():
+            sufficient |= Q(id=stock_id, total_stock__gte=quantity)
+
+        try:
+            with transaction.atomic():
+                updated = Stock.objects.filter(sufficient).update(
+                    total_stock=F('total_stock') - cls._get_value_by_stock(required),
+                    updated_at=timezone.now()
+                )
+                if updated != len(required):
+                    raise InsufficientStockError()
+        except InsufficientStockError:
+            raise cls._get_insufficient_stock_error(required)
+
+        cls._notify_crossed_stocks({stock_id: -quantity for stock_id, quantity in required.items()})
+
+        return StockTransaction.objects.bulk_create([
+            StockTransaction(stock_id=stock_id, quantity=quantity, transaction_type='OUT', notes=notes)
+            for stock_id, quantity in required.items()
+        ])
+
+    @classmethod
+    def return_dish_portions(cls, portions_by_dish: Dict[int, int], notes: str = None) -> List[StockTransaction]:
+        """
+        Puts back in stock the ingredients of dish portions that won't be served,
+        compensating `consume_dish_portions` with IN transactions.
+
+        Every affected stock is incremented with a single UPDATE ... CASE and one IN
+        transaction per stock is written with one bulk INSERT. The increment is not
+        capped at the optimal quantity: the ingredients were in stock when the portions
+        were ordered, and a cancellation must not fail because the stock was refilled since.
+
+        Args:
+            portions_by_dish (Dict[int, int]): Number of portions returned, keyed by dish ID.
+            notes (str): Notes of the IN transactions, e.g. the order they come back from.
+
+        Returns:
+            List[StockTransaction]: The created transactions, one per affected stock.
+        Raises:
+            InvalidStockFieldError: If a stock was deleted meanwhile; nothing is returned.
+        """
+        returned = cls._get_recipe_quantities(portions_by_dish)
+        if not returned:
+            return []
+
+        with transaction.atomic():
+            updated = Stock.objects.filter(id__in=returned).update(
+                total_stock=F('total_stock') + cls._get_value_by_stock(returned),
+                updated_at=timezone.now()
             )
-            cls._adjust_stock_quantity(
-                stock, 
-                transaction_to_delete.ingredient_quantity, 
-                reverse_type
+            if updated != len(returned):
+                raise InvalidStockFieldError("Stock to return the ingredients to no longer exists.")
+
+            return StockTransaction.objects.bulk_create([
+                StockTransaction(stock_id=stock_id, quantity=quantity, transaction_type='IN', notes=notes)
+                for stock_id, quantity in returned.items()
+            ])
+
+    @staticmethod
+    def _get_recipe_quantities(portions_by_dish: Dict[int, int]) -> Dict[int, int]:
+        """
+        Adds up, per stock, the recipe quantities of the given dish portions with one
+        query. Ingredients without a stock record are not tracked and are left out.
+        """
+        quantities = defaultdict(int)
+        for dish_id, stock_id, quantity_per_portion in (
+            Recipe.objects.filter(dish_id__in=portions_by_dish, stock_item__stocks__isnull=False)
+            .values_list('dish_id', 'stock_item__stocks__id', 'quantity_per_portion')
+        ):
+            quantities[stock_id] += quantity_per_portion * portions_by_dish[dish_id]
+        return quantities
+
+    @classmethod
+    def _get_insufficient_stock_error(cls, required: Dict[int, int]) -> InsufficientStockError:
+        """
+        Builds the error listing the stock items that can't cover the required quantities.
+        """
+        short_items = [
+            f"{item_name} ({total_stock} of {required[stock_id]} {unit})"
+            for stock_id, item_name, unit, total_stock in (
+                Stock.objects.filter(id__in=required)
+                .values_list('id', 'item__name', 'item__unit', 'total_stock')
+                .order_by('item__name')
             )
-            
-            transaction_to_delete.delete()
+            if total_stock < required[stock_id]
+        ]
+        return InsufficientStockError(f"Insufficient stock of {', '.join(short_items)}")
 
     @classmethod
-    def _adjust_stock_quantity(cls, stock: Stock, quantity: int, transaction_type: str) -> None:
+    def _adjust_stock_quantity(cls, stock_id: int, delta: int) -> None:
         """
-        Adjusts the stock quantity based on transaction type.
+        Applies a change to the stock quantity with a single conditional UPDATE:
+            UPDATE stocks SET total_stock = total_stock + delta
+            WHERE id = stock_id AND <the result stays within 0 and the optimal quantity>
+
+        The check and the write are one statement, so concurrent transactions can't
+        both pass the check and lose an update, and no row lock is held in between.
+
+        Raises:
+            InvalidStockFieldError: If no row was updated because the guard failed.
         """
-        if transaction_type == 'IN':
-            stock.total_stock += quantity
+        if delta == 0:
+            return
+
+        stocks = Stock.objects.filter(id=stock_id)
+        if delta < 0:
+            stocks = stocks.filter(total_stock__gte=-delta)
         else:
-            stock.total_stock -= quantity
-        stock.save()
+            stocks = stocks.filter(total_stock__lte=F('optimal_stock_quantity') - delta)
+
+        if not stocks.update(total_stock=F('total_stock') + delta, updated_at=timezone.now()):
+            if delta < 0:
+                raise InvalidStockFieldError("Quantity to withdraw exceeds available stock.")
+            raise InvalidStockFieldError("Quantity to add exceeds the optimal stock quantity.")
+
+        if delta < 0:
+            cls._notify_crossed_stocks({stock_id: delta})
+
+    @classmethod
+    def _notify_crossed_stocks(cls, deltas: Dict[int, int]) -> None:
+        """
+        Notifies the stocks that the just applied changes took below the low-stock threshold.
+        The rows are still locked by the UPDATE, so their previous totals are recovered by
+        subtracting the change. Skipped when nothing listens to `stock_low`.
+        """
+        if not stock_low.has_listeners(Stock):
+            return
+
+        threshold = F('optimal_stock_quantity') * StockService.LOW_STOCK_RATIO
+        crossed_stock_ids = list(
+            Stock.objects.filter(id__in=deltas)
+            .annotate(previous_stock=F('total_stock') - cls._get_value_by_stock(deltas))
+            .filter(total_stock__lt=threshold, previous_stock__gte=threshold)
+            .values_list('id', flat=True)
+        )
+        StockService.notify_low_stocks(crossed_stock_ids)
+
+    @staticmethod
+    def _get_value_by_stock(values: Dict[int, int]) -> Case:
+        """
+        Returns a CASE expression picking each stock's value by its ID, to update many
+        stocks by different amounts in one statement.
+        """
+        return Case(
+            *[When(id=stock_id, then=Value(value)) for stock_id, value in values.items()],
+            output_field=IntegerField()
+        )
+
+    @staticmethod
+    def _line_error(line_number: int, error: str) -> dict:
+        return {'line': line_number, 'registered': False, 'error': error}
 
     @classmethod
-    def _get_reverse_transaction_type(cls, transaction_type: str) -> str:
+    def _get_stock_delta(cls, quantity: int, transaction_type: str) -> int:
         """
-        Returns the reverse transaction type for reverting operations.
+        Returns the signed change a transaction makes to the stock quantity.
         """
-        return 'OUT' if transaction_type == 'IN' else 'IN'
+        return quantity if transaction_type == 'IN' else -quantity
 
     @classmethod
-    def _validate_transaction_logic(cls, stock: Stock, quantity: int, transaction_type: str) -> None:
+    def _validate_transaction_logic(cls, quantity: int, transaction_type: str) -> None:
         """
-        Performs comprehensive validation for a potential stock transaction.
-        This includes checking for sufficient stock for 'OUT' and not exceeding limits for 'IN'.
+        Validates the transaction itself. Stock availability and limits are enforced
+        by the guarded UPDATE in `_adjust_stock_quantity`.
         """
         if quantity <= 0:
             raise InvalidStockFieldError("Transaction quantity must be greater than zero.")
 
         if transaction_type not in ('IN', 'OUT'):
             raise InvalidStockFieldError(f"Invalid transaction type: {transaction_type}. Must be 'IN' or 'OUT'.")
-
-        if transaction_type == 'OUT':
-            if stock.total_stock < quantity:
-                raise InvalidStockFieldError("Quantity to withdraw exceeds available stock.")
-        else:  # IN
-            if stock.total_stock + quantity > stock.optimal_stock_quantity: 
-                raise InvalidStockFieldError(
-                    f"Quantity to add exceeds the global stock limit of {StockService.MAX_STOCK_LIMIT}."
-                )
\ No newline at end of file
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent once the database transaction commits, when stock changes take stocks
+# from at or above `StockService.LOW_STOCK_RATIO` of their optimal quantity to below it.
+# Receivers get `stock_ids`, the IDs of the stocks that crossed the threshold.
+stock_low = Signal()
@@ -1,3 +1,287 @@
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+from menu.models import Dish
+from orders.exceptions import OrderAlreadyCompletedOrCancelled
+from orders.models import Order, OrderItem
+from orders.services.order_item_service import OrderItemService
+from orders.services.order_service import OrderService
+from tables.models import Table
+from .exceptions.stock_exceptions import InvalidStockFieldError
+from .models import Recipe, Stock, StockItem, StockTransaction
+from .signals import stock_low
+from .services.stock_transaction_service import StockTransactionService
 
-# Create your tests here.
+
+class StockTransactionGuardTest(TestCase):
+    """
+    A transaction that would take the stock below zero or above its optimal quantity
+    is rejected by the guarded UPDATE and leaves nothing behind.
+    """
+
+    def setUp(self):
+        item = StockItem.objects.create(name='Flour', unit='kg', category='INGREDIENT')
+        self.stock = Stock.objects.create(item=item, total_stock=10, optimal_stock_quantity=20)
+
+    def _process(self, quantity, transaction_type):
+        return StockTransactionService.process_transaction({
+            'stock': self.stock,
+            'quantity': quantity,
+            'transaction_type': transaction_type,
+        })
+
+    def _assert_unchanged(self):
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.total_stock, 10)
+        self.assertFalse(StockTransaction.objects.exists())
+
+    def test_over_withdrawal_is_rejected(self):
+        with self.assertRaises(InvalidStockFieldError):
+            self._process(11, 'OUT')
+        self._assert_unchanged()
+
+    def test_filling_above_optimal_is_rejected(self):
+        with self.assertRaises(InvalidStockFieldError):
+            self._process(11, 'IN')
+        self._assert_unchanged()
+
+    def test_withdrawal_within_stock_is_applied(self):
+        self._process(10, 'OUT')
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.total_stock, 0)
+        self.assertEqual(StockTransaction.objects.get().quantity, 10)
+
+
+class RecipeStockConsumptionTest(TestCase):
+    """
+    Adding order items takes their recipe ingredients out of stock in the same
+    transaction; when an ingredient runs short, no item is added.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='waiter'))
+        self.dish = Dish.objects.create(name='Pizza', price=Decimal('10.00'), category='MEALS')
+        item = StockItem.objects.create(name='Cheese', unit='g', category='INGREDIENT')
+        self.stock = Stock.objects.create(item=item, total_stock=500, optimal_stock_quantity=1000)
+        Recipe.objects.create(dish=self.dish, stock_item=item, quantity_per_portion=200)
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        self.url = f'/v1/api/orders/{self.order.id}/items/add/'
+
+    def _add(self, quantity):
+        return self.client.post(self.url, [{'menu_item': self.dish.id, 'quantity': quantity}], format='json')
+
+    def test_insufficient_stock_rolls_back_the_items(self):
+        response = self._add(3)
+
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(OrderItem.objects.filter(order=self.order).exists())
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.total_stock, 500)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.item_count, 0)
+
+    def test_ingredients_are_taken_out_of_stock(self):
+        response = self._add(2)
+
+        self.assertEqual(response.status_code, 201)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.total_stock, 100)
+        self.assertEqual(StockTransaction.objects.get(transaction_type='OUT').quantity, 400)
+
+
+class RecipeStockReturnTest(TestCase):
+    """
+    Removing undelivered items or cancelling the order puts their ingredients back
+    in stock with IN transactions; delivered items keep theirs consumed.
+    """
+
+    def setUp(self):
+        self.dish = Dish.objects.create(name='Pizza', price=Decimal('10.00'), category='MEALS')
+        item = StockItem.objects.create(name='Cheese', unit='g', category='INGREDIENT')
+        self.stock = Stock.objects.create(item=item, total_stock=1000, optimal_stock_quantity=1000)
+        Recipe.objects.create(dish=self.dish, stock_item=item, quantity_per_portion=200)
+        table = Table.objects.create(number='T1', capacity=4, is_available=False)
+        self.order = Order.objects.create(table=table, status='IN_PROGRESS')
+        self.items = OrderItemService.add_items(self.order, [
+            {'menu_item': self.dish.id, 'quantity': 2},
+            {'menu_item': self.dish.id, 'quantity': 1},
+        ])
+
+    def _total_stock(self):
+        self.stock.refresh_from_db()
+        return self.stock.total_stock
+
+    def _returned_quantities(self):
+        return list(StockTransaction.objects.filter(transaction_type='IN').values_list('quantity', flat=True))
+
+    def test_deleted_items_return_their_ingredients(self):
+        self.assertEqual(self._total_stock(), 400)
+
+        OrderItemService.delete_items(self.order, [self.items[0].id])
+
+        self.assertEqual(self._total_stock(), 800)
+        self.assertEqual(self._returned_quantities(), [400])
+
+    def test_deleted_delivered_items_stay_consumed(self):
+        OrderItem.objects.filter(id=self.items[0].id).update(is_delivered=True)
+
+        OrderItemService.delete_items(self.order, [self.items[0].id])
+
+        self.assertEqual(self._total_stock(), 400)
+        self.assertEqual(self._returned_quantities(), [])
+
+    def test_cancellation_returns_undelivered_items_once(self):
+        OrderItem.objects.filter(id=self.items[1].id).update(is_delivered=True)
+        stale_order = Order.objects.get(id=self.order.id)
+
+        OrderService.cancel_order(self.order)
+        with self.assertRaises(OrderAlreadyCompletedOrCancelled):
+            OrderService.cancel_order(stale_order)
+
+        self.assertEqual(self._total_stock(), 800)
+        self.assertEqual(self._returned_quantities(), [400])
+
+    def test_return_is_not_capped_by_a_refill(self):
+        StockTransactionService.process_transaction({'stock': self.stock, 'quantity': 600, 'transaction_type': 'IN'})
+
+        OrderService.cancel_order(self.order)
+
+        self.assertEqual(self._total_stock(), 1600)
+
+
+class StockTransactionBatchTest(TestCase):
+    """
+    A batch reports every line separately, skips the invalid ones against a running
+    balance, and applies the net change of the valid ones.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='storekeeper'))
+        item = StockItem.objects.create(name='Flour', unit='kg', category='INGREDIENT')
+        self.stock = Stock.objects.create(item=item, total_stock=10, optimal_stock_quantity=20)
+
+    def test_per_line_errors_and_net_delta(self):
+        lines = [
+            {'stock': self.stock.id, 'quantity': 8, 'transaction_type': 'IN'},
+            {'stock': self.stock.id, 'quantity': 5, 'transaction_type': 'IN'},
+            {'stock': 9999, 'quantity': 1, 'transaction_type': 'IN'},
+            {'stock': self.stock.id, 'quantity': 15, 'transaction_type': 'OUT'},
+            {'stock': self.stock.id, 'quantity': 4, 'transaction_type': 'OUT'},
+        ]
+        response = self.client.post('/v1/api/stock/transactions/batch/', {'transactions': lines}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['data']
+        self.assertEqual([result['line'] for result in results], [1, 2, 3, 4, 5])
+        self.assertEqual([result['registered'] for result in results], [True, False, False, True, False])
+        self.assertIn('optimal', results[1]['error'])
+        self.assertIn('not found', results[2]['error'])
+        self.assertIn('exceeds available stock', results[4]['error'])
+
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.total_stock, 3)
+        self.assertEqual(
+            sorted(StockTransaction.objects.values_list('id', flat=True)),
+            sorted(results[index]['transaction_id'] for index in (0, 3))
+        )
+
+
+class LowStockTest(TestCase):
+    """
+    The low-stock list filters on the fill ratio in SQL, most depleted first, and
+    `stock_low` is sent once, on commit, when a withdrawal crosses the threshold.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='storekeeper'))
+        self.stocks = {}
+        for name, total_stock in (('Flour', 10), ('Sugar', 40), ('Salt', 100), ('Rice', 90)):
+            item = StockItem.objects.create(name=name, unit='kg', category='INGREDIENT')
+            self.stocks[name] = Stock.objects.create(item=item, total_stock=total_stock, optimal_stock_quantity=100)
+
+    def _low_stock_names(self, **params):
+        response = self.client.get('/v1/api/stock/low/', params)
+        self.assertEqual(response.status_code, 200)
+        return [stock['item_name'] for stock in response.data['data']]
+
+    def test_stocks_below_the_ratio_most_depleted_first(self):
+        self.assertEqual(self._low_stock_names(), ['Flour', 'Sugar', 'Rice'])
+        self.assertEqual(self._low_stock_names(ratio='0.5'), ['Flour', 'Sugar'])
+
+    def test_invalid_ratio_is_rejected(self):
+        for ratio in ('0', '11', 'half'):
+            self.assertEqual(self.client.get('/v1/api/stock/low/', {'ratio': ratio}).status_code, 400)
+
+    def test_crossing_the_threshold_notifies_once(self):
+        receiver = mock.Mock()
+        stock_low.connect(receiver, sender=Stock)
+        self.addCleanup(stock_low.disconnect, receiver, sender=Stock)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                StockTransactionService.process_transaction({
+                    'stock': self.stocks['Salt'], 'quantity': 5, 'transaction_type': 'OUT'
+                })
+
+        receiver.assert_called_once()
+        self.assertEqual(receiver.call_args.kwargs['stock_ids'], [self.stocks['Salt'].id])
+
+
+class StockListTest(TestCase):
+    """
+    The stock list is paginated, and the latest transactions of a page of stocks
+    are fetched by one prefetch query, however many transactions there are.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create(username='storekeeper'))
+        self.stocks = []
+        for name in ('Flour', 'Sugar', 'Salt'):
+            item = StockItem.objects.create(name=name, unit='kg', category='INGREDIENT')
+            self.stocks.append(Stock.objects.create(item=item, total_stock=50, optimal_stock_quantity=100))
+
+    def _add_transactions(self, count):
+        StockTransaction.objects.bulk_create([
+            StockTransaction(stock=stock, quantity=quantity, transaction_type='IN')
+            for stock in self.stocks
+            for quantity in range(1, count + 1)
+        ])
+
+    def _list(self, expected_queries, **params):
+        # count, page of stocks with their items, recent transactions of the page
+        with self.assertNumQueries(expected_queries):
+            response = self.client.get('/v1/api/stock/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_recent_transactions_cost_one_query(self):
+        self._add_transactions(1)
+        self._list(3, include_transactions='true', page_size=2)
+
+        self._add_transactions(5)
+        body = self._list(3, include_transactions='true', transactions_limit=2, page_size=2)
+
+        self.assertEqual(len(body['data']), 2)
+        self.assertEqual(body['metadata']['pagination']['count'], 3)
+        for stock in body['data']:
+            self.assertEqual([transaction['quantity'] for transaction in stock['transactions']], [5, 4])
+
+    def test_transactions_are_left_out_unless_asked_for(self):
+        self._add_transactions(2)
+
+        body = self._list(2)
+
+        self.assertTrue(all(stock['transactions'] is None for stock in body['data']))
+
+    def test_transactions_limit_is_bounded(self):
+        response = self.client.get('/v1/api/stock/', {'include_transactions': 'true', 'transactions_limit': 51})
+
+        self.assertEqual(response.status_code, 400)
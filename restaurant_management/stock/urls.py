@@ -1,6 +1,7 @@
 from django.urls import path, include
 from .views.stock_transaction_views import (
     register_transaction,
+    register_transactions_batch,
     update_transaction,
     delete_transaction
 )
@@ -17,6 +18,7 @@ urlpatterns = [
     path('', include(router.urls)),
 
     path('transactions/', register_transaction, name='register-transaction'),
+    path('transactions/batch/', register_transactions_batch, name='register-transactions-batch'),
     path('transactions/<int:transaction_id>/', update_transaction, name='update-transaction'),
     path('transactions/<int:transaction_id>/delete/', delete_transaction, name='delete-transaction'),
 ]
\ No newline at end of file
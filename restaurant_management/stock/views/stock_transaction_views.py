@@ -1,6 +1,6 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from ..serializers import StockTransactionSerializer as TransactionSerializer
+from ..serializers import StockTransactionSerializer as TransactionSerializer, StockTransactionBatchSerializer
 from ..services.stock_transaction_service import StockTransactionService as TransactionService
 from ..documentation.stock_transaction_data import StockTransactionDocumentationData as transactionDocData
 from drf_yasg.utils import swagger_auto_schema
@@ -43,6 +43,37 @@ def register_transaction(request):
         entity="Stock Transaction"
     )
 
+@swagger_auto_schema(
+    method='post',
+    operation_id='register_stock_transactions_batch',
+    operation_summary=transactionDocData.register_batch_operation_summary,
+    operation_description=transactionDocData.register_batch_operation_description,
+    request_body=StockTransactionBatchSerializer,
+    responses={
+        status.HTTP_200_OK: transactionDocData.batch_response,
+        status.HTTP_400_BAD_REQUEST: transactionDocData.validation_error_response,
+        status.HTTP_401_UNAUTHORIZED: transactionDocData.unauthorized_reponse,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: transactionDocData.server_error_reponse
+    },
+    tags=['Inventory Transactions']
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def register_transactions_batch(request):
+    user_id = request.user.id
+    serializer = StockTransactionBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    lines = serializer.validated_data['transactions']
+    logger.info(f"User {user_id} is requesting to register {len(lines)} stock transactions")
+
+    results = TransactionService.register_batch(lines)
+    registered_count = sum(result['registered'] for result in results)
+    return ResponseWrapper.success(
+        data=results,
+        message=f"{registered_count} of {len(results)} Stock Transactions Successfully Registered"
+    )
+
 @swagger_auto_schema(
     method='put',
     operation_id='update_stock_transaction',
@@ -1,45 +1,100 @@
-from rest_framework.viewsets import ViewSet
+from rest_framework.viewsets import GenericViewSet
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound
 from shared.response.django_response import DjangoResponseWrapper as ResponseWrapper
 from rest_framework.permissions import IsAuthenticated
 import logging
 from ..models import Stock
-from ..serializers import StockSerializer
+from ..serializers import StockSerializer, LowStockSerializer
 from ..services.stock_service import StockService
+from ..exceptions.stock_exceptions import InvalidStockFieldError
 from ..documentation.stock_doc_data import  StockDocumentationData as StockDocData
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from shared.open_api.error_response_schema import ErrorResponses as GenericResponse
+from shared.pagination import CustomPagination
 
 logger = logging.getLogger(__name__)
 
-class StockViews(ViewSet):
-    queryset = Stock.objects.all()
+class StockViews(GenericViewSet):
+    queryset = Stock.objects.select_related('item')
     permission_classes = [IsAuthenticated]
     serializer_class = StockSerializer
+    pagination_class = CustomPagination
 
     @swagger_auto_schema(
         operation_id='list_stock_items',
         operation_summary=StockDocData.list_operation_summary,
         operation_description=StockDocData.list_operation_description,
-        manual_parameters=[openapi.Parameter('include_transactions', openapi.IN_QUERY, description="Include transaction history", type=openapi.TYPE_BOOLEAN)],
+        manual_parameters=[
+            openapi.Parameter('include_transactions', openapi.IN_QUERY, description="Include the latest transactions of each stock", type=openapi.TYPE_BOOLEAN),
+            openapi.Parameter('transactions_limit', openapi.IN_QUERY, description="Transactions per stock (default 10, max 50)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page', openapi.IN_QUERY, description="Page number", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, description="Number of results per page", type=openapi.TYPE_INTEGER)
+        ],
         responses={
             status.HTTP_200_OK: StockDocData.list_response,
+            status.HTTP_400_BAD_REQUEST: StockDocData.validation_error_response,
             status.HTTP_401_UNAUTHORIZED: GenericResponse.get_unauthorized_response(),
             status.HTTP_500_INTERNAL_SERVER_ERROR: GenericResponse.get_server_error_response()
         },
         tags=['Inventory']
     )
     def list(self, request):
-        queryset = self.queryset
-        serializer = self.get_serializer(queryset, many=True)
+        include_transactions = request.query_params.get('include_transactions', '').lower() == 'true'
+        try:
+            transactions_limit = int(request.query_params.get('transactions_limit', StockService.RECENT_TRANSACTIONS_LIMIT))
+        except ValueError:
+            return ResponseWrapper.bad_request(message="transactions_limit must be an integer")
+        try:
+            queryset = StockService.get_stock_list(include_transactions, transactions_limit)
+        except InvalidStockFieldError as e:
+            return ResponseWrapper.bad_request(message=str(e.detail))
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
         
-        logger.info(f"Listed {len(queryset)} stock items")
+        logger.info(f"Listed {len(page)} stock items")
         
         return ResponseWrapper.success(
             data=serializer.data,
-            metadata={ 'total_items': queryset.count(), 'note': 'Add ?include_transactions=true to include transactions' }
+            metadata={
+                'pagination': self.paginator.get_paginated_metadata(),
+                'note': 'Add ?include_transactions=true to include the latest transactions'
+            }
+        )
+
+    @swagger_auto_schema(
+        operation_id='list_low_stock',
+        operation_summary=StockDocData.low_stock_operation_summary,
+        operation_description=StockDocData.low_stock_operation_description,
+        manual_parameters=[openapi.Parameter('ratio', openapi.IN_QUERY, description="Fraction of the optimal quantity (default 1.0)", type=openapi.TYPE_NUMBER)],
+        responses={
+            status.HTTP_200_OK: StockDocData.low_stock_response,
+            status.HTTP_400_BAD_REQUEST: StockDocData.validation_error_response,
+            status.HTTP_401_UNAUTHORIZED: GenericResponse.get_unauthorized_response(),
+            status.HTTP_500_INTERNAL_SERVER_ERROR: GenericResponse.get_server_error_response()
+        },
+        tags=['Inventory']
+    )
+    @action(detail=False, methods=['get'], url_path='low')
+    def low(self, request):
+        try:
+            ratio = float(request.query_params.get('ratio', StockService.LOW_STOCK_RATIO))
+        except ValueError:
+            return ResponseWrapper.bad_request(message="ratio must be a number")
+        try:
+            low_stocks = list(StockService.get_low_stocks(ratio))
+        except InvalidStockFieldError as e:
+            return ResponseWrapper.bad_request(message=str(e.detail))
+
+        logger.info(f"Found {len(low_stocks)} stocks below {ratio} of their optimal quantity")
+
+        return ResponseWrapper.found(
+            data=LowStockSerializer(low_stocks, many=True).data,
+            entity="Low Stock",
+            metadata={'ratio': ratio, 'total': len(low_stocks)}
         )
 
     @swagger_auto_schema(
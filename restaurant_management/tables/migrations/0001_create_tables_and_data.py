@@ -1,6 +1,7 @@
 # menu/migrations/000Y_create_tables_and_data.py
 
 from django.db import migrations, models
+from shared.migrations import PostgresRunSQL
 
 
 class Migration(migrations.Migration):
@@ -10,7 +11,7 @@ class Migration(migrations.Migration):
 
     operations = [
         # --- Create tables table ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             CREATE TABLE tables (
                 id SERIAL PRIMARY KEY,
@@ -35,12 +36,15 @@ class Migration(migrations.Migration):
                         ('created_at', models.DateTimeField(auto_now_add=True)),
                         ('updated_at', models.DateTimeField(auto_now=True)),
                     ],
+                    options={
+                        'db_table': 'tables',
+                    },
                 ),
             ]
         ),
 
         # --- Insert data into tables ---
-        migrations.RunSQL(
+        PostgresRunSQL(
             sql="""
             -- Table for 2 (small intimate table)
             INSERT INTO tables (capacity, number, is_available) VALUES (2, 'T1', true);